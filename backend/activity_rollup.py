@@ -0,0 +1,79 @@
+# backend/activity_rollup.py
+"""
+Daily per-topic activity rollups behind the growth dashboard.
+
+daily_topic_activity(user_id, day, topic_id, solved, attempted) counts status
+changes per user, local day and topic; topic_id 0 holds the day's total over
+all problems (including ones without topics). crud._write_statuses adds to
+it whenever a problem's status changes, so a chart reads one row per bucket
+instead of scanning and re-splitting the user's whole history.
+
+user_problems only keeps each problem's latest status, so history from
+before the rollup existed is backfilled as one event per problem on the day
+of its last update:
+
+    python -m backend.activity_rollup rebuild [--user ID]
+
+The baseline schema migration runs the same backfill once, on a database
+that has history but no rollup yet.
+Rebuilding replaces the incrementally recorded events with that
+approximation, so it is meant for backfills and repairs only.
+"""
+import asyncio
+import json
+import sys
+from typing import List, Optional
+
+import aiosqlite
+
+# topic_id for "all problems" rows
+ALL_TOPICS = 0
+
+_BACKFILL_SQL = f"""
+    SELECT up.user_id, date(up.last_updated), t.topic_id,
+           SUM(up.status = 'solved'), SUM(up.status != 'solved')
+    FROM user_problems up
+    JOIN (
+        SELECT problem_id, topic_id FROM problem_topics
+        UNION ALL
+        SELECT id, {ALL_TOPICS} FROM problems
+    ) t ON t.problem_id = up.problem_id
+    WHERE up.last_updated IS NOT NULL
+      AND (:user_id IS NULL OR up.user_id = :user_id)
+    GROUP BY up.user_id, date(up.last_updated), t.topic_id
+"""
+
+
+async def rebuild(db: aiosqlite.Connection, user_id: Optional[int] = None) -> int:
+    """Replaces the rollup (for one user or everyone) with the backfill from history; the caller commits."""
+    await db.execute(
+        "DELETE FROM daily_topic_activity WHERE (:user_id IS NULL OR user_id = :user_id);",
+        {"user_id": user_id},
+    )
+    cur = await db.execute(
+        f"INSERT INTO daily_topic_activity (user_id, day, topic_id, solved, attempted) {_BACKFILL_SQL};",
+        {"user_id": user_id},
+    )
+    return cur.rowcount
+
+
+async def _main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    from backend.database import DB_PATH, apply_pragmas
+
+    parser = argparse.ArgumentParser(description="Backfill daily_topic_activity from user history.")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--user", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    async with aiosqlite.connect(DB_PATH) as db:
+        await apply_pragmas(db)
+        rows = await rebuild(db, args.user)
+        await db.commit()
+    print(json.dumps({"rebuilt_rows": rows}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main()))
@@ -0,0 +1,153 @@
+# backend/catalog_import.py
+"""
+Streaming problem-catalog importer.
+
+Reads a JSONL or CSV catalog row by row, skips rows whose content hash is
+unchanged and upserts the rest in chunked transactions.
+
+    python -m backend.catalog_import path/to/catalog.jsonl [--chunk-size 500]
+
+Each row needs slug, title, difficulty (Easy|Medium|Hard) and topics
+(a list, or a comma-separated string).
+"""
+import asyncio
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from backend import crud, recommender
+from backend.database import writer
+
+DIFFICULTIES = {"Easy", "Medium", "Hard"}
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parent / "data" / "problem_catalog.jsonl"
+
+# (slug, title, difficulty, topics_csv)
+CatalogRow = Tuple[str, str, str, str]
+
+
+def normalize_row(raw: dict) -> Optional[CatalogRow]:
+    """(slug, title, difficulty, topics_csv), or None if the row is invalid."""
+    slug = (raw.get("slug") or "").strip()
+    title = (raw.get("title") or "").strip()
+    difficulty = (raw.get("difficulty") or "").strip().capitalize()
+    topics = raw.get("topics") or []
+    if isinstance(topics, str):
+        topics = topics.split(",")
+    topics_csv = ",".join(t.strip() for t in topics if t and t.strip())
+
+    if not slug or not title or difficulty not in DIFFICULTIES:
+        return None
+    return slug, title, difficulty, topics_csv
+
+
+def iter_catalog(fp: TextIO, fmt: str) -> Iterator[Optional[CatalogRow]]:
+    """Yields normalized rows (None for rows that fail validation)."""
+    if fmt == "csv":
+        for raw in csv.DictReader(fp):
+            yield normalize_row(raw)
+    elif fmt == "jsonl":
+        for line in fp:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                raw = json.loads(line)
+            except json.JSONDecodeError:
+                yield None
+                continue
+            yield normalize_row(raw) if isinstance(raw, dict) else None
+    else:
+        raise ValueError(f"Unsupported catalog format: {fmt}")
+
+
+def format_for(filename: str) -> str:
+    suffix = Path(filename).suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in {".jsonl", ".ndjson"}:
+        return "jsonl"
+    raise ValueError("Catalog must be a .jsonl or .csv file")
+
+
+async def _import_chunk(chunk: Dict[str, CatalogRow], stats: Dict) -> None:
+    async with writer() as db:
+        existing = await crud.get_problem_hashes(db, chunk.keys())
+
+        changed = []
+        for slug, title, difficulty, topics_csv in chunk.values():
+            content_hash = crud.problem_content_hash(slug, title, difficulty, topics_csv)
+            if slug not in existing:
+                stats["inserted"] += 1
+            elif existing[slug] == content_hash:
+                stats["unchanged"] += 1
+                continue
+            else:
+                stats["updated"] += 1
+            changed.append((slug, title, difficulty, topics_csv, content_hash))
+
+        if changed:
+            await crud.upsert_problems(db, changed)
+        # writer() commits once per chunk
+
+    if changed:
+        recommender.invalidate()
+
+
+async def import_catalog(rows: Iterable[Optional[CatalogRow]], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict:
+    """
+    Upserts a stream of catalog rows, one transaction per chunk.
+    Returns counters plus elapsed seconds and rows/sec.
+    """
+    stats = {"read": 0, "invalid": 0, "inserted": 0, "updated": 0, "unchanged": 0}
+    started = time.perf_counter()
+
+    # keyed by slug so a duplicate later in the chunk wins
+    chunk: Dict[str, CatalogRow] = {}
+    for row in rows:
+        stats["read"] += 1
+        if row is None:
+            stats["invalid"] += 1
+            continue
+        chunk[row[0]] = row
+        if len(chunk) >= chunk_size:
+            await _import_chunk(chunk, stats)
+            chunk = {}
+    if chunk:
+        await _import_chunk(chunk, stats)
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_sec"] = round(stats["read"] / elapsed, 1) if elapsed > 0 else None
+    return stats
+
+
+async def import_catalog_file(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict:
+    fmt = format_for(path.name)
+    with open(path, newline="", encoding="utf-8") as fp:
+        return await import_catalog(iter_catalog(fp, fmt), chunk_size=chunk_size)
+
+
+async def _main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+
+    from backend.database import init_db, open_pool, close_pool
+
+    parser = argparse.ArgumentParser(description="Import a LeetCode problem catalog (JSONL or CSV).")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    await init_db()
+    await open_pool(readers=1)
+    try:
+        stats = await import_catalog_file(args.path, chunk_size=args.chunk_size)
+    finally:
+        await close_pool()
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -1,9 +1,17 @@
 # functions to interact with DB 
 # backend/crud.py
-from typing import Optional, List, Dict
+import json
+import hashlib
+from typing import Optional, List, Dict, Iterable, Tuple
 import aiosqlite
+import re
 import sqlite3
 
+from backend import llm_cache, review_schedule
+
+# Write helpers never commit: they run inside database.writer(), whose
+# group-commit batch owns the transaction.
+
 # ---------- Users ----------
 async def get_user_by_email(db: aiosqlite.Connection, email: str) -> Optional[dict]:
     cur = await db.execute("SELECT id, email, hashed_password FROM users WHERE email = ?", (email,))
@@ -16,7 +24,6 @@ async def create_user(db: aiosqlite.Connection, email: str, hashed_password: str
             "INSERT INTO users (email, hashed_password) VALUES (?, ?)",
             (email, hashed_password),
         )
-        await db.commit()
         return {"id": cur.lastrowid, "email": email}
     except sqlite3.IntegrityError:
         raise ValueError("Email already registered")
@@ -29,6 +36,21 @@ async def get_user_by_id(db: aiosqlite.Connection, user_id: int) -> Optional[dic
     return dict(row) if row else None
 
 
+async def update_user_password(db: aiosqlite.Connection, user_id: int, hashed_password: str) -> None:
+    await db.execute("UPDATE users SET hashed_password = ? WHERE id = ?", (hashed_password, user_id))
+
+
+async def delete_user(db: aiosqlite.Connection, user_id: int) -> None:
+    # per-user rows go with it (ON DELETE CASCADE)
+    await db.execute("DELETE FROM users WHERE id = ?", (user_id,))
+
+
+async def get_history_version(db: aiosqlite.Connection, user_id: int) -> int:
+    cur = await db.execute("SELECT history_version FROM users WHERE id = ?", (user_id,))
+    row = await cur.fetchone()
+    return int(row["history_version"]) if row else 0
+
+
 # ---------- LeetCode link ----------
 async def upsert_leetcode_link(db: aiosqlite.Connection, user_id: int, username: str) -> None:
     await db.execute(
@@ -41,7 +63,6 @@ async def upsert_leetcode_link(db: aiosqlite.Connection, user_id: int, username:
         """,
         (user_id, username),
     )
-    await db.commit()
 
 
 async def get_leetcode_username(db: aiosqlite.Connection, user_id: int) -> Optional[str]:
@@ -51,24 +72,122 @@ async def get_leetcode_username(db: aiosqlite.Connection, user_id: int) -> Optio
 
 
 # ---------- Problems catalog ----------
-async def upsert_problem(db: aiosqlite.Connection, slug: str, title: str, difficulty: str, topics_csv: str) -> int:
-    # insert if not exists
+# problems.topics keeps the display CSV; filtering and counting go through
+# the normalized topics / problem_topics tables.
+def parse_topics(topics_csv: Optional[str]) -> List[str]:
+    """Normalized (lowercase, de-duplicated) topic names from a CSV string."""
+    seen = []
+    for t in (topics_csv or "").split(","):
+        t = t.strip().lower()
+        if t and t not in seen:
+            seen.append(t)
+    return seen
+
+
+def topic_list(topics_csv: Optional[str]) -> List[str]:
+    """Display topic names, as stored."""
+    return [t.strip() for t in (topics_csv or "").split(",") if t.strip()]
+
+
+async def sync_problem_topics(db: aiosqlite.Connection, topics_by_problem: Dict[int, str]) -> None:
+    """
+    Rewrites problem_topics for the given {problem_id: topics_csv}.
+    The caller owns the transaction.
+    """
+    if not topics_by_problem:
+        return
+    ids_json = json.dumps(list(topics_by_problem))
+
+    # move users' topic stats off the old topics and onto the new ones
+    await _adjust_topic_stats_for_problems(db, ids_json, -1)
     await db.execute(
+        "DELETE FROM problem_topics WHERE problem_id IN (SELECT value FROM json_each(?))",
+        (ids_json,),
+    )
+    pairs = [(pid, name) for pid, csv in topics_by_problem.items() for name in parse_topics(csv)]
+    await db.executemany("INSERT OR IGNORE INTO topics (name) VALUES (?)", [(name,) for _, name in pairs])
+    await db.executemany(
+        "INSERT OR IGNORE INTO problem_topics (problem_id, topic_id) SELECT ?, id FROM topics WHERE name = ?",
+        pairs,
+    )
+    await _adjust_topic_stats_for_problems(db, ids_json, 1)
+
+
+_UPSERT_PROBLEM_SQL = """
+    INSERT INTO problems (slug, title, difficulty, topics, content_hash)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(slug) DO UPDATE SET
+        title=excluded.title,
+        difficulty=excluded.difficulty,
+        topics=excluded.topics,
+        content_hash=excluded.content_hash;
+"""
+
+
+def problem_content_hash(slug: str, title: str, difficulty: str, topics_csv: str) -> str:
+    raw = "\x1f".join((slug, title, difficulty, topics_csv))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+async def upsert_problems(db: aiosqlite.Connection, rows: List[Tuple[str, str, str, str, str]]) -> None:
+    """
+    Bulk upsert of (slug, title, difficulty, topics_csv, content_hash) rows.
+    The caller owns the transaction and calls recommender.invalidate() after commit.
+    """
+    await db.executemany(_UPSERT_PROBLEM_SQL, rows)
+    ids = await get_problem_ids_by_slugs(db, [r[0] for r in rows])
+    await sync_problem_topics(db, {ids[r[0]]: r[3] for r in rows})
+
+
+async def insert_missing_problems(db: aiosqlite.Connection, rows: List[Tuple[str, str, str, str]]) -> int:
+    """
+    Inserts (slug, title, difficulty, topics_csv) rows whose slug isn't in the
+    catalog yet; existing problems are never touched. The caller owns the
+    transaction and calls recommender.invalidate() after commit. Returns how
+    many were inserted.
+    """
+    existing = await get_problem_ids_by_slugs(db, [r[0] for r in rows])
+    rows = [r for r in rows if r[0] not in existing]
+    if not rows:
+        return 0
+    await db.executemany(
         """
-        INSERT INTO problems (slug, title, difficulty, topics)
-        VALUES (?, ?, ?, ?)
-        ON CONFLICT(slug) DO UPDATE SET
-            title=excluded.title,
-            difficulty=excluded.difficulty,
-            topics=excluded.topics;
+        INSERT INTO problems (slug, title, difficulty, topics, content_hash)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(slug) DO NOTHING;
         """,
-        (slug, title, difficulty, topics_csv),
+        [(*r, problem_content_hash(*r)) for r in rows],
     )
-    await db.commit()
+    ids = await get_problem_ids_by_slugs(db, [r[0] for r in rows])
+    await sync_problem_topics(db, {ids[r[0]]: r[3] for r in rows})
+    return len(rows)
 
-    cur = await db.execute("SELECT id FROM problems WHERE slug = ?", (slug,))
-    row = await cur.fetchone()
-    return int(row["id"])
+
+async def insert_new_problems(db: aiosqlite.Connection, rows: List[Tuple[str, str, str]]) -> int:
+    """
+    Inserts (slug, title, difficulty) rows with no topics, leaving existing
+    slugs untouched. The caller owns the transaction and calls
+    recommender.invalidate() after commit. Returns how many were inserted.
+    """
+    if not rows:
+        return 0
+    cur = await db.executemany(
+        """
+        INSERT INTO problems (slug, title, difficulty, topics, content_hash)
+        VALUES (?, ?, ?, '', ?)
+        ON CONFLICT(slug) DO NOTHING;
+        """,
+        [(slug, title, diff, problem_content_hash(slug, title, diff, "")) for slug, title, diff in rows],
+    )
+    return max(cur.rowcount, 0)
+
+
+async def get_problem_hashes(db: aiosqlite.Connection, slugs: Iterable[str]) -> Dict[str, Optional[str]]:
+    cur = await db.execute(
+        "SELECT slug, content_hash FROM problems WHERE slug IN (SELECT value FROM json_each(?))",
+        (json.dumps(list(slugs)),),
+    )
+    return {r["slug"]: r["content_hash"] for r in await cur.fetchall()}
 
 
 async def get_problem_id_by_slug(db: aiosqlite.Connection, slug: str) -> Optional[int]:
@@ -77,104 +196,424 @@ async def get_problem_id_by_slug(db: aiosqlite.Connection, slug: str) -> Optiona
     return int(row["id"]) if row else None
 
 
-async def set_user_problem_status(db: aiosqlite.Connection, user_id: int, problem_id: int, status: str) -> None:
+async def get_problem_ids_by_slugs(db: aiosqlite.Connection, slugs: Iterable[str]) -> Dict[str, int]:
+    # one set-based lookup instead of a query per slug
+    cur = await db.execute(
+        "SELECT id, slug FROM problems WHERE slug IN (SELECT value FROM json_each(?))",
+        (json.dumps(list(slugs)),),
+    )
+    return {r["slug"]: int(r["id"]) for r in await cur.fetchall()}
+
+
+async def get_problems_by_ids(db: aiosqlite.Connection, problem_ids: Iterable[int]) -> Dict[int, dict]:
+    cur = await db.execute(
+        "SELECT id, slug, title, difficulty, topics FROM problems WHERE id IN (SELECT value FROM json_each(?))",
+        (json.dumps(list(problem_ids)),),
+    )
+    return {int(r["id"]): dict(r) for r in await cur.fetchall()}
+
+
+# ---------- User topic stats (materialized) ----------
+_BUMP_TOPIC_STATS_SQL = """
+    INSERT INTO user_topic_stats (user_id, topic_id, solved, attempted)
+    SELECT ?, pt.topic_id, ?, ?
+    FROM problem_topics pt
+    WHERE pt.problem_id = ?
+    ON CONFLICT(user_id, topic_id) DO UPDATE SET
+        solved = solved + excluded.solved,
+        attempted = attempted + excluded.attempted;
+"""
+
+
+# one status change -> the day's row for each of the problem's topics, plus topic 0 (all)
+_BUMP_DAILY_ACTIVITY_SQL = """
+    INSERT INTO daily_topic_activity (user_id, day, topic_id, solved, attempted)
+    SELECT ?, ?, t.topic_id, ?, ?
+    FROM (SELECT 0 AS topic_id UNION ALL SELECT topic_id FROM problem_topics WHERE problem_id = ?) t
+    WHERE true  -- keeps ON CONFLICT from parsing as a join constraint
+    ON CONFLICT(user_id, topic_id, day) DO UPDATE SET
+        solved = solved + excluded.solved,
+        attempted = attempted + excluded.attempted;
+"""
+
+
+async def _adjust_topic_stats_for_problems(db: aiosqlite.Connection, problem_ids_json: str, sign: int) -> None:
+    # add (sign=1) or remove (sign=-1) every user's contribution through these problems' topics
     await db.execute(
         """
-        INSERT INTO user_problems (user_id, problem_id, status, last_updated)
-        VALUES (?, ?, ?, datetime('now','localtime'))
+        INSERT INTO user_topic_stats (user_id, topic_id, solved, attempted)
+        SELECT up.user_id, pt.topic_id, ? * SUM(up.status = 'solved'), ? * SUM(up.status != 'solved')
+        FROM user_problems up
+        JOIN problem_topics pt ON pt.problem_id = up.problem_id
+        WHERE up.problem_id IN (SELECT value FROM json_each(?))
+        GROUP BY up.user_id, pt.topic_id
+        ON CONFLICT(user_id, topic_id) DO UPDATE SET
+            solved = solved + excluded.solved,
+            attempted = attempted + excluded.attempted;
+        """,
+        (sign, sign, problem_ids_json),
+    )
+
+
+# ---------- User problem status ----------
+async def get_user_statuses(db: aiosqlite.Connection, user_id: int, problem_ids: List[int]) -> Dict[int, str]:
+    cur = await db.execute(
+        """
+        SELECT problem_id, status FROM user_problems
+        WHERE user_id = ? AND problem_id IN (SELECT value FROM json_each(?));
+        """,
+        (user_id, json.dumps(problem_ids)),
+    )
+    return {r[0]: r[1] for r in await cur.fetchall()}
+
+
+async def _get_schedules(db: aiosqlite.Connection, user_id: int, problem_ids: List[int]) -> Dict[int, aiosqlite.Row]:
+    cur = await db.execute(
+        """
+        SELECT problem_id, status, ease, interval_days, repetitions, next_review_at FROM user_problems
+        WHERE user_id = ? AND problem_id IN (SELECT value FROM json_each(?));
+        """,
+        (user_id, json.dumps(problem_ids)),
+    )
+    return {r[0]: r for r in await cur.fetchall()}
+
+
+async def _write_statuses(
+    db: aiosqlite.Connection,
+    user_id: int,
+    items: List[Tuple[int, str]],
+    last_updated: Optional[List[Optional[str]]] = None,
+) -> None:
+    """
+    Every status write goes through here; the caller owns the transaction.
+    `last_updated` (parallel to `items`, e.g. from an import) keeps the given
+    timestamps; None entries and the default mean now. A status change is
+    graded by review_schedule.quality_for_status and an unchanged status
+    keeps its schedule.
+    """
+    previous_rows = await _get_schedules(db, user_id, [pid for pid, _ in items])
+    previous = {pid: r["status"] for pid, r in previous_rows.items()}
+    stamps = last_updated or [None] * len(items)
+    now = review_schedule.now()
+
+    rows = []
+    for (problem_id, status), stamp in zip(items, stamps):
+        old = previous_rows.get(problem_id)
+        quality = review_schedule.quality_for_status(previous.get(problem_id), status)
+        if quality is None:
+            # unchanged status (so `old` exists): keep its schedule
+            schedule = (old["ease"], old["interval_days"], old["repetitions"], old["next_review_at"])
+        else:
+            current = review_schedule.Schedule()
+            if old is not None:
+                current = review_schedule.Schedule(old["ease"], old["interval_days"], old["repetitions"])
+            nxt = current.review(quality)
+            due = review_schedule.due_at(stamp or now, nxt.interval_days)
+            schedule = (nxt.ease, nxt.interval_days, nxt.repetitions, due)
+        rows.append((user_id, problem_id, status, stamp, *schedule))
+
+    await db.executemany(
+        """
+        INSERT INTO user_problems
+            (user_id, problem_id, status, last_updated, ease, interval_days, repetitions, next_review_at)
+        VALUES (?, ?, ?, COALESCE(?, datetime('now','localtime')), ?, ?, ?, ?)
         ON CONFLICT(user_id, problem_id) DO UPDATE SET
             status=excluded.status,
-            last_updated=datetime('now','localtime');
+            last_updated=excluded.last_updated,
+            ease=excluded.ease,
+            interval_days=excluded.interval_days,
+            repetitions=excluded.repetitions,
+            next_review_at=excluded.next_review_at;
         """,
-        (user_id, problem_id, status),
+        rows,
     )
-    await db.commit()
 
+    # topic stats: anything not solved counts as attempted
+    deltas = []
+    for problem_id, status in items:
+        old = previous.get(problem_id)
+        d_solved = (status == "solved") - (old == "solved")
+        d_attempted = (status != "solved") - (old is not None and old != "solved")
+        if d_solved or d_attempted:
+            deltas.append((user_id, d_solved, d_attempted, problem_id))
+    if deltas:
+        await db.executemany(_BUMP_TOPIC_STATS_SQL, deltas)
 
-async def list_problems_with_status(db: aiosqlite.Connection, user_id: int, limit: int = 50) -> List[Dict]:
-    cur = await db.execute(
+    # dashboard rollup: one event per actual status change, on the write's local day
+    events = [
+        (user_id, (stamp or now)[:10], int(status == "solved"), int(status != "solved"), problem_id)
+        for (problem_id, status), stamp in zip(items, stamps)
+        if previous.get(problem_id) != status
+    ]
+    if events:
+        await db.executemany(_BUMP_DAILY_ACTIVITY_SQL, events)
+
+    # new history version -> cached mentor responses for the old one no longer match
+    await db.execute("UPDATE users SET history_version = history_version + 1 WHERE id = ?", (user_id,))
+    llm_cache.mentor_cache.forget_user(user_id)
+
+
+async def set_user_problem_status(db: aiosqlite.Connection, user_id: int, problem_id: int, status: str) -> None:
+    await _write_statuses(db, user_id, [(problem_id, status)])
+
+
+async def set_user_problem_statuses(db: aiosqlite.Connection, user_id: int, statuses: Dict[str, str]) -> List[str]:
+    """
+    Bulk version of set_user_problem_status keyed by slug.
+    Applies every known slug in a single transaction and returns the unknown slugs.
+    """
+    ids = await get_problem_ids_by_slugs(db, statuses.keys())
+    items = [(ids[slug], status) for slug, status in statuses.items() if slug in ids]
+    if items:
+        await _write_statuses(db, user_id, items)
+    return [slug for slug in statuses if slug not in ids]
+
+
+async def restore_user_problem_statuses(
+    db: aiosqlite.Connection, user_id: int, rows: List[Tuple[int, str, Optional[str]]]
+) -> None:
+    """
+    Writes (problem_id, status, last_updated) rows keeping their timestamps,
+    e.g. from an import. The caller owns the transaction.
+    """
+    if rows:
+        await _write_statuses(db, user_id, [(pid, status) for pid, status, _ in rows], [ts for _, _, ts in rows])
+
+
+# ---------- Review schedule ----------
+_SCHEDULE_COLUMNS = """
+    p.slug, p.title, p.difficulty, p.topics,
+    up.problem_id, up.status, up.ease, up.interval_days, up.repetitions, up.next_review_at
+"""
+
+
+async def review_problem(db: aiosqlite.Connection, user_id: int, problem_id: int, quality: int) -> Optional[Dict]:
+    """
+    Records an explicit review (SM-2 quality 0-5) and returns the new
+    schedule row, or None if the problem isn't in the user's history. Only
+    the schedule moves: status, topic stats and the activity rollup stay as
+    they are. The caller owns the transaction.
+    """
+    old = (await _get_schedules(db, user_id, [problem_id])).get(problem_id)
+    if old is None:
+        return None
+    nxt = review_schedule.Schedule(old["ease"], old["interval_days"], old["repetitions"]).review(quality)
+    await db.execute(
         """
-        SELECT
-            p.slug, p.title, p.difficulty, p.topics,
-            up.status AS status
-        FROM problems p
-        LEFT JOIN user_problems up
-            ON up.problem_id = p.id AND up.user_id = ?
-        ORDER BY p.id DESC
-        LIMIT ?;
+        UPDATE user_problems
+        SET ease = ?, interval_days = ?, repetitions = ?, next_review_at = ?
+        WHERE user_id = ? AND problem_id = ?;
         """,
-        (user_id, limit),
+        (
+            nxt.ease, nxt.interval_days, nxt.repetitions,
+            review_schedule.due_at(review_schedule.now(), nxt.interval_days),
+            user_id, problem_id,
+        ),
     )
-    rows = await cur.fetchall()
-    return [dict(r) for r in rows]
+    cur = await db.execute(
+        f"""
+        SELECT {_SCHEDULE_COLUMNS}
+        FROM user_problems up
+        JOIN problems p ON p.id = up.problem_id
+        WHERE up.user_id = ? AND up.problem_id = ?;
+        """,
+        (user_id, problem_id),
+    )
+    return dict(await cur.fetchone())
 
 
-# ---------- Recommendations (simple scoring MVP) ----------
-async def recommend_problems(
+async def list_due_reviews(
     db: aiosqlite.Connection,
     user_id: int,
-    weak_topics: List[str],
-    difficulty: Optional[str],
+    due_before: str,
     limit: int,
+    after: Optional[Tuple[str, int]] = None,
+) -> List[Dict]:
+    """
+    Problems due for review at `due_before`, most overdue first, keyset-paged
+    on (next_review_at, problem_id). A range scan on idx_user_problems_due.
+    """
+    where, params = "", [user_id, due_before]
+    if after is not None:
+        where = "AND (up.next_review_at, up.problem_id) > (?, ?)"
+        params += list(after)
+    cur = await db.execute(
+        f"""
+        SELECT {_SCHEDULE_COLUMNS}
+        FROM user_problems up
+        JOIN problems p ON p.id = up.problem_id
+        WHERE up.user_id = ? AND up.next_review_at <= ? {where}
+        ORDER BY up.next_review_at, up.problem_id
+        LIMIT ?;
+        """,
+        (*params, limit),
+    )
+    return [dict(r) for r in await cur.fetchall()]
+
+
+async def count_due_reviews(db: aiosqlite.Connection, user_id: int, due_before: str) -> int:
+    cur = await db.execute(
+        "SELECT COUNT(*) FROM user_problems WHERE user_id = ? AND next_review_at <= ?;",
+        (user_id, due_before),
+    )
+    return (await cur.fetchone())[0]
+
+
+# ---------- Dashboard rollups ----------
+async def get_topic_id(db: aiosqlite.Connection, name: str) -> Optional[int]:
+    cur = await db.execute("SELECT id FROM topics WHERE name = ?", (name.strip().lower(),))
+    row = await cur.fetchone()
+    return int(row[0]) if row else None
+
+
+async def get_activity_series(
+    db: aiosqlite.Connection, user_id: int, topic_id: int, since: Optional[str], monthly: bool = False
 ) -> List[Dict]:
-    # Pull a candidate set
-    params = []
-    where = []
+    """
+    Solved / attempted status changes per day (or per month) from the
+    daily_topic_activity rollup; topic_id 0 is all problems. One range scan
+    on the rollup's primary key, so the cost follows the number of buckets.
+    """
+    bucket = "substr(day, 1, 7)" if monthly else "day"
+    cur = await db.execute(
+        f"""
+        SELECT {bucket} AS bucket, SUM(solved) AS solved, SUM(attempted) AS attempted
+        FROM daily_topic_activity
+        WHERE user_id = ? AND topic_id = ? AND day >= ?
+        GROUP BY bucket
+        ORDER BY bucket;
+        """,
+        (user_id, topic_id, since or ""),
+    )
+    return [dict(r) for r in await cur.fetchall()]
+
+
+async def get_topic_activity(db: aiosqlite.Connection, user_id: int, since: Optional[str]) -> List[Dict]:
+    """
+    Per-topic totals since `since` (None = all time), most solved first.
+    A week or month is a covering range scan on idx_daily_topic_activity_day;
+    all time walks the user's primary-key range, already grouped by topic.
+    The planner prefers the primary key for both (it skips the GROUP BY
+    sort), hence the INDEXED BY.
+    """
+    if since is None:
+        source, where, params = "daily_topic_activity a", "", (user_id,)
+    else:
+        source = "daily_topic_activity a INDEXED BY idx_daily_topic_activity_day"
+        where, params = "AND a.day >= ?", (user_id, since)
+    cur = await db.execute(
+        f"""
+        SELECT t.name AS topic, SUM(a.solved) AS solved, SUM(a.attempted) AS attempted
+        FROM {source}
+        JOIN topics t ON t.id = a.topic_id
+        WHERE a.user_id = ? {where} AND a.topic_id != 0
+        GROUP BY a.topic_id
+        ORDER BY solved DESC, attempted DESC, t.name;
+        """,
+        params,
+    )
+    return [dict(r) for r in await cur.fetchall()]
+
+
+def _listing_filters(
+    difficulty: Optional[str], status: Optional[str], topic: Optional[str]
+) -> Tuple[List[str], List]:
+    """
+    WHERE fragments shared by the catalog and history listings.
+    Expects `p` = problems and `up` = user_problems in the query.
+    """
+    where: List[str] = []
+    params: List = []
     if difficulty:
         where.append("p.difficulty = ?")
         params.append(difficulty)
+    if status == "not_started":
+        where.append("up.status IS NULL")
+    elif status:
+        where.append("up.status = ?")
+        params.append(status)
+    if topic:
+        where.append(
+            """EXISTS (
+                SELECT 1 FROM problem_topics pt
+                WHERE pt.problem_id = p.id
+                  AND pt.topic_id = (SELECT id FROM topics WHERE name = ?)
+            )"""
+        )
+        params.append(topic.strip().lower())
+    return where, params
 
-    where_sql = ("WHERE " + " AND ".join(where)) if where else ""
+
+async def list_problems_with_status(
+    db: aiosqlite.Connection,
+    user_id: int,
+    limit: int = 50,
+    after_id: Optional[int] = None,
+    difficulty: Optional[str] = None,
+    status: Optional[str] = None,
+    topic: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Catalog page, newest first, keyed on problems.id.
+    Pass the last row's id as `after_id` to get the next page.
+    """
+    where, params = _listing_filters(difficulty, status, topic)
+    if after_id is not None:
+        where.append("p.id < ?")
+        params.append(after_id)
+    clause = ("WHERE " + " AND ".join(where)) if where else ""
 
     cur = await db.execute(
         f"""
         SELECT
-            p.slug, p.title, p.difficulty, p.topics,
+            p.id, p.slug, p.title, p.difficulty, p.topics,
             COALESCE(up.status, 'not_started') AS status
         FROM problems p
         LEFT JOIN user_problems up
             ON up.problem_id = p.id AND up.user_id = ?
-        {where_sql}
-        LIMIT 500;
+        {clause}
+        ORDER BY p.id DESC
+        LIMIT ?;
         """,
-        (user_id, *params),
+        (user_id, *params, limit),
     )
-    rows = [dict(r) for r in await cur.fetchall()]
-
-    weak = set(t.strip().lower() for t in weak_topics if t.strip())
-
-    def score(row: Dict) -> int:
-        s = 0
-        topics = [x.strip().lower() for x in (row["topics"] or "").split(",") if x.strip()]
-        if row["status"] == "solved":
-            s -= 100
-        if weak and any(t in weak for t in topics):
-            s += 5
-        # Encourage Medium by default if user doesn’t specify
-        if not difficulty and row["difficulty"] == "Medium":
-            s += 2
-        return s
+    rows = await cur.fetchall()
+    return [dict(r) for r in rows]
 
-    rows.sort(key=score, reverse=True)
-    return rows[:limit]
 
-async def get_user_problem_history(db: aiosqlite.Connection, user_id: int, limit: int = 50) -> List[Dict]:
+async def get_user_problem_history(
+    db: aiosqlite.Connection,
+    user_id: int,
+    limit: int = 50,
+    before: Optional[Tuple[str, int]] = None,
+    difficulty: Optional[str] = None,
+    status: Optional[str] = None,
+    topic: Optional[str] = None,
+) -> List[Dict]:
     """
     Returns latest problems the user interacted with (solved/attempted),
     with topics + difficulty.
+    Keyed on (last_updated, problem_id); pass the last row's pair as
+    `before` to get the next page.
     """
+    where, params = _listing_filters(difficulty, status, topic)
+    if before is not None:
+        where.append("(up.last_updated, up.problem_id) < (?, ?)")
+        params.extend(before)
+    clause = "".join(" AND " + w for w in where)
+
     cur = await db.execute(
-        """
+        f"""
         SELECT
-            p.slug, p.title, p.difficulty, p.topics,
+            up.problem_id, p.slug, p.title, p.difficulty, p.topics,
             up.status, up.last_updated
         FROM user_problems up
         JOIN problems p ON p.id = up.problem_id
-        WHERE up.user_id = ?
-        ORDER BY up.last_updated DESC
+        WHERE up.user_id = ?{clause}
+        ORDER BY up.last_updated DESC, up.problem_id DESC
         LIMIT ?;
         """,
-        (user_id, limit),
+        (user_id, *params, limit),
     )
     rows = await cur.fetchall()
     return [dict(r) for r in rows]
@@ -182,27 +621,168 @@ async def get_user_problem_history(db: aiosqlite.Connection, user_id: int, limit
 
 async def get_user_topic_stats(db: aiosqlite.Connection, user_id: int) -> Dict:
     """
-    Computes simple counts by topic for solved/attempted.
-    topics stored as CSV in problems.topics.
+    Solved/attempted counts by topic, read from the materialized
+    user_topic_stats table (see backend/topic_stats.py to verify/rebuild).
     """
     cur = await db.execute(
         """
-        SELECT p.topics, up.status
-        FROM user_problems up
-        JOIN problems p ON p.id = up.problem_id
-        WHERE up.user_id = ?;
+        SELECT t.name, s.solved, s.attempted
+        FROM user_topic_stats s
+        JOIN topics t ON t.id = s.topic_id
+        WHERE s.user_id = ?;
         """,
         (user_id,),
     )
     rows = await cur.fetchall()
 
-    solved = {}
-    attempted = {}
+    solved = {r["name"]: r["solved"] for r in rows if r["solved"]}
+    attempted = {r["name"]: r["attempted"] for r in rows if r["attempted"]}
+    return {"solved": solved, "attempted": attempted}
 
-    for r in rows:
-        topics = [t.strip().lower() for t in (r["topics"] or "").split(",") if t.strip()]
-        target = solved if r["status"] == "solved" else attempted
-        for t in topics:
-            target[t] = target.get(t, 0) + 1
 
-    return {"solved": solved, "attempted": attempted}
+# ---------- Reflections ----------
+_REFLECTION_COLUMNS = """
+    r.id, p.slug, p.title, r.notes, r.ai_feedback, r.feedback_state, r.created_at
+"""
+
+SNIPPET_OPEN = "<mark>"
+SNIPPET_CLOSE = "</mark>"
+
+_FTS_TOKEN = re.compile(r"\w+\*?", re.UNICODE)
+
+
+def fts_query(q: str) -> Optional[str]:
+    """
+    Turns free text into a safe FTS5 MATCH expression: every word becomes a
+    quoted phrase (so operators/quotes in user input are inert) and the
+    phrases are ANDed. A trailing * on a word keeps prefix matching.
+    Returns None when there is nothing searchable.
+    """
+    terms = []
+    for tok in _FTS_TOKEN.findall(q or ""):
+        prefix = tok.endswith("*")
+        word = tok.rstrip("*")
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms) if terms else None
+
+
+async def create_reflection(db: aiosqlite.Connection, user_id: int, problem_id: int, notes: str) -> Dict:
+    cur = await db.execute(
+        "INSERT INTO reflections(user_id, problem_id, notes) VALUES(?, ?, ?);",
+        (user_id, problem_id, notes),
+    )
+    return await get_reflection(db, user_id, cur.lastrowid)
+
+
+async def get_reflection(db: aiosqlite.Connection, user_id: int, reflection_id: int) -> Optional[Dict]:
+    cur = await db.execute(
+        f"""
+        SELECT {_REFLECTION_COLUMNS}
+        FROM reflections r
+        JOIN problems p ON p.id = r.problem_id
+        WHERE r.id = ? AND r.user_id = ?;
+        """,
+        (reflection_id, user_id),
+    )
+    row = await cur.fetchone()
+    return dict(row) if row else None
+
+
+async def list_reflections(
+    db: aiosqlite.Connection,
+    user_id: int,
+    limit: int = 50,
+    before_id: Optional[int] = None,
+    problem_id: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Newest first, keyed on reflections.id (idx_reflections_user).
+    """
+    where = ["r.user_id = ?"]
+    params: List = [user_id]
+    if before_id is not None:
+        where.append("r.id < ?")
+        params.append(before_id)
+    if problem_id is not None:
+        where.append("r.problem_id = ?")
+        params.append(problem_id)
+
+    cur = await db.execute(
+        f"""
+        SELECT {_REFLECTION_COLUMNS}
+        FROM reflections r
+        JOIN problems p ON p.id = r.problem_id
+        WHERE {" AND ".join(where)}
+        ORDER BY r.id DESC
+        LIMIT ?;
+        """,
+        (*params, limit),
+    )
+    rows = await cur.fetchall()
+    return [dict(r) for r in rows]
+
+
+async def insert_reflections(
+    db: aiosqlite.Connection, user_id: int, rows: List[Tuple[int, str, str, Optional[str]]]
+) -> int:
+    """
+    Inserts (problem_id, notes, ai_feedback, created_at) rows, skipping exact
+    duplicates so re-running an import is harmless. Rows that come with
+    feedback are marked done. The caller owns the transaction.
+    """
+    if not rows:
+        return 0
+    cur = await db.executemany(
+        """
+        INSERT INTO reflections (user_id, problem_id, notes, ai_feedback, created_at, feedback_state)
+        SELECT ?1, ?2, ?3, ?4, COALESCE(?5, datetime('now')), CASE WHEN ?4 != '' THEN 'done' ELSE 'pending' END
+        WHERE NOT EXISTS (
+            SELECT 1 FROM reflections
+            WHERE user_id = ?1 AND problem_id = ?2 AND notes = ?3 AND created_at IS COALESCE(?5, created_at)
+        );
+        """,
+        [(user_id, pid, notes, feedback or "", created_at) for pid, notes, feedback, created_at in rows],
+    )
+    return max(cur.rowcount, 0)
+
+
+async def search_reflections(
+    db: aiosqlite.Connection,
+    user_id: int,
+    match: str,
+    limit: int = 20,
+    after: Optional[Tuple[float, int]] = None,
+) -> List[Dict]:
+    """
+    Full-text search over the user's reflections, best match first.
+
+    `match` must already be an FTS5 expression (see fts_query). Ordered by
+    (bm25 rank, id); pass the last row's pair as `after` for the next page.
+    """
+    keyset = ""
+    params: List = [SNIPPET_OPEN, SNIPPET_CLOSE, SNIPPET_OPEN, SNIPPET_CLOSE, match, user_id]
+    if after is not None:
+        keyset = "AND (bm25(reflections_fts), r.id) > (?, ?)"
+        params.extend(after)
+
+    cur = await db.execute(
+        f"""
+        SELECT
+            r.id, p.slug, p.title, r.created_at,
+            snippet(reflections_fts, 0, ?, ?, '…', 16) AS notes_snippet,
+            snippet(reflections_fts, 1, ?, ?, '…', 16) AS feedback_snippet,
+            bm25(reflections_fts) AS rank
+        FROM reflections_fts
+        JOIN reflections r ON r.id = reflections_fts.rowid
+        JOIN problems p ON p.id = r.problem_id
+        WHERE reflections_fts MATCH ?
+          AND r.user_id = ?
+          {keyset}
+        ORDER BY rank, r.id
+        LIMIT ?;
+        """,
+        (*params, limit),
+    )
+    rows = await cur.fetchall()
+    return [dict(r) for r in rows]
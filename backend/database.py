@@ -1,92 +1,758 @@
 # DB connection
 # backend/database.py
+import os
+import asyncio
+import random
+import sqlite3
+import time
 import aiosqlite
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, List, Optional
 from pathlib import Path
 
-DB_PATH = str(Path(__file__).resolve().parent / "app.db")
+from backend import metrics
 
+DB_PATH = os.getenv("DB_PATH", str(Path(__file__).resolve().parent / "app.db"))
 
-async def get_db() -> AsyncGenerator[aiosqlite.Connection, None]:
+# Pool sizing + per-connection tuning (see apply_pragmas)
+DB_READERS = int(os.getenv("DB_READERS", "8"))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", str(16 * 1024)))
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL").upper()
+
+# Group commit (see ConnectionPool.writer): at most this many writer() blocks
+# share one transaction (1 = a commit per block), and a batch waits up to the
+# window for more blocks once the queue runs dry (0 = only what's already queued)
+DB_GROUP_COMMIT_MAX = int(os.getenv("DB_GROUP_COMMIT_MAX", "64"))
+DB_GROUP_COMMIT_WINDOW_MS = float(os.getenv("DB_GROUP_COMMIT_WINDOW_MS", "0"))
+# BEGIN IMMEDIATE attempts beyond busy_timeout when another process holds the write lock
+DB_WRITE_RETRIES = int(os.getenv("DB_WRITE_RETRIES", "3"))
+
+
+async def apply_pragmas(db: aiosqlite.Connection, read_only: bool = False) -> None:
+    # WAL lets readers run alongside the single writer; NORMAL is durable in WAL mode
+    # (FULL adds an fsync per commit, which group commit then shares across a batch)
+    await db.execute("PRAGMA journal_mode = WAL;")
+    await db.execute(f"PRAGMA synchronous = {DB_SYNCHRONOUS};")
+    await db.execute("PRAGMA foreign_keys = ON;")
+    await db.execute(f"PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS};")
+    await db.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE};")
+    # negative cache_size = KiB budget instead of pages
+    await db.execute(f"PRAGMA cache_size = -{DB_CACHE_SIZE_KB};")
+    await db.execute("PRAGMA temp_store = MEMORY;")
+    if read_only:
+        await db.execute("PRAGMA query_only = ON;")
+
+
+async def _open_connection(read_only: bool = False) -> aiosqlite.Connection:
     db = await aiosqlite.connect(DB_PATH)
     db.row_factory = aiosqlite.Row
+    if metrics.METRICS_ENABLED:
+        db = metrics.TimedConnection(db)
+    await apply_pragmas(db, read_only=read_only)
+    return db
+
+
+def _is_busy(exc: sqlite3.OperationalError) -> bool:
+    msg = str(exc).lower()
+    return "locked" in msg or "busy" in msg
+
+
+def _resolve(fut: asyncio.Future, result=None, exc: Optional[BaseException] = None) -> None:
+    # either side may have given up on a slot future (cancelled) before it resolves
+    if not fut.done():
+        if exc is not None:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(result)
+
+
+class _WriteSlot:
+    """One writer() block: queued, running inside a batch, or waiting for its commit."""
+
+    __slots__ = ("queued_at", "turn", "done", "committed")
+
+    def __init__(self):
+        loop = asyncio.get_running_loop()
+        self.queued_at = time.perf_counter()
+        # writer task -> block: the savepoint is open, here's the connection
+        self.turn: asyncio.Future = loop.create_future()
+        # block -> writer task: True to keep its changes, False to roll them back
+        self.done: asyncio.Future = loop.create_future()
+        # writer task -> block: the batch's COMMIT landed (or failed)
+        self.committed: asyncio.Future = loop.create_future()
+
+
+class ConnectionPool:
+    """
+    Application-scoped SQLite connections: N read-only connections handed out
+    one request at a time, plus a single writer connection owned by a writer
+    task that group-commits writer() blocks.
+    """
+
+    def __init__(
+        self,
+        readers: int = DB_READERS,
+        group_commit_max: int = DB_GROUP_COMMIT_MAX,
+        group_commit_window_ms: float = DB_GROUP_COMMIT_WINDOW_MS,
+    ):
+        self.size = max(1, readers)
+        self.group_commit_max = max(1, group_commit_max)
+        self.group_commit_window = max(0.0, group_commit_window_ms) / 1000
+        self._readers: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
+        self._all: List[aiosqlite.Connection] = []
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_queue: "asyncio.Queue[_WriteSlot]" = asyncio.Queue()
+        self._write_task: Optional[asyncio.Task] = None
+        self._write_stats = {"batches": 0, "writes": 0, "rolled_back": 0, "failed_batches": 0, "busy_retries": 0}
+
+    async def open(self) -> None:
+        # open the writer first so WAL mode is set before readers attach
+        self._writer = await _open_connection()
+        self._all.append(self._writer)
+        for _ in range(self.size):
+            db = await _open_connection(read_only=True)
+            self._all.append(db)
+            self._readers.put_nowait(db)
+        self._write_task = asyncio.create_task(self._write_loop(), name="db-writer")
+
+    async def close(self) -> None:
+        if self._write_task is not None:
+            self._write_task.cancel()
+            try:
+                await self._write_task
+            except asyncio.CancelledError:
+                pass
+            self._write_task = None
+        while not self._write_queue.empty():
+            _resolve(self._write_queue.get_nowait().turn, exc=RuntimeError("Database pool is closed"))
+        for db in self._all:
+            await db.close()
+        self._all.clear()
+        self._writer = None
+
+    def stats(self) -> dict:
+        return {
+            "readers": self.size,
+            "readers_idle": self._readers.qsize(),
+            "writes_queued": self._write_queue.qsize(),
+            **self._write_stats,
+        }
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        db = await self._readers.get()
+        try:
+            yield db
+        finally:
+            self._readers.put_nowait(db)
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Runs the block inside the writer task's current transaction, under its
+        own savepoint: an exception rolls back only this block's changes. On a
+        clean exit it waits until the batch's COMMIT has landed, so the caller
+        still only returns once its write is durable (or raises if it wasn't).
+        """
+        if self._write_task is None:
+            raise RuntimeError("Database pool is not open; call open_pool() at startup")
+        slot = _WriteSlot()
+        self._write_queue.put_nowait(slot)
+        try:
+            db = await slot.turn
+        except BaseException:
+            # cancelled just as the turn came: hand it straight back
+            if slot.turn.done() and not slot.turn.cancelled() and slot.turn.exception() is None:
+                _resolve(slot.done, False)
+            raise
+        try:
+            yield db
+        except BaseException:
+            _resolve(slot.done, False)
+            if slot.committed.done() and not slot.committed.cancelled():
+                # the batch already failed under the running block; mark it seen
+                slot.committed.exception()
+            raise
+        _resolve(slot.done, True)
+        await slot.committed
+
+    # ---------- Group commit ----------
+    async def _begin(self, db: aiosqlite.Connection) -> None:
+        # IMMEDIATE takes the write lock up front; busy_timeout already waited
+        # inside SQLite, the retries cover other workers holding it for longer
+        if db.in_transaction:
+            await db.rollback()
+        for attempt in range(DB_WRITE_RETRIES + 1):
+            try:
+                await db.execute("BEGIN IMMEDIATE;")
+                return
+            except sqlite3.OperationalError as exc:
+                if not _is_busy(exc) or attempt == DB_WRITE_RETRIES:
+                    raise
+            self._write_stats["busy_retries"] += 1
+            metrics.db_write_busy_retries.inc()
+            await asyncio.sleep(min(1.0, 0.05 * 2 ** attempt) * random.uniform(0.5, 1.5))
+
+    async def _next_slot(self, deadline: float) -> Optional[_WriteSlot]:
+        try:
+            return self._write_queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        timeout = deadline - asyncio.get_running_loop().time()
+        if timeout <= 0:
+            return None
+        try:
+            return await asyncio.wait_for(self._write_queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def _run_slot(self, db: aiosqlite.Connection, slot: _WriteSlot, savepoint: bool) -> bool:
+        """
+        Hands the connection to one block; True if its changes stay in the
+        batch. The first block of a transaction runs without a savepoint:
+        rolling it back is rolling back the transaction (and beginning anew).
+        """
+        if savepoint:
+            await db.execute("SAVEPOINT write_slot;")
+        metrics.db_write_wait_seconds.observe(time.perf_counter() - slot.queued_at)
+        slot.turn.set_result(db)
+        keep = await asyncio.shield(slot.done)
+        if not db.in_transaction and (keep or savepoint):
+            # a block committed or SQLite rolled back on an error: the earlier
+            # blocks of this batch can no longer be vouched for
+            raise sqlite3.OperationalError("write transaction ended inside a writer() block")
+        if savepoint:
+            if not keep:
+                await db.execute("ROLLBACK TO write_slot;")
+            await db.execute("RELEASE write_slot;")
+        elif not keep:
+            await self._begin(db)
+        return keep
+
+    def _fail_batch(self, batch: List[_WriteSlot], exc: BaseException) -> None:
+        self._write_stats["failed_batches"] += 1
+        for slot in batch:
+            # includes a block still running (pool closing): it waits for a commit next
+            if not (slot.done.done() and not slot.done.cancelled() and slot.done.result() is False):
+                _resolve(slot.committed, exc=exc)
+
+    async def _write_loop(self) -> None:
+        """
+        The single writer task: takes the first queued block, BEGINs, then keeps
+        running blocks that are queued behind it (up to group_commit_max) in the
+        same transaction, and resolves all of them with one COMMIT. Under load
+        the queue fills while a batch runs, so batches grow with it.
+        """
+        db = self._writer
+        loop = asyncio.get_running_loop()
+        while True:
+            slot = await self._write_queue.get()
+            if slot.turn.done():
+                continue
+            try:
+                await self._begin(db)
+            except Exception as exc:
+                _resolve(slot.turn, exc=exc)
+                continue
+
+            deadline = loop.time() + self.group_commit_window
+            batch: List[_WriteSlot] = []
+            ran = 0
+            try:
+                while slot is not None:
+                    if not slot.turn.done():
+                        ran += 1
+                        batch.append(slot)
+                        if not await self._run_slot(db, slot, savepoint=len(batch) > 1):
+                            batch.pop()
+                            self._write_stats["rolled_back"] += 1
+                    if ran >= self.group_commit_max:
+                        break
+                    slot = await self._next_slot(deadline)
+                await db.commit()
+            except asyncio.CancelledError:
+                self._fail_batch(batch, RuntimeError("Database pool is closed"))
+                raise
+            except Exception as exc:
+                self._fail_batch(batch, exc)
+                try:
+                    if db.in_transaction:
+                        await db.rollback()
+                except Exception:
+                    pass
+                continue
+
+            for s in batch:
+                _resolve(s.committed)
+            if ran:
+                self._write_stats["batches"] += 1
+                self._write_stats["writes"] += len(batch)
+                metrics.db_write_batch_size.observe(ran)
+
+
+_pool: Optional[ConnectionPool] = None
+
+
+async def open_pool(readers: int = DB_READERS) -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        pool = ConnectionPool(readers)
+        await pool.open()
+        _pool = pool
+    return _pool
+
+
+async def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.close()
+
+
+def get_pool() -> ConnectionPool:
+    if _pool is None:
+        raise RuntimeError("Database pool is not open; call open_pool() at startup")
+    return _pool
+
+
+def pool_stats() -> dict:
+    return _pool.stats() if _pool is not None else {}
+
+
+def reader():
+    """Borrow a read-only pooled connection: `async with reader() as db: ...`"""
+    return get_pool().reader()
+
+
+def writer():
+    """
+    A turn on the writer connection, committed together with whatever other
+    writer() blocks were queued alongside it; keep the block short, and don't
+    commit or nest writer() inside it.
+    """
+    return get_pool().writer()
+
+
+@asynccontextmanager
+async def snapshot_reader() -> AsyncIterator[aiosqlite.Connection]:
+    """
+    A dedicated read-only connection inside one read transaction, for long
+    streaming reads (exports): every query sees the same snapshot, and a slow
+    client doesn't tie up a pooled reader. Keep these rare; an open read
+    transaction holds back WAL checkpoints.
+    """
+    db = await _open_connection(read_only=True)
     try:
+        await db.execute("BEGIN;")
         yield db
     finally:
-        await db.close()
+        try:
+            await db.rollback()
+        finally:
+            await db.close()
 
 
-async def init_db() -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute("PRAGMA foreign_keys = ON;")
+async def get_db() -> AsyncGenerator[aiosqlite.Connection, None]:
+    async with reader() as db:
+        yield db
 
-        # users
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT UNIQUE NOT NULL,
-                hashed_password TEXT NOT NULL,
-                created_at TEXT DEFAULT (datetime('now'))
-            );
-            """
-        )
 
-        # leetcode link (one per user for MVP)
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS leetcode_links (
-                user_id INTEGER PRIMARY KEY,
-                username TEXT NOT NULL,
-                updated_at TEXT DEFAULT (datetime('now')),
-                FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
-            );
-            """
-        )
+# ---------- Schema migrations ----------
+async def _ensure_column(db: aiosqlite.Connection, table: str, column: str, decl: str) -> None:
+    cur = await db.execute(f"PRAGMA table_info({table});")
+    if column not in {r[1] for r in await cur.fetchall()}:
+        await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl};")
 
-        # problems catalog
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS problems (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                slug TEXT UNIQUE NOT NULL,
-                title TEXT NOT NULL,
-                difficulty TEXT NOT NULL,
-                topics TEXT DEFAULT '',
-                created_at TEXT DEFAULT (datetime('now'))
-            );
-            """
-        )
 
-        # per-user problem status
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS user_problems (
-                user_id INTEGER NOT NULL,
-                problem_id INTEGER NOT NULL,
-                status TEXT NOT NULL,              -- "solved" | "attempted" | "not_started"
-                last_updated TEXT DEFAULT (datetime('now')),
-                PRIMARY KEY(user_id, problem_id),
-                FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
-                FOREIGN KEY(problem_id) REFERENCES problems(id) ON DELETE CASCADE
-            );
-            """
-        )
+async def _backfill_problem_topics(db: aiosqlite.Connection) -> None:
+    # migrate CSV topics of problems that have no problem_topics rows yet
+    from backend import crud
+
+    cur = await db.execute(
+        """
+        SELECT p.id, p.topics FROM problems p
+        WHERE p.topics != ''
+          AND NOT EXISTS (SELECT 1 FROM problem_topics pt WHERE pt.problem_id = p.id);
+        """
+    )
+    pending = {r[0]: r[1] for r in await cur.fetchall()}
+    await crud.sync_problem_topics(db, pending)
+
+
+async def _backfill_user_topic_stats(db: aiosqlite.Connection) -> None:
+    # first boot with the stats table on an existing history
+    from backend import topic_stats
+
+    cur = await db.execute(
+        "SELECT EXISTS (SELECT 1 FROM user_problems) AND NOT EXISTS (SELECT 1 FROM user_topic_stats);"
+    )
+    if (await cur.fetchone())[0]:
+        await topic_stats.rebuild(db)
+
+
+async def _backfill_daily_topic_activity(db: aiosqlite.Connection) -> None:
+    # first boot with the dashboard rollup on an existing history
+    from backend import activity_rollup
+
+    cur = await db.execute(
+        "SELECT EXISTS (SELECT 1 FROM user_problems) AND NOT EXISTS (SELECT 1 FROM daily_topic_activity);"
+    )
+    if (await cur.fetchone())[0]:
+        await activity_rollup.rebuild(db)
+
+
+async def _create_reflections_fts(db: aiosqlite.Connection) -> None:
+    """
+    Full-text index over reflections.notes / ai_feedback.
+
+    External-content FTS5 table: the text lives only in `reflections`, the
+    index is kept in sync by triggers. The update trigger is limited to the
+    indexed columns so unrelated updates don't churn the index.
+    """
+    cur = await db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'reflections_fts';"
+    )
+    exists = await cur.fetchone() is not None
+
+    await db.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS reflections_fts USING fts5(
+            notes,
+            ai_feedback,
+            content='reflections',
+            content_rowid='id',
+            tokenize='porter unicode61'
+        );
+        """
+    )
+    await db.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS reflections_fts_ai AFTER INSERT ON reflections BEGIN
+            INSERT INTO reflections_fts(rowid, notes, ai_feedback)
+            VALUES (new.id, new.notes, new.ai_feedback);
+        END;
+        """
+    )
+    await db.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS reflections_fts_ad AFTER DELETE ON reflections BEGIN
+            INSERT INTO reflections_fts(reflections_fts, rowid, notes, ai_feedback)
+            VALUES ('delete', old.id, old.notes, old.ai_feedback);
+        END;
+        """
+    )
+    await db.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS reflections_fts_au
+        AFTER UPDATE OF notes, ai_feedback ON reflections BEGIN
+            INSERT INTO reflections_fts(reflections_fts, rowid, notes, ai_feedback)
+            VALUES ('delete', old.id, old.notes, old.ai_feedback);
+            INSERT INTO reflections_fts(rowid, notes, ai_feedback)
+            VALUES (new.id, new.notes, new.ai_feedback);
+        END;
+        """
+    )
+
+    if not exists:
+        # index reflections written before the FTS table existed
+        await db.execute("INSERT INTO reflections_fts(reflections_fts) VALUES ('rebuild');")
+
+
+async def _migration_1_baseline(db: aiosqlite.Connection) -> None:
+    """
+    The schema as of the switch to versioned migrations. Every step is
+    idempotent, so it also adopts databases from earlier unversioned builds
+    (user_version 0) in whatever shape they were left.
+    """
+    # users
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE NOT NULL,
+            hashed_password TEXT NOT NULL,
+            history_version INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT DEFAULT (datetime('now'))
+        );
+        """
+    )
+    # bumped on every status write; keys the mentor response cache
+    await _ensure_column(db, "users", "history_version", "INTEGER NOT NULL DEFAULT 0")
+
+    # leetcode link (one per user for MVP)
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS leetcode_links (
+            user_id INTEGER PRIMARY KEY,
+            username TEXT NOT NULL,
+            updated_at TEXT DEFAULT (datetime('now')),
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+        );
+        """
+    )
+
+    # problems catalog
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS problems (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            slug TEXT UNIQUE NOT NULL,
+            title TEXT NOT NULL,
+            difficulty TEXT NOT NULL,
+            topics TEXT DEFAULT '',
+            content_hash TEXT,
+            created_at TEXT DEFAULT (datetime('now'))
+        );
+        """
+    )
+    # databases created before the catalog importer
+    await _ensure_column(db, "problems", "content_hash", "TEXT")
 
-        # reflections
+    # normalized topic index (problems.topics stays as the display CSV)
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS topics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL
+        );
+        """
+    )
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS problem_topics (
+            problem_id INTEGER NOT NULL,
+            topic_id INTEGER NOT NULL,
+            PRIMARY KEY(problem_id, topic_id),
+            FOREIGN KEY(problem_id) REFERENCES problems(id) ON DELETE CASCADE,
+            FOREIGN KEY(topic_id) REFERENCES topics(id) ON DELETE CASCADE
+        ) WITHOUT ROWID;
+        """
+    )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_problem_topics_topic ON problem_topics(topic_id, problem_id);"
+    )
+    # keyset paging for /leetcode/problems?difficulty=...
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_problems_difficulty ON problems(difficulty, id);"
+    )
+
+    # problem embeddings (backend/embeddings.py): vectors live in a float32
+    # file per model next to the database, these tables map problems to rows
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS embedding_matrices (
+            model TEXT PRIMARY KEY,
+            dim INTEGER NOT NULL,
+            rows INTEGER NOT NULL DEFAULT 0
+        );
+        """
+    )
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS problem_embeddings (
+            model TEXT NOT NULL,
+            problem_id INTEGER NOT NULL,
+            row_index INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            PRIMARY KEY(model, problem_id),
+            FOREIGN KEY(problem_id) REFERENCES problems(id) ON DELETE CASCADE
+        ) WITHOUT ROWID;
+        """
+    )
+
+    # per-user problem status
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_problems (
+            user_id INTEGER NOT NULL,
+            problem_id INTEGER NOT NULL,
+            status TEXT NOT NULL,              -- "solved" | "attempted" | "not_started"
+            last_updated TEXT DEFAULT (datetime('now')),
+            ease REAL NOT NULL DEFAULT 2.5,
+            interval_days INTEGER NOT NULL DEFAULT 0,
+            repetitions INTEGER NOT NULL DEFAULT 0,
+            next_review_at TEXT,
+            PRIMARY KEY(user_id, problem_id),
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY(problem_id) REFERENCES problems(id) ON DELETE CASCADE
+        );
+        """
+    )
+
+    # spaced-repetition schedule (backend/review_schedule.py); existing rows stay
+    # unscheduled (NULL) until `python -m backend.review_schedule --only-missing`
+    await _ensure_column(db, "user_problems", "ease", "REAL NOT NULL DEFAULT 2.5")
+    await _ensure_column(db, "user_problems", "interval_days", "INTEGER NOT NULL DEFAULT 0")
+    await _ensure_column(db, "user_problems", "repetitions", "INTEGER NOT NULL DEFAULT 0")
+    await _ensure_column(db, "user_problems", "next_review_at", "TEXT")
+
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_problems_problem ON user_problems(problem_id);"
+    )
+    # /review/due: range scan over one user's scheduled rows only
+    await db.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_user_problems_due
+        ON user_problems(user_id, next_review_at, problem_id)
+        WHERE next_review_at IS NOT NULL;
+        """
+    )
+    # keyset paging for /leetcode/history: seek on (user_id, last_updated, problem_id)
+    # and read status straight from the index
+    await db.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_user_problems_recent
+        ON user_problems(user_id, last_updated, problem_id, status);
+        """
+    )
+
+    # per-user solved/attempted counts by topic, maintained by crud._write_statuses
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_topic_stats (
+            user_id INTEGER NOT NULL,
+            topic_id INTEGER NOT NULL,
+            solved INTEGER NOT NULL DEFAULT 0,
+            attempted INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY(user_id, topic_id),
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY(topic_id) REFERENCES topics(id) ON DELETE CASCADE
+        ) WITHOUT ROWID;
+        """
+    )
+
+    # status changes per user / local day / topic for the growth dashboard,
+    # maintained by crud._write_statuses (topic_id 0 = all problems, so no FK)
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_topic_activity (
+            user_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            topic_id INTEGER NOT NULL,
+            solved INTEGER NOT NULL DEFAULT 0,
+            attempted INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY(user_id, topic_id, day),
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+        ) WITHOUT ROWID;
+        """
+    )
+
+    # reflections
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS reflections (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            problem_id INTEGER NOT NULL,
+            notes TEXT NOT NULL,
+            ai_feedback TEXT DEFAULT '',
+            created_at TEXT DEFAULT (datetime('now')),
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY(problem_id) REFERENCES problems(id) ON DELETE CASCADE
+        );
+        """
+    )
+
+    # background AI feedback (backend/reflection_feedback.py):
+    # pending -> processing (leased at feedback_claimed_at) -> done | failed
+    cur = await db.execute("PRAGMA table_info(reflections);")
+    had_state = "feedback_state" in {r[1] for r in await cur.fetchall()}
+    await _ensure_column(db, "reflections", "feedback_state", "TEXT NOT NULL DEFAULT 'pending'")
+    await _ensure_column(db, "reflections", "feedback_claimed_at", "TEXT")
+    await _ensure_column(db, "reflections", "feedback_attempts", "INTEGER NOT NULL DEFAULT 0")
+    if not had_state:
         await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS reflections (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                problem_id INTEGER NOT NULL,
-                notes TEXT NOT NULL,
-                ai_feedback TEXT DEFAULT '',
-                created_at TEXT DEFAULT (datetime('now')),
-                FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
-                FOREIGN KEY(problem_id) REFERENCES problems(id) ON DELETE CASCADE
-            );
-            """
+            "UPDATE reflections SET feedback_state = 'done' WHERE COALESCE(ai_feedback, '') != '';"
         )
 
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_reflections_user ON reflections(user_id, id);"
+    )
+    # per-problem listing (?slug=) and duplicate checks on import
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_reflections_user_problem ON reflections(user_id, problem_id, id);"
+    )
+    await db.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_reflections_feedback
+        ON reflections(feedback_state, user_id, id)
+        WHERE feedback_state IN ('pending', 'processing');
+        """
+    )
+    await _create_reflections_fts(db)
+
+    await _backfill_problem_topics(db)
+    await _backfill_user_topic_stats(db)
+    await _backfill_daily_topic_activity(db)
+
+
+async def _migration_2_mentor_jobs(db: aiosqlite.Connection) -> None:
+    # mentor job state (backend/mentor_jobs.py), readable from every worker process
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS mentor_jobs (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            status TEXT NOT NULL,              -- "queued" | "running" | "done" | "failed"
+            result TEXT,                       -- MentorChatOut JSON
+            error TEXT,
+            created_at REAL NOT NULL,
+            finished_at REAL,
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+        ) WITHOUT ROWID;
+        """
+    )
+
+
+async def _migration_3_activity_by_day(db: aiosqlite.Connection) -> None:
+    # per-topic dashboard totals (crud.get_topic_activity): a range scan on one
+    # user's days, covering, instead of every row the user has in the rollup
+    await db.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_daily_topic_activity_day
+        ON daily_topic_activity(user_id, day, topic_id, solved, attempted);
+        """
+    )
+
+
+# Append-only: a shipped migration is never edited; schema changes add the next one.
+_MIGRATIONS = [
+    _migration_1_baseline,
+    _migration_2_mentor_jobs,
+    _migration_3_activity_by_day,
+]
+SCHEMA_VERSION = len(_MIGRATIONS)
+
+
+async def migrate(db: aiosqlite.Connection) -> int:
+    """
+    Applies the migrations past the database's PRAGMA user_version, all in
+    one transaction, and returns how many ran. On a current schema this is a
+    single header read and takes no lock.
+    """
+    cur = await db.execute("PRAGMA user_version;")
+    if (await cur.fetchone())[0] >= SCHEMA_VERSION:
+        return 0
+
+    await db.execute("BEGIN IMMEDIATE;")
+    try:
+        # another worker may have migrated while this one waited for the lock
+        cur = await db.execute("PRAGMA user_version;")
+        version = (await cur.fetchone())[0]
+        for number in range(version + 1, SCHEMA_VERSION + 1):
+            await _MIGRATIONS[number - 1](db)
+            await db.execute(f"PRAGMA user_version = {number};")
         await db.commit()
+    except BaseException:
+        await db.rollback()
+        raise
+    return max(0, SCHEMA_VERSION - version)
+
+
+async def init_db() -> None:
+    async with aiosqlite.connect(DB_PATH) as db:
+        await db.execute("PRAGMA foreign_keys = ON;")
+        await db.execute(f"PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS};")
+        await migrate(db)
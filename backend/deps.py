@@ -1,61 +1,158 @@
 # dependencies helpers
 # backend/deps.py
 import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from passlib.context import CryptContext
 
-from backend.database import get_db
-import aiosqlite
+from backend.cache import TTLCache
+from backend.database import reader
 from backend import crud
 
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
 SECRET_KEY = os.getenv("JWT_SECRET", "dev-secret-change-me")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_EXPIRE_MIN", "120"))
+# Authenticated principals are cached per process; other workers see an
+# invalidation after at most PRINCIPAL_CACHE_TTL seconds.
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "4096"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+ADMIN_EMAILS = {e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()}
+
+# Work factor; hashes made with other rounds are upgraded on next login
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "29000"))
+# Hashing runs on a small thread pool; past MAX_PENDING callers get a 503
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/token")
 
+_principals = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)  # user_id -> user
+_decoded_tokens = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)  # signature -> (signed part, user_id, exp)
+
+
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="pwhash")
+_hash_pending = 0
+_pwd_context: Optional["CryptContext"] = None
+
+
+def get_pwd_context() -> "CryptContext":
+    # passlib loads with the first sign-in instead of on every worker's boot
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        _pwd_context = CryptContext(
+            schemes=["pbkdf2_sha256"],
+            deprecated="auto",
+            pbkdf2_sha256__default_rounds=PASSWORD_HASH_ROUNDS,
+            pbkdf2_sha256__min_rounds=PASSWORD_HASH_ROUNDS,
+            pbkdf2_sha256__max_rounds=PASSWORD_HASH_ROUNDS,
+        )
+    return _pwd_context
+
 
-def hash_password(password: str) -> str:
+async def _run_hashing(fn, *args):
+    # pbkdf2 takes tens of ms; keep it off the event loop and bound the backlog
+    global _hash_pending
+    if _hash_pending >= PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def hash_password(password: str) -> str:
     # if len(password.encode("utf-8")) > 72:
     #     raise ValueError("Password too long (bcrypt limit is 72 bytes).")
-    return pwd_context.hash(password)
+    return await _run_hashing(get_pwd_context().hash, password)
+
 
+async def verify_password(password: str, hashed: str) -> bool:
+    return await _run_hashing(get_pwd_context().verify, password, hashed)
 
-def verify_password(password: str, hashed: str) -> bool:
-    return pwd_context.verify(password, hashed)
+
+async def verify_and_update_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """(ok, new_hash); new_hash is set when the stored hash uses outdated parameters."""
+    return await _run_hashing(get_pwd_context().verify_and_update, password, hashed)
 
 
 def create_access_token(sub: str) -> str:
+    from jose import jwt
+
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     payload = {"sub": sub, "exp": expire}
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: aiosqlite.Connection = Depends(get_db),
-):
+def _decode_user_id(token: str) -> int:
+    """JWT -> user id. Raises ValueError for bad tokens."""
+    signed, _, signature = token.rpartition(".")
+    hit = _decoded_tokens.get(signature)
+    if hit is not None and hit[0] == signed and hit[2] > time.time():
+        return hit[1]
+
+    # only a cache miss verifies the signature, so jose loads with the first one
+    from jose import JWTError, jwt
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError as exc:
+        raise ValueError(str(exc)) from exc
+    sub: Optional[str] = payload.get("sub")
+    if not sub:
+        raise ValueError("missing sub")
+    user_id = int(sub)
+    _decoded_tokens.set(signature, (signed, user_id, float(payload.get("exp", 0))))
+    return user_id
+
+
+def invalidate_principal(user_id: int) -> None:
+    """Call after deleting a user or changing their credentials."""
+    _principals.pop(user_id)
+    _decoded_tokens.pop_where(lambda _, v: v[1] == user_id)
+
+
+def principal_cache_stats() -> Dict:
+    return {"principals": _principals.stats(), "tokens": _decoded_tokens.stats()}
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     cred_exc = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid authentication",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        sub: Optional[str] = payload.get("sub")
-        if not sub:
-            raise cred_exc
-        user_id = int(sub)
-    except (JWTError, ValueError):
+        user_id = _decode_user_id(token)
+    except ValueError:
         raise cred_exc
 
-    user = await crud.get_user_by_id(db, user_id)
-    if not user:
-        raise cred_exc
+    user = _principals.get(user_id)
+    if user is None:
+        async with reader() as db:
+            user = await crud.get_user_by_id(db, user_id)
+        if not user:
+            raise cred_exc
+        _principals.set(user_id, user)
+    return user
+
+
+async def get_admin_user(user=Depends(get_current_user)):
+    # admins are configured via ADMIN_EMAILS (comma-separated)
+    if user["email"].lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
     return user
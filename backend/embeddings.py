@@ -0,0 +1,240 @@
+# backend/embeddings.py
+"""
+Problem embeddings for similar-problem search.
+
+Vectors live in a float32 matrix file next to the database (one file per
+embedding model, e.g. app.nomic-embed-text.f32), L2-normalized so a dot
+product is the cosine similarity. The database records which problem sits
+in which row and the hash of the text that was embedded:
+
+    embedding_matrices(model, dim, rows)
+    problem_embeddings(model, problem_id, row_index, content_hash)
+
+Reindexing only embeds problems that have no row yet or whose text changed.
+New problems are appended. Changed ones are overwritten in place, so a row
+keeps its index for life and readers can mmap the file while it grows.
+Rows of deleted problems are never referenced again.
+
+    python -m backend.embeddings [--backend hash] [--batch-size 64]
+
+EMBED_BACKEND=ollama uses Ollama's /api/embed (OLLAMA_EMBED_MODEL);
+EMBED_BACKEND=hash is a deterministic feature-hashing stand-in that needs no
+model, for tests and benchmarks.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend import crud
+from backend.database import DB_PATH, reader, writer
+from backend.ollama_client import OLLAMA_EMBED_MODEL, ollama_embed
+
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "ollama")
+EMBED_HASH_DIM = int(os.getenv("EMBED_HASH_DIM", "256"))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+# empty = the database's directory
+EMBEDDINGS_DIR = os.getenv("EMBEDDINGS_DIR") or os.path.dirname(os.path.abspath(DB_PATH))
+
+DTYPE = np.float32
+_WORD = re.compile(r"[a-z0-9]+")
+_FILE_UNSAFE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def problem_text(slug: str, title: str, difficulty: str, topics_csv: str) -> str:
+    """What gets embedded for a problem; content_hash is taken over this."""
+    topics = ", ".join(crud.parse_topics(topics_csv))
+    return f"{title}. Difficulty: {difficulty}. Topics: {topics or 'none'}. ({slug})"
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=DTYPE)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+# ---------- Backends ----------
+def _features(text: str) -> List[str]:
+    words = _WORD.findall(text.lower())
+    feats = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    feats += [f"#{w[i:i + 3]}" for w in words for i in range(max(1, len(w) - 2))]
+    return feats
+
+
+def hash_embed(texts: Sequence[str], dim: int = EMBED_HASH_DIM) -> np.ndarray:
+    """
+    Signed feature hashing of words, word pairs and character trigrams.
+    Deterministic across processes and machines; texts sharing vocabulary
+    land close together, which is all tests and benchmarks need.
+    """
+    out = np.zeros((len(texts), dim), dtype=DTYPE)
+    for i, text in enumerate(texts):
+        for feat in _features(text):
+            h = int.from_bytes(hashlib.blake2b(feat.encode("utf-8"), digest_size=8).digest(), "little")
+            out[i, h % dim] += 1.0 if h >> 63 else -1.0
+    return normalize(out)
+
+
+class Embedder:
+    """A model name plus an async batch embed(); the name keys the matrix file."""
+
+    def __init__(self, backend: str = EMBED_BACKEND):
+        if backend not in {"ollama", "hash"}:
+            raise ValueError(f"Unknown embedding backend: {backend}")
+        self.backend = backend
+        self.model = OLLAMA_EMBED_MODEL if backend == "ollama" else f"hash-{EMBED_HASH_DIM}"
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        if self.backend == "hash":
+            return hash_embed(texts)
+        return normalize(np.array(await ollama_embed(texts), dtype=DTYPE))
+
+
+def active_model(backend: str = EMBED_BACKEND) -> str:
+    return Embedder(backend).model
+
+
+def matrix_path(model: str) -> str:
+    stem = os.path.splitext(os.path.basename(DB_PATH))[0]
+    return os.path.join(EMBEDDINGS_DIR, f"{stem}.{_FILE_UNSAFE.sub('_', model)}.f32")
+
+
+# ---------- Storage ----------
+def _write_rows(path: str, dim: int, rows: List[int], vectors: np.ndarray) -> None:
+    # fsync before the caller commits the row mapping, so committed rows are on disk
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        row_bytes = dim * np.dtype(DTYPE).itemsize
+        for row, vec in zip(rows, vectors):
+            os.pwrite(fd, np.ascontiguousarray(vec, dtype=DTYPE).tobytes(), row * row_bytes)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+async def _store(model: str, items: List[Tuple[int, str]], vectors: np.ndarray) -> int:
+    """
+    Writes one embedded batch: (problem_id, content_hash) items with their
+    vectors. Returns how many rows were appended.
+    """
+    dim = vectors.shape[1]
+    ids_json = json.dumps([pid for pid, _ in items])
+    async with writer() as db:
+        # the INSERT takes the write lock first, so the row count read below
+        # can't be raced by another process appending to the same matrix
+        await db.execute(
+            "INSERT INTO embedding_matrices (model, dim, rows) VALUES (?, ?, 0) ON CONFLICT(model) DO NOTHING;",
+            (model, dim),
+        )
+        cur = await db.execute("SELECT dim, rows FROM embedding_matrices WHERE model = ?;", (model,))
+        stored_dim, count = await cur.fetchone()
+        if stored_dim != dim:
+            raise ValueError(f"{model} returned {dim}-d vectors, matrix has {stored_dim}")
+
+        cur = await db.execute(
+            """
+            SELECT problem_id, row_index FROM problem_embeddings
+            WHERE model = ? AND problem_id IN (SELECT value FROM json_each(?));
+            """,
+            (model, ids_json),
+        )
+        rows_by_id = {r[0]: r[1] for r in await cur.fetchall()}
+        appended = 0
+        for pid, _ in items:
+            if pid not in rows_by_id:
+                rows_by_id[pid] = count + appended
+                appended += 1
+
+        await asyncio.to_thread(
+            _write_rows, matrix_path(model), dim, [rows_by_id[pid] for pid, _ in items], vectors
+        )
+        await db.executemany(
+            """
+            INSERT INTO problem_embeddings (model, problem_id, row_index, content_hash)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(model, problem_id) DO UPDATE SET content_hash = excluded.content_hash;
+            """,
+            [(model, pid, rows_by_id[pid], h) for pid, h in items],
+        )
+        if appended:
+            await db.execute(
+                "UPDATE embedding_matrices SET rows = rows + ? WHERE model = ?;", (appended, model)
+            )
+    return appended
+
+
+async def stale_problems(model: str) -> Tuple[int, List[Tuple[int, str, str]]]:
+    """(catalog size, [(problem_id, text, content_hash)]) for rows needing an embedding."""
+    async with reader() as db:
+        cur = await db.execute(
+            "SELECT problem_id, content_hash FROM problem_embeddings WHERE model = ?;", (model,)
+        )
+        embedded = {r[0]: r[1] for r in await cur.fetchall()}
+        cur = await db.execute("SELECT id, slug, title, difficulty, topics FROM problems ORDER BY id;")
+        stale, total = [], 0
+        for pid, slug, title, difficulty, topics in await cur.fetchall():
+            total += 1
+            text = problem_text(slug, title, difficulty, topics or "")
+            h = text_hash(text)
+            if embedded.get(pid) != h:
+                stale.append((pid, text, h))
+    return total, stale
+
+
+async def reindex(embedder: Optional[Embedder] = None, batch_size: int = EMBED_BATCH_SIZE) -> Dict:
+    """
+    Embeds new and changed catalog rows, one model call and one transaction
+    per batch. An interrupted run keeps the batches it finished.
+    """
+    from backend import similarity
+
+    embedder = embedder or Embedder()
+    started = time.perf_counter()
+    total, stale = await stale_problems(embedder.model)
+    stats = {"model": embedder.model, "problems": total, "embedded": 0, "appended": 0}
+
+    for i in range(0, len(stale), max(1, batch_size)):
+        batch = stale[i : i + batch_size]
+        vectors = await embedder.embed([text for _, text, _ in batch])
+        stats["appended"] += await _store(embedder.model, [(pid, h) for pid, _, h in batch], vectors)
+        stats["embedded"] += len(batch)
+
+    if stats["embedded"]:
+        similarity.invalidate()
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+async def _main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+
+    from backend.database import init_db, open_pool, close_pool
+    from backend.ollama_client import close_client
+
+    parser = argparse.ArgumentParser(description="Embed new or changed problems for similar-problem search.")
+    parser.add_argument("--backend", choices=["ollama", "hash"], default=EMBED_BACKEND)
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    await init_db()
+    await open_pool(readers=1)
+    try:
+        stats = await reindex(Embedder(args.backend), batch_size=args.batch_size)
+    finally:
+        await close_client()
+        await close_pool()
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,68 @@
+# backend/json_stream.py
+import json
+from typing import List, Optional
+
+
+class ArrayItemStream:
+    """
+    Incremental scanner for streamed model output.
+
+    Feed it text chunks as they arrive; it returns every object of the
+    top-level `key` array as soon as that object's closing brace shows up,
+    without waiting for the rest of the document. Text before the first
+    `{` (model chatter) is ignored.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string: List[str] = []
+        self._last_key: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._done = False
+        self._item: Optional[List[str]] = None
+
+    def feed(self, text: str) -> List[dict]:
+        out = []
+        for ch in text:
+            if self._depth == 0 and ch != "{":
+                continue
+            if self._item is not None:
+                self._item.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = "".join(self._string)
+                elif self._depth == 1:
+                    self._string.append(ch)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string = []
+            elif ch == "{" or ch == "[":
+                self._depth += 1
+                if ch == "[" and self._depth == 2 and self._last_key == self.key and not self._done:
+                    self._array_depth = 2
+                elif ch == "{" and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._item = ["{"]
+            elif ch == "}" or ch == "]":
+                if ch == "}" and self._item is not None and self._depth == self._array_depth + 1:
+                    try:
+                        out.append(json.loads("".join(self._item)))
+                    except json.JSONDecodeError:
+                        pass
+                    self._item = None
+                elif ch == "]" and self._array_depth is not None and self._depth == self._array_depth:
+                    self._array_depth = None
+                    self._done = True
+                self._depth -= 1
+        return out
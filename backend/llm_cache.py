@@ -0,0 +1,177 @@
+# backend/llm_cache.py
+"""
+Cache for mentor responses.
+
+Keys fingerprint everything that shapes a generation, including the user's
+history_version (bumped on every status write), so a history change makes
+older entries unreachable. Hits come from a bounded in-memory LRU, then from
+an optional SQLite file (LLM_CACHE_DB) that survives restarts. Concurrent
+identical requests share one generation.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import aiosqlite
+
+from backend.cache import TTLCache
+
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+# path to a SQLite file for the persistent tier; empty = memory only
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "")
+
+
+def fingerprint(
+    model: str,
+    system: str,
+    message: str,
+    weak_topics: List[str],
+    target_difficulty: Optional[str],
+    limit: int,
+    history_version: int,
+) -> str:
+    raw = json.dumps(
+        [model, system, message.strip(), [t.strip() for t in weak_topics], target_difficulty, limit, history_version],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Abandoned(Exception):
+    """The caller computing a coalesced value was cancelled before it finished."""
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int, ttl_seconds: float, db_path: str = ""):
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self._memory = TTLCache(max_entries, ttl_seconds)
+        self._by_user: Dict[int, Set[str]] = {}
+        self._inflight: Dict[str, "asyncio.Future"] = {}
+        self._db: Optional[aiosqlite.Connection] = None
+        self.coalesced = 0
+        self.disk_hits = 0
+
+    async def open(self) -> None:
+        if not self.db_path or self._db is not None:
+            return
+        self._db = await aiosqlite.connect(self.db_path)
+        await self._db.execute("PRAGMA journal_mode = WAL;")
+        await self._db.execute("PRAGMA synchronous = NORMAL;")
+        await self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            """
+        )
+        await self._db.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache(expires_at);")
+        await self._db.execute("DELETE FROM llm_cache WHERE expires_at < ?;", (time.time(),))
+        await self._db.commit()
+
+    async def close(self) -> None:
+        if self._db is not None:
+            db, self._db = self._db, None
+            await db.close()
+
+    async def _load(self, key: str) -> Any:
+        if self._db is None:
+            return None
+        cur = await self._db.execute(
+            "SELECT value FROM llm_cache WHERE key = ? AND expires_at >= ?;", (key, time.time())
+        )
+        row = await cur.fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def _store(self, key: str, user_id: int, value: Any) -> None:
+        if self._db is None:
+            return
+        await self._db.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, user_id, value, expires_at) VALUES (?, ?, ?, ?);",
+            (key, user_id, json.dumps(value), time.time() + self.ttl_seconds),
+        )
+        await self._db.commit()
+
+    def _remember(self, key: str, user_id: int, value: Any) -> None:
+        self._memory.set(key, value)
+        keys = self._by_user.setdefault(user_id, set())
+        if len(keys) >= 32:
+            keys.intersection_update(k for k in keys if k in self._memory)
+        keys.add(key)
+
+    async def get(self, key: str, user_id: int) -> Any:
+        value = self._memory.get(key)
+        if value is None:
+            value = await self._load(key)
+            if value is not None:
+                self.disk_hits += 1
+                self._remember(key, user_id, value)
+        return value
+
+    async def put(self, key: str, user_id: int, value: Any) -> None:
+        self._remember(key, user_id, value)
+        await self._store(key, user_id, value)
+
+    async def get_or_compute(
+        self, key: str, user_id: int, compute: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """
+        Returns (value, cached). Only one compute() runs per key at a time; if
+        the caller running it is cancelled, a waiting caller takes it over.
+        """
+        while True:
+            value = await self.get(key, user_id)
+            if value is not None:
+                return value, True
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending), True
+            except _Abandoned:
+                continue
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            value = await compute()
+            await self.put(key, user_id, value)
+            fut.set_result(value)
+            return value, False
+        except asyncio.CancelledError:
+            # only this caller was cancelled; the waiters retry instead
+            fut.set_exception(_Abandoned())
+            fut.exception()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # waiters re-raise it; don't warn if there are none
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def forget_user(self, user_id: int) -> None:
+        # old keys are unreachable once history_version moves; free the memory now
+        for key in self._by_user.pop(user_id, ()):
+            self._memory.pop(key)
+
+    def stats(self) -> Dict:
+        return dict(
+            self._memory.stats(),
+            disk_hits=self.disk_hits,
+            coalesced=self.coalesced,
+            inflight=len(self._inflight),
+            persistent=self._db is not None,
+        )
+
+
+mentor_cache = ResponseCache(LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL, LLM_CACHE_DB)
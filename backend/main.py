@@ -1,13 +1,27 @@
 # App 
 # backend/main.py
+import sys
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from dotenv import load_dotenv
 
-from backend.database import init_db
+from backend import metrics
+from backend.database import init_db, open_pool, close_pool, pool_stats
+from backend.deps import principal_cache_stats
+from backend.ollama_client import close_client
+from backend.llm_cache import mentor_cache
+from backend import mentor_context
+from backend.mentor_jobs import job_queue
+from backend.reflection_feedback import FEEDBACK_WORKER_ENABLED, feedback_worker
 from backend.routers.users import router as users_router
 from backend.routers.leetcode import router as leetcode_router
 from backend.routers.mentor import router as mentor_router
+from backend.routers.reflections import router as reflections_router
+from backend.routers.data import router as data_router
+from backend.routers.review import router as review_router
+from backend.routers.dashboard import router as dashboard_router
 
 load_dotenv("backend/.env")
 
@@ -20,15 +34,55 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+
+def _similarity_stats():
+    # backend.similarity (and numpy) load with the first /leetcode/similar query
+    similarity = sys.modules.get("backend.similarity")
+    return similarity.stats() if similarity is not None else {}
+
+
+metrics.register_collector("db_pool", "SQLite connection pool", pool_stats)
+metrics.register_collector("auth_cache", "Principal / token cache", principal_cache_stats)
+metrics.register_collector("mentor_cache", "Mentor response cache", mentor_cache.stats)
+metrics.register_collector("mentor_jobs", "Mentor job queue", job_queue.stats)
+metrics.register_collector("mentor_context", "Per-user mentor context cache", mentor_context.stats)
+metrics.register_collector("reflection_feedback", "Reflection feedback worker", feedback_worker.stats)
+metrics.register_collector("similarity_index", "Problem embedding index", _similarity_stats)
 
 @app.on_event("startup")
 async def on_startup():
     await init_db()
+    await open_pool()
+    await mentor_cache.open()
+    await job_queue.start()
+    if FEEDBACK_WORKER_ENABLED:
+        await feedback_worker.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await feedback_worker.stop()
+    await job_queue.stop()
+    await mentor_cache.close()
+    await close_client()
+    await close_pool()
 
 app.include_router(users_router)
 app.include_router(leetcode_router)
 app.include_router(mentor_router)
+app.include_router(reflections_router)
+app.include_router(data_router)
+app.include_router(review_router)
+app.include_router(dashboard_router)
 
 @app.get("/")
 async def root():
     return {"ok": True}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
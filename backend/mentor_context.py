@@ -0,0 +1,128 @@
+# backend/mentor_context.py
+"""
+Per-user context block for mentor prompts.
+
+The block (topic stats + ranked history lines) only changes when the user's
+history does, so it is rendered once per users.history_version and cached.
+It is fitted to MENTOR_CONTEXT_TOKENS: unfinished (attempted) problems
+first, then the most recent, and whatever doesn't fit is summarized as a
+count. Keeping the block byte-identical between turns, and ahead of the
+per-request part of the prompt, lets Ollama reuse its KV cache for it.
+"""
+import os
+from typing import Dict, List, Set
+
+import aiosqlite
+
+from backend import crud
+from backend.cache import TTLCache
+
+# token budget for the context block (history + stats), estimated from length
+MENTOR_CONTEXT_TOKENS = int(os.getenv("MENTOR_CONTEXT_TOKENS", "600"))
+# most recent history rows considered for the block
+MENTOR_CONTEXT_HISTORY = int(os.getenv("MENTOR_CONTEXT_HISTORY", "200"))
+MENTOR_CONTEXT_CACHE_SIZE = int(os.getenv("MENTOR_CONTEXT_CACHE_SIZE", "1024"))
+MENTOR_CONTEXT_CACHE_TTL = float(os.getenv("MENTOR_CONTEXT_CACHE_TTL", "3600"))
+
+# rough chars/token for English + slugs; good enough for budgeting
+CHARS_PER_TOKEN = 4
+# share of the budget topic stats may use before history gets the rest
+STATS_SHARE = 0.25
+# headers + "… N more" lines, taken off the budget up front
+_FIXED_TOKENS = 40
+
+_DIFFICULTY = {"Easy": "E", "Medium": "M", "Hard": "H"}
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class UserContext:
+    """Rendered context for one user at one history version."""
+
+    __slots__ = ("version", "text", "tokens", "solved", "shown", "omitted")
+
+    def __init__(self, version: int, text: str, solved: Set[str], shown: int, omitted: int):
+        self.version = version
+        self.text = text
+        self.tokens = estimate_tokens(text)
+        # every solved slug we looked at, not only the ones that fit the budget
+        self.solved = solved
+        self.shown = shown
+        self.omitted = omitted
+
+
+def rank_history(history: List[Dict]) -> List[Dict]:
+    # history arrives newest first; the stable sort keeps that order within each group
+    return sorted(history, key=lambda h: h.get("status") == "solved")
+
+
+def _history_line(h: Dict) -> str:
+    topics = ",".join(crud.parse_topics(h.get("topics")))
+    diff = _DIFFICULTY.get(h.get("difficulty"), "?")
+    return f"- {h['slug']} [{diff}] {h['status']}" + (f" ({topics})" if topics else "")
+
+
+def _stats_lines(stats: Dict) -> List[str]:
+    solved, attempted = stats.get("solved", {}), stats.get("attempted", {})
+    names = sorted(set(solved) | set(attempted), key=lambda t: (-(solved.get(t, 0) + attempted.get(t, 0)), t))
+    return [f"- {t}: {solved.get(t, 0)}/{attempted.get(t, 0)}" for t in names]
+
+
+def _fit(lines: List[str], budget: int) -> List[str]:
+    kept, used = [], 0
+    for line in lines:
+        cost = estimate_tokens(line)
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    return kept
+
+
+def render(history: List[Dict], stats: Dict, version: int, budget: int = MENTOR_CONTEXT_TOKENS) -> UserContext:
+    budget = max(0, budget - _FIXED_TOKENS)
+    stat_lines = _stats_lines(stats)
+    kept_stats = _fit(stat_lines, int(budget * STATS_SHARE))
+    used = sum(estimate_tokens(line) for line in kept_stats)
+
+    ranked = rank_history(history)
+    kept_history = _fit([_history_line(h) for h in ranked], budget - used)
+    omitted = len(ranked) - len(kept_history)
+
+    parts = ["Topic stats (solved/attempted):"]
+    parts += kept_stats or ["(none yet)"]
+    if len(kept_stats) < len(stat_lines):
+        parts.append(f"- … {len(stat_lines) - len(kept_stats)} more topics")
+    parts += ["", "History (unfinished first, then most recent):"]
+    parts += kept_history or ["(no history yet)"]
+    if omitted:
+        parts.append(f"- … {omitted} older entries not shown")
+
+    solved = {h["slug"] for h in history if h.get("status") == "solved"}
+    return UserContext(version, "\n".join(parts), solved, len(kept_history), omitted)
+
+
+_cache = TTLCache(MENTOR_CONTEXT_CACHE_SIZE, MENTOR_CONTEXT_CACHE_TTL)
+
+
+async def get_context(db: aiosqlite.Connection, user_id: int, version: int) -> UserContext:
+    """
+    Cached per (user, history_version); a status write bumps the version, so
+    the next call renders from fresh rows and old entries just age out.
+    """
+    key = (user_id, version)
+    ctx = _cache.get(key)
+    if ctx is not None:
+        return ctx
+
+    history = await crud.get_user_problem_history(db, user_id, limit=MENTOR_CONTEXT_HISTORY)
+    stats = await crud.get_user_topic_stats(db, user_id)
+    ctx = render(history, stats, version)
+    _cache.set(key, ctx)
+    return ctx
+
+
+def stats() -> Dict:
+    return {**_cache.stats(), "budget_tokens": MENTOR_CONTEXT_TOKENS}
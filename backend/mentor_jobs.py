@@ -0,0 +1,237 @@
+# backend/mentor_jobs.py
+"""
+Background mentor jobs.
+
+POST /mentor/jobs enqueues a request and returns immediately. A fixed pool of
+async workers drains a bounded priority queue through the same pipeline as
+/mentor/chat. When the queue is full, submit() raises QueueFull with a
+Retry-After estimate.
+
+The queue is per process, but job state lives in the mentor_jobs table, so
+GET /mentor/jobs/{id} answers from any worker process; a process that didn't
+run the job long-polls by re-reading the row. Priority is assigned here, not
+by the client: a user's first outstanding job runs ahead of their second,
+and so on, so one user's burst can't starve everyone else.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional
+
+from backend.database import reader, writer
+from backend.mentor_service import MentorError, mentor_reply
+from backend.schemas import MentorChatIn
+
+logger = logging.getLogger(__name__)
+
+MENTOR_JOB_WORKERS = int(os.getenv("MENTOR_JOB_WORKERS", "2"))
+MENTOR_JOB_QUEUE_SIZE = int(os.getenv("MENTOR_JOB_QUEUE_SIZE", "32"))
+# finished jobs are kept this long for polling
+MENTOR_JOB_RESULT_TTL = float(os.getenv("MENTOR_JOB_RESULT_TTL", "600"))
+# queued/running rows older than this are taken to be stranded by a worker
+# process that died; set it well past the longest queue wait plus generation
+MENTOR_JOB_STRANDED_TTL = float(os.getenv("MENTOR_JOB_STRANDED_TTL", "86400"))
+# how often a long-poll re-reads a job running in another process
+MENTOR_JOB_POLL_SECONDS = float(os.getenv("MENTOR_JOB_POLL_SECONDS", "0.5"))
+MAX_PRIORITY = 9
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Mentor queue is full")
+        self.retry_after = retry_after
+
+
+class MentorJob:
+    def __init__(self, user_id: int, payload: MentorChatIn, priority: int):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.payload = payload
+        self.priority = priority
+        self.finished = asyncio.Event()
+
+
+def _job_dict(row) -> Dict:
+    return {
+        "job_id": row["id"],
+        "status": row["status"],
+        "result": json.loads(row["result"]) if row["result"] else None,
+        "error": row["error"],
+    }
+
+
+async def _fetch(job_id: str, user_id: int) -> Optional[Dict]:
+    async with reader() as db:
+        cur = await db.execute(
+            "SELECT id, status, result, error FROM mentor_jobs WHERE id = ? AND user_id = ?;",
+            (job_id, user_id),
+        )
+        row = await cur.fetchone()
+    return _job_dict(row) if row else None
+
+
+async def _finish(job_id: str, status: str, result: Optional[Dict], error: Optional[str]) -> None:
+    async with writer() as db:
+        await db.execute(
+            "UPDATE mentor_jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?;",
+            (status, json.dumps(result) if result is not None else None, error, time.time(), job_id),
+        )
+
+
+class MentorJobQueue:
+    def __init__(self, workers: int, max_depth: int, result_ttl: float):
+        self.workers = max(1, workers)
+        self.max_depth = max(1, max_depth)
+        self.result_ttl = result_ttl
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+        # jobs queued or running in this process, for long-polls and priority
+        self._local: Dict[str, MentorJob] = {}
+        self._outstanding: Counter = Counter()
+        self._queued = 0
+        self._seq = itertools.count()  # FIFO within a priority
+        self._avg_seconds = 10.0  # moving average of job run time, seeds Retry-After
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._stopping = False
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def depth(self) -> int:
+        return self._queued
+
+    def retry_after(self) -> int:
+        return max(1, round(self._avg_seconds * (self.depth() + 1) / self.workers))
+
+    async def submit(self, user_id: int, payload: MentorChatIn) -> Dict:
+        """Records and enqueues a job; raises QueueFull instead of waiting."""
+        if self._queue is None:
+            raise RuntimeError("Mentor job queue is not started")
+        if self._queued >= self.max_depth:
+            self.rejected += 1
+            raise QueueFull(self.retry_after())
+        # the slot is taken before the insert yields, so concurrent submits can't overfill
+        self._queued += 1
+        job = MentorJob(user_id, payload, min(self._outstanding[user_id], MAX_PRIORITY))
+        try:
+            async with writer() as db:
+                now = time.time()
+                # expired results, and jobs stranded by a worker process that died
+                # (never one this process is still holding)
+                await db.execute(
+                    """
+                    DELETE FROM mentor_jobs
+                    WHERE (status IN ('done', 'failed') AND finished_at < ?)
+                       OR (status IN ('queued', 'running') AND created_at < ?
+                           AND id NOT IN (SELECT value FROM json_each(?)));
+                    """,
+                    (now - self.result_ttl, now - MENTOR_JOB_STRANDED_TTL, json.dumps(list(self._local))),
+                )
+                await db.execute(
+                    "INSERT INTO mentor_jobs (id, user_id, status, created_at) VALUES (?, ?, 'queued', ?);",
+                    (job.id, user_id, now),
+                )
+        except BaseException:
+            self._queued -= 1
+            raise
+        self._outstanding[user_id] += 1
+        self._local[job.id] = job
+        self._queue.put_nowait((job.priority, next(self._seq), job))
+        return {"job_id": job.id, "status": "queued", "result": None, "error": None}
+
+    async def get(self, job_id: str, user_id: int, wait: float = 0) -> Optional[Dict]:
+        """The job as stored, after waiting up to `wait` seconds for it to finish."""
+        deadline = time.monotonic() + wait
+        while True:
+            job = await _fetch(job_id, user_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] in ("done", "failed") or remaining <= 0:
+                return job
+            local = self._local.get(job_id)
+            try:
+                if local is not None:
+                    await asyncio.wait_for(local.finished.wait(), remaining)
+                else:
+                    await asyncio.sleep(min(MENTOR_JOB_POLL_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job = await self._queue.get()
+            self._queued -= 1
+            try:
+                await self._run(job)
+            finally:
+                self._outstanding[job.user_id] -= 1
+                if self._outstanding[job.user_id] <= 0:
+                    del self._outstanding[job.user_id]
+                self._local.pop(job.id, None)
+                job.finished.set()
+                self._queue.task_done()
+
+    async def _run(self, job: MentorJob) -> None:
+        """Runs one job and records its outcome; only stop() ends the worker."""
+        started = time.perf_counter()
+        result, status, error = None, "failed", None
+        try:
+            async with writer() as db:
+                await db.execute("UPDATE mentor_jobs SET status = 'running' WHERE id = ?;", (job.id,))
+            result, _ = await mentor_reply(job.user_id, job.payload)
+            status = "done"
+            self.completed += 1
+        except asyncio.CancelledError:
+            if self._stopping:
+                raise
+            # cancelled underneath us (not by stop()), e.g. a shared generation
+            error = "Mentor request was cancelled"
+            self.failed += 1
+        except MentorError as e:
+            error = str(e)
+            self.failed += 1
+        except Exception as e:
+            error = f"Internal error: {e}"
+            self.failed += 1
+
+        elapsed = time.perf_counter() - started
+        self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+        try:
+            await _finish(job.id, status, result, error)
+        except asyncio.CancelledError:
+            if self._stopping:
+                raise
+            logger.error("Could not record mentor job %s: cancelled", job.id)
+        except Exception:
+            # the row stays queued/running until it is pruned as stranded
+            logger.exception("Could not record mentor job %s", job.id)
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "depth": self.depth(),
+            "max_depth": self.max_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+job_queue = MentorJobQueue(MENTOR_JOB_WORKERS, MENTOR_JOB_QUEUE_SIZE, MENTOR_JOB_RESULT_TTL)
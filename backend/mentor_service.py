@@ -0,0 +1,197 @@
+# backend/mentor_service.py
+# mentor pipeline shared by /mentor/chat, /mentor/chat/stream and the job workers
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+from backend import crud, metrics, recommender
+from backend.database import reader, writer
+from backend.llm_cache import fingerprint, mentor_cache
+from backend.mentor_context import MENTOR_CONTEXT_TOKENS, UserContext, estimate_tokens, get_context
+from backend.ollama_client import OLLAMA_MODEL, ollama_chat_json
+from backend.recommender import CatalogSnapshot, slugify
+from backend.schemas import MentorChatIn, MentorChatOut, MentorRecommendation
+
+# keep well-formed slugs the catalog doesn't know (and add them to it); 0 drops them
+MENTOR_ALLOW_UNKNOWN = os.getenv("MENTOR_ALLOW_UNKNOWN", "1") == "1"
+MAX_SLUG_LENGTH = 100
+
+
+class MentorError(Exception):
+    """The model call failed or returned something unusable."""
+
+
+SYSTEM_PROMPT = (
+    "You are an AI LeetCode mentor. Be practical and concise. "
+    "Recommend problems based on the user's history and weaknesses. "
+    "Return ONLY JSON with keys: reply, recommendations, next_steps. "
+    "recommendations must be a list of {slug, title, difficulty, why}. "
+    "Use real LeetCode slugs (e.g., 'number-of-islands')."
+)
+
+
+# Fixed part of the prompt. It sits between the per-user context and the
+# per-request part so the prefix the model sees stays identical across turns.
+_PROMPT_RULES = """Rules:
+- Prefer problems that strengthen weak topics and core patterns.
+- Avoid recommending problems that appear as solved in history.
+- If no target difficulty is given, pick a good progression (mostly Medium, some Easy if fundamentals missing).
+- Output JSON only.
+
+Return JSON exactly like:
+{
+  "reply": "...",
+  "recommendations": [
+    {"slug":"...","title":"...","difficulty":"Easy|Medium|Hard","why":"..."}
+  ],
+  "next_steps": ["...", "..."]
+}"""
+
+
+# everything fixed that shapes the prompt; part of the response cache key
+_PROMPT_SHAPE = "\n".join((SYSTEM_PROMPT, _PROMPT_RULES, f"context_tokens={MENTOR_CONTEXT_TOKENS}"))
+
+
+def cache_key(payload: MentorChatIn, history_version: int) -> str:
+    return fingerprint(
+        OLLAMA_MODEL,
+        _PROMPT_SHAPE,
+        payload.message,
+        payload.weak_topics,
+        payload.target_difficulty,
+        payload.limit,
+        history_version,
+    )
+
+
+def build_user_prompt(payload: MentorChatIn, context: UserContext) -> str:
+    # stable first (user context, rules), request-specific last
+    prompt = f"""{context.text}
+
+{_PROMPT_RULES}
+
+Weak topics (self-reported): {", ".join(payload.weak_topics) or "none"}
+Target difficulty: {payload.target_difficulty or "any"}
+Return up to {payload.limit} recommendations.
+
+User message: {payload.message}
+"""
+    metrics.mentor_prompt_tokens.observe(estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(prompt))
+    return prompt
+
+
+async def load_context(user_id: int, version: Optional[int] = None) -> UserContext:
+    async with reader() as db:
+        if version is None:
+            version = await crud.get_history_version(db, user_id)
+        return await get_context(db, user_id, version)
+
+
+class RecommendationCleaner:
+    """
+    Normalizes model recommendations one at a time against the catalog:
+    near-miss slugs are corrected and title/difficulty come from the catalog
+    row; duplicates and solved problems are dropped. Unknown slugs are kept
+    (and queued in `new_problems` for persisting) only if MENTOR_ALLOW_UNKNOWN.
+    """
+
+    def __init__(self, payload: MentorChatIn, solved: Set[str], catalog: CatalogSnapshot):
+        self.default_difficulty = payload.target_difficulty or "Medium"
+        self.limit = payload.limit
+        self.cleaned: List[Dict] = []
+        self.new_problems: List[Dict] = []
+        self._catalog = catalog
+        self._seen: Set[str] = set()
+        # solved slugs, so we don't store/recommend duplicates
+        self._solved = solved
+
+    def add(self, r: Dict) -> Optional[Dict]:
+        if not isinstance(r, dict):
+            return None
+        slug = (r.get("slug") or "").strip()
+        title = (r.get("title") or "").strip()
+        difficulty = (r.get("difficulty") or "").strip()
+        why = (r.get("why") or "").strip()
+
+        pid = self._catalog.resolve(slug, title) if (slug or title) else None
+        if pid is not None:
+            known_slug, title, difficulty, _ = self._catalog.problems[pid]
+            metrics.mentor_recommendations.labels("known" if known_slug == slug else "corrected").inc()
+            slug = known_slug
+        else:
+            slug = slugify(slug)
+            if not slug or len(slug) > MAX_SLUG_LENGTH or not MENTOR_ALLOW_UNKNOWN:
+                metrics.mentor_recommendations.labels("rejected").inc()
+                return None
+            metrics.mentor_recommendations.labels("unknown").inc()
+            if difficulty not in {"Easy", "Medium", "Hard"}:
+                # Default if model outputs something weird
+                difficulty = self.default_difficulty
+
+        if slug in self._seen or slug in self._solved:
+            return None
+
+        self._seen.add(slug)
+        item = {"slug": slug, "title": title or slug, "difficulty": difficulty, "why": why or "Good next step."}
+        self.cleaned.append(item)
+        if pid is None and len(self.cleaned) <= self.limit:
+            self.new_problems.append(item)
+        return item
+
+
+async def persist_recommendations(new_problems: List[Dict]) -> None:
+    # Save slugs the catalog didn't have so you can track them later; rows that
+    # already exist are never touched. Topics are unknown -> stored empty.
+    if not new_problems:
+        return
+    async with writer() as db:
+        inserted = await crud.insert_new_problems(
+            db, [(r["slug"], r["title"], r["difficulty"]) for r in new_problems]
+        )
+    if inserted:
+        recommender.invalidate()
+
+
+async def load_catalog() -> CatalogSnapshot:
+    async with reader() as db:
+        return await recommender.get_snapshot(db)
+
+
+def build_response(obj: Dict, cleaner: RecommendationCleaner) -> MentorChatOut:
+    # Normalize keys
+    steps = obj.get("next_steps") or obj.get("nextSteps") or []
+    return MentorChatOut(
+        reply=obj.get("reply", ""),
+        recommendations=[MentorRecommendation(**x) for x in cleaner.cleaned[: cleaner.limit]],
+        next_steps=steps,
+    )
+
+
+async def generate_reply(user_id: int, payload: MentorChatIn, version: Optional[int] = None) -> Dict:
+    # 1) The user's learning context (cached per history version; no connection held during generation)
+    context = await load_context(user_id, version)
+    user_prompt = build_user_prompt(payload, context)
+
+    try:
+        obj = await ollama_chat_json(system=SYSTEM_PROMPT, user=user_prompt)
+    except Exception as e:
+        raise MentorError(f"Ollama error: {e}") from e
+
+    # 2) Clean + store recommended problems into DB (so you can track them)
+    cleaner = RecommendationCleaner(payload, context.solved, await load_catalog())
+    for r in obj.get("recommendations", []) or []:
+        cleaner.add(r)
+    await persist_recommendations(cleaner.new_problems)
+
+    return build_response(obj, cleaner).model_dump()
+
+
+async def mentor_reply(user_id: int, payload: MentorChatIn) -> Tuple[Dict, bool]:
+    """
+    Returns (MentorChatOut dict, cached). Identical prompts against the same
+    history version are served from the cache / share one generation.
+    """
+    async with reader() as db:
+        version = await crud.get_history_version(db, user_id)
+    return await mentor_cache.get_or_compute(
+        cache_key(payload, version), user_id, lambda: generate_reply(user_id, payload, version)
+    )
@@ -0,0 +1,326 @@
+# backend/metrics.py
+"""
+Low-overhead in-process metrics with a Prometheus text exposition.
+
+Metric children are created once per label combination and then updated in
+place (a list index and a few float adds per observation), so everything can
+stay enabled under load. Set METRICS_ENABLED=0 to skip the middleware and
+the SQL timing wrapper entirely.
+"""
+import os
+import re
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Gauge(Counter):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Family:
+    """A metric name plus its children, one per label-value tuple."""
+
+    def __init__(self, name: str, help: str, kind: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.label_names = labels
+        self.buckets = buckets
+        self.children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        child = self.children.get(values)
+        if child is None:
+            if self.kind == "histogram":
+                child = Histogram(self.buckets)
+            elif self.kind == "gauge":
+                child = Gauge()
+            else:
+                child = Counter()
+            self.children[values] = child
+        return child
+
+
+_families: List[Family] = []
+# callables returning {name: value} snapshots exported as gauges
+_collectors: List[Tuple[str, str, Callable[[], Dict]]] = []
+
+
+def _family(name: str, help: str, kind: str, labels: Tuple[str, ...], buckets=LATENCY_BUCKETS) -> Family:
+    fam = Family(name, help, kind, labels, buckets)
+    _families.append(fam)
+    return fam
+
+
+def counter(name: str, help: str, labels: Tuple[str, ...] = ()) -> Family:
+    return _family(name, help, "counter", labels)
+
+
+def gauge(name: str, help: str, labels: Tuple[str, ...] = ()) -> Family:
+    return _family(name, help, "gauge", labels)
+
+
+def histogram(name: str, help: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> Family:
+    return _family(name, help, "histogram", labels, buckets)
+
+
+def register_collector(prefix: str, help: str, fn: Callable[[], Dict]) -> None:
+    """Export a stats() dict (nested dicts are flattened) as `{prefix}_{key}` gauges."""
+    _collectors.append((prefix, help, fn))
+
+
+# ---------- Exposition ----------
+def _fmt_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _flatten(prefix: str, stats: Dict) -> Iterable[Tuple[str, float]]:
+    for k, v in stats.items():
+        name = f"{prefix}_{k}"
+        if isinstance(v, dict):
+            yield from _flatten(name, v)
+        elif isinstance(v, (int, float)):  # bools too
+            yield name, float(v)
+
+
+def render() -> str:
+    lines: List[str] = []
+    for fam in _families:
+        lines.append(f"# HELP {fam.name} {fam.help}")
+        lines.append(f"# TYPE {fam.name} {fam.kind}")
+        for values, child in list(fam.children.items()):
+            if fam.kind == "histogram":
+                cumulative = 0
+                for bound, n in zip(fam.buckets + (float("inf"),), child.counts):
+                    cumulative += n
+                    le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                    lines.append(f"{fam.name}_bucket{_fmt_labels(fam.label_names, values, le)} {cumulative}")
+                lines.append(f"{fam.name}_sum{_fmt_labels(fam.label_names, values)} {child.sum}")
+                lines.append(f"{fam.name}_count{_fmt_labels(fam.label_names, values)} {child.count}")
+            else:
+                lines.append(f"{fam.name}{_fmt_labels(fam.label_names, values)} {child.value}")
+    for prefix, help, fn in _collectors:
+        for name, value in _flatten(prefix, fn()):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# ---------- HTTP ----------
+http_request_seconds = histogram(
+    "http_request_duration_seconds", "Request latency by route template", ("method", "route", "status")
+)
+http_in_flight = gauge("http_requests_in_flight", "Requests currently being served").labels()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: per-route latency histogram + in-flight gauge."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec()
+            # route template (e.g. /mentor/jobs/{job_id}) keeps label cardinality bounded
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "<unmatched>"
+            http_request_seconds.labels(scope["method"], path, str(status[0])).observe(time.perf_counter() - start)
+
+
+# ---------- SQL ----------
+db_statement_seconds = histogram("db_statement_duration_seconds", "SQL execute time by statement", ("query",))
+db_fetch_seconds = histogram("db_fetch_duration_seconds", "SQL row fetch time by statement", ("query",))
+db_write_batch_size = histogram(
+    "db_write_batch_size",
+    "writer() blocks run per group-commit transaction",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+).labels()
+db_write_wait_seconds = histogram(
+    "db_write_wait_seconds", "Time a writer() block waits for its turn in a batch"
+).labels()
+db_write_busy_retries = counter(
+    "db_write_busy_retries_total", "BEGIN IMMEDIATE retries after another process held the write lock"
+).labels()
+
+_TABLE_AFTER = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE|EXISTS)\s+([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+_query_names: Dict[str, Tuple[str]] = {}
+
+
+def query_name(sql: str) -> Tuple[str]:
+    """'SELECT ... FROM problems ...' -> ('select:problems',), memoized per SQL string."""
+    name = _query_names.get(sql)
+    if name is None:
+        text = sql.lstrip()
+        verb = text.split(None, 1)[0].lower() if text else "?"
+        m = _TABLE_AFTER.search(text)
+        name = (f"{verb}:{m.group(1).lower()}" if m else verb,)
+        if len(_query_names) < 2048:
+            _query_names[sql] = name
+    return name
+
+
+class TimedCursor:
+    def __init__(self, cursor, name: Tuple[str]):
+        self._cursor = cursor
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._cursor, attr)
+
+    async def _timed(self, coro):
+        start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            db_fetch_seconds.labels(*self._name).observe(time.perf_counter() - start)
+
+    def fetchone(self):
+        return self._timed(self._cursor.fetchone())
+
+    def fetchall(self):
+        return self._timed(self._cursor.fetchall())
+
+    def fetchmany(self, size: Optional[int] = None):
+        return self._timed(self._cursor.fetchmany(size) if size is not None else self._cursor.fetchmany())
+
+    def __aiter__(self):
+        return self._cursor.__aiter__()
+
+
+class TimedConnection:
+    """Wraps an aiosqlite connection and times every statement by query_name()."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, attr):
+        return getattr(self._conn, attr)
+
+    async def execute(self, sql: str, parameters=None):
+        name = query_name(sql)
+        start = time.perf_counter()
+        try:
+            cursor = await self._conn.execute(sql, parameters)
+        finally:
+            db_statement_seconds.labels(*name).observe(time.perf_counter() - start)
+        return TimedCursor(cursor, name)
+
+    async def executemany(self, sql: str, parameters):
+        name = query_name(sql)
+        start = time.perf_counter()
+        try:
+            return await self._conn.executemany(sql, parameters)
+        finally:
+            db_statement_seconds.labels(*name).observe(time.perf_counter() - start)
+
+    async def commit(self) -> None:
+        start = time.perf_counter()
+        try:
+            await self._conn.commit()
+        finally:
+            db_statement_seconds.labels("commit").observe(time.perf_counter() - start)
+
+
+# ---------- Ollama ----------
+ollama_requests = counter("ollama_requests_total", "Ollama calls started").labels()
+ollama_waiting = gauge("ollama_waiting", "Calls waiting for a generation slot").labels()
+ollama_in_flight = gauge("ollama_in_flight", "Calls holding a generation slot").labels()
+ollama_queue_wait_seconds = histogram(
+    "ollama_queue_wait_seconds", "Time waiting for a generation slot"
+).labels()
+ollama_generation_seconds = histogram(
+    "ollama_generation_seconds", "Time holding a generation slot", ("mode",)
+)
+ollama_prompt_tokens = counter("ollama_prompt_tokens_total", "Prompt tokens evaluated by Ollama").labels()
+ollama_response_tokens = counter("ollama_response_tokens_total", "Tokens generated by Ollama").labels()
+ollama_errors = counter("ollama_errors_total", "Failed Ollama calls").labels()
+
+
+# ---------- Mentor prompts ----------
+mentor_recommendations = counter(
+    "mentor_recommendations_total", "Model recommendations by catalog match", ("result",)
+)
+mentor_prompt_tokens = histogram(
+    "mentor_prompt_tokens",
+    "Estimated tokens per mentor prompt (system + user)",
+    buckets=(128, 256, 512, 768, 1024, 1536, 2048, 3072, 4096, 8192),
+).labels()
+
+
+# ---------- Reflection feedback ----------
+feedback_reflections = counter(
+    "reflection_feedback_total", "Reflections processed by the feedback pipeline", ("outcome",)
+)
+feedback_batches = counter("reflection_feedback_batches_total", "Batched feedback prompts sent").labels()
+feedback_errors = counter(
+    "reflection_feedback_errors_total", "Exceptions in the feedback pipeline", ("stage",)
+)
+feedback_batch_seconds = histogram(
+    "reflection_feedback_batch_seconds", "Generate + write-back time per batch"
+).labels()
+
+
+# ---------- Similar problems ----------
+similar_query_seconds = histogram(
+    "similar_query_seconds", "Embedding similarity query time (matrix product + status filter)"
+).labels()
@@ -1,21 +1,118 @@
 # backend/ollama_client.py
 import os
-import httpx
+import json
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional
+
+from backend import metrics
+
+if TYPE_CHECKING:
+    import httpx
 
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://127.0.0.1:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1")
+OLLAMA_EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
 
+# Connection pool + backpressure (one shared client per process)
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5"))
+OLLAMA_READ_TIMEOUT = float(os.getenv("OLLAMA_READ_TIMEOUT", "120"))
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "8"))
+# generations allowed to hit the server at once; the rest wait in line
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "2"))
+
+_client: Optional["httpx.AsyncClient"] = None
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def _new_client() -> "httpx.AsyncClient":
+    # httpx (~20 ms to import) loads with the first Ollama call, not at boot
+    import httpx
+
+    return httpx.AsyncClient(
+        base_url=OLLAMA_BASE_URL,
+        timeout=httpx.Timeout(
+            connect=OLLAMA_CONNECT_TIMEOUT,
+            read=OLLAMA_READ_TIMEOUT,
+            write=OLLAMA_CONNECT_TIMEOUT,
+            pool=OLLAMA_CONNECT_TIMEOUT,
+        ),
+        limits=httpx.Limits(
+            max_connections=OLLAMA_MAX_CONNECTIONS,
+            max_keepalive_connections=OLLAMA_MAX_CONNECTIONS,
+        ),
+    )
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
+
+
+def _get_client() -> "httpx.AsyncClient":
+    # the shared client is created on first use, in the app and in scripts alike
+    global _client
+    if _client is None:
+        _client = _new_client()
+    return _client
+
+
+@asynccontextmanager
+async def generation_slot(mode: str = "json") -> AsyncIterator[None]:
+    """Waits for one of OLLAMA_MAX_CONCURRENCY generation slots."""
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(OLLAMA_MAX_CONCURRENCY)
+
+    metrics.ollama_requests.inc()
+    metrics.ollama_waiting.inc()
+    queued_at = time.perf_counter()
+    try:
+        await _slots.acquire()
+    finally:
+        metrics.ollama_waiting.dec()
+    started = time.perf_counter()
+    metrics.ollama_queue_wait_seconds.observe(started - queued_at)
+
+    metrics.ollama_in_flight.inc()
+    try:
+        yield
+    except Exception:
+        metrics.ollama_errors.inc()
+        raise
+    finally:
+        metrics.ollama_in_flight.dec()
+        metrics.ollama_generation_seconds.labels(mode).observe(time.perf_counter() - started)
+        _slots.release()
+
+
+def _count_tokens(data: dict) -> None:
+    # final Ollama message carries prompt/eval token counts
+    metrics.ollama_prompt_tokens.inc(data.get("prompt_eval_count") or 0)
+    metrics.ollama_response_tokens.inc(data.get("eval_count") or 0)
+
+
+def parse_json_content(content: str) -> dict:
+    # Try parse JSON (model might add extra text; we’ll harden a bit)
+    content = content.strip()
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        # Fallback: extract first {...} block
+        start = content.find("{")
+        end = content.rfind("}")
+        if start != -1 and end != -1 and end > start:
+            return json.loads(content[start : end + 1])
+        raise
 
-async def ollama_chat_json(system: str, user: str) -> dict:
-    """
-    Calls Ollama /api/chat and asks it to output JSON.
-    Returns parsed JSON dict.
-    """
-    url = f"{OLLAMA_BASE_URL}/api/chat"
 
-    payload = {
+def _chat_payload(system: str, user: str, stream: bool) -> dict:
+    return {
         "model": OLLAMA_MODEL,
-        "stream": False,
+        "stream": stream,
         "messages": [
             {"role": "system", "content": system},
             {"role": "user", "content": user},
@@ -24,22 +121,62 @@ async def ollama_chat_json(system: str, user: str) -> dict:
         "options": {"temperature": 0.4},
     }
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        r = await client.post(url, json=payload)
+
+async def ollama_chat_json(system: str, user: str) -> dict:
+    """
+    Calls Ollama /api/chat and asks it to output JSON.
+    Returns parsed JSON dict.
+    """
+    payload = _chat_payload(system, user, stream=False)
+
+    async with generation_slot():
+        r = await _get_client().post("/api/chat", json=payload)
         r.raise_for_status()
         data = r.json()
+    _count_tokens(data)
 
     # Ollama returns: { message: { content: "..." }, ... }
-    content = data.get("message", {}).get("content", "").strip()
+    content = data.get("message", {}).get("content", "")
+    return parse_json_content(content)
 
-    # Try parse JSON (model might add extra text; we’ll harden a bit)
-    import json
-    try:
-        return json.loads(content)
-    except json.JSONDecodeError:
-        # Fallback: extract first {...} block
-        start = content.find("{")
-        end = content.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            return json.loads(content[start : end + 1])
-        raise
+
+async def ollama_chat_stream(system: str, user: str) -> AsyncIterator[str]:
+    """
+    Streaming /api/chat: yields content chunks as the model produces them.
+    Holds a generation slot until the stream ends or the caller stops iterating.
+    """
+    payload = _chat_payload(system, user, stream=True)
+
+    async with generation_slot("stream"):
+        async with _get_client().stream("POST", "/api/chat", json=payload) as r:
+            r.raise_for_status()
+            # NDJSON: one {message: {content}, done} object per line
+            async for line in r.aiter_lines():
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise RuntimeError(data["error"])
+                piece = data.get("message", {}).get("content", "")
+                if piece:
+                    yield piece
+                if data.get("done"):
+                    _count_tokens(data)
+                    break
+
+
+async def ollama_embed(texts: List[str], model: str = OLLAMA_EMBED_MODEL) -> List[List[float]]:
+    """
+    Calls Ollama /api/embed for a batch of inputs.
+    Returns one vector per input, in order.
+    """
+    async with generation_slot("embed"):
+        r = await _get_client().post("/api/embed", json={"model": model, "input": texts})
+        r.raise_for_status()
+        data = r.json()
+    metrics.ollama_prompt_tokens.inc(data.get("prompt_eval_count") or 0)
+
+    vectors = data.get("embeddings") or []
+    if len(vectors) != len(texts):
+        raise RuntimeError(f"Ollama returned {len(vectors)} embeddings for {len(texts)} inputs")
+    return vectors
@@ -0,0 +1,56 @@
+# backend/pagination.py
+"""
+Opaque keyset cursors.
+
+A cursor is the sort key of the last row on a page, JSON-encoded and
+urlsafe-base64'd so clients treat it as a token rather than something to
+build by hand. The next page is "rows strictly after this key" in the
+listing's sort order, which an index can seek to directly.
+"""
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], types: Sequence[type]) -> Optional[List[Any]]:
+    """
+    Returns the key list (one value per entry in `types`), or None when no
+    cursor was given.
+    Raises 400 for anything that isn't a cursor we issued.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if (
+        not isinstance(key, list)
+        or len(key) != len(types)
+        or not all(type(v) is t for v, t in zip(key, types))
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+
+def page(rows: List[dict], limit: int, key_of) -> dict:
+    """
+    `rows` is the result of a LIMIT limit+1 query; the extra row only tells
+    us whether another page exists and is not returned.
+    """
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    next_cursor = encode_cursor(key_of(items[-1])) if has_more and items else None
+    return {"items": items, "next_cursor": next_cursor}
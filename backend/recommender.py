@@ -0,0 +1,182 @@
+# backend/recommender.py
+"""
+In-memory recommendation engine.
+
+Keeps a compact snapshot of the problem catalog (topic -> problem ids and
+difficulty buckets) and ranks the whole catalog for a user with heap-based
+top-k selection, instead of scoring a SQL candidate slice row by row.
+"""
+import asyncio
+import difflib
+import heapq
+import json
+import os
+import re
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import aiosqlite
+
+# other workers only see local invalidations, so cap snapshot age as well
+SNAPSHOT_TTL_SECONDS = float(os.getenv("RECOMMENDER_SNAPSHOT_TTL", "300"))
+# minimum difflib ratio for correcting a near-miss slug to a catalog slug
+SLUG_MATCH_CUTOFF = float(os.getenv("RECOMMENDER_SLUG_MATCH_CUTOFF", "0.88"))
+
+_NON_SLUG = re.compile(r"[^a-z0-9]+")
+
+
+def slugify(text: str) -> str:
+    """'Two Sum II ' / 'two_sum_ii' -> 'two-sum-ii' (LeetCode slug shape)."""
+    return _NON_SLUG.sub("-", (text or "").lower()).strip("-")
+
+
+class CatalogSnapshot:
+    def __init__(self, generation: int):
+        self.generation = generation
+        self.loaded_at = time.monotonic()
+        # id -> (slug, title, difficulty, topics_csv)
+        self.problems: Dict[int, Tuple[str, str, str, str]] = {}
+        self.by_topic: Dict[str, Set[int]] = {}
+        self.by_difficulty: Dict[str, Set[int]] = {}
+        self.ids: Set[int] = set()
+        # lookups for validating model output: slug -> id, slugified title -> id
+        self.by_slug: Dict[str, int] = {}
+        self.by_title: Dict[str, int] = {}
+        self._slugs: Optional[List[str]] = None
+
+    def is_fresh(self) -> bool:
+        return self.generation == _generation and time.monotonic() - self.loaded_at < SNAPSHOT_TTL_SECONDS
+
+    def resolve(self, slug: str, title: str = "") -> Optional[int]:
+        """
+        Catalog id for a (possibly misspelled) slug/title from the model:
+        exact slug, then normalized slug, then title, then the closest slug
+        by difflib ratio. None if nothing is close enough.
+        """
+        if slug in self.by_slug:
+            return self.by_slug[slug]
+        norm = slugify(slug)
+        if norm in self.by_slug:
+            return self.by_slug[norm]
+        by_title = slugify(title)
+        if by_title and by_title in self.by_title:
+            return self.by_title[by_title]
+        if not norm:
+            return None
+        if self._slugs is None:
+            self._slugs = list(self.by_slug)
+        close = difflib.get_close_matches(norm, self._slugs, n=1, cutoff=SLUG_MATCH_CUTOFF)
+        return self.by_slug[close[0]] if close else None
+
+
+_snapshot: Optional[CatalogSnapshot] = None
+_generation = 0
+_load_lock = asyncio.Lock()
+
+
+def invalidate() -> None:
+    """Drop the snapshot; call after a catalog write has been committed."""
+    global _snapshot, _generation
+    _generation += 1
+    _snapshot = None
+
+
+async def _load_snapshot(db: aiosqlite.Connection) -> CatalogSnapshot:
+    snap = CatalogSnapshot(_generation)
+
+    cur = await db.execute("SELECT id, slug, title, difficulty, topics FROM problems;")
+    for pid, slug, title, difficulty, topics in await cur.fetchall():
+        snap.problems[pid] = (slug, title, difficulty, topics or "")
+        snap.by_difficulty.setdefault(difficulty, set()).add(pid)
+        snap.by_slug[slug] = pid
+        snap.by_title.setdefault(slugify(title), pid)
+    snap.ids = set(snap.problems)
+
+    cur = await db.execute(
+        "SELECT t.name, pt.problem_id FROM problem_topics pt JOIN topics t ON t.id = pt.topic_id;"
+    )
+    for name, pid in await cur.fetchall():
+        snap.by_topic.setdefault(name, set()).add(pid)
+    return snap
+
+
+async def get_snapshot(db: aiosqlite.Connection) -> CatalogSnapshot:
+    global _snapshot
+    snap = _snapshot
+    if snap is not None and snap.is_fresh():
+        return snap
+    async with _load_lock:
+        if _snapshot is None or not _snapshot.is_fresh():
+            _snapshot = await _load_snapshot(db)
+        return _snapshot
+
+
+def _tiers(
+    snap: CatalogSnapshot,
+    pool: Set[int],
+    weak: Set[int],
+    medium: Set[int],
+    solved: Set[int],
+) -> Iterator[Iterable[int]]:
+    # Score = +5 weak topic, +2 Medium (only without a difficulty filter), -100 solved.
+    # Tiers come out in descending score and are only materialized when needed.
+    yield (weak & medium) - solved
+    yield weak - medium - solved
+    yield medium - weak - solved
+    yield (pid for pid in pool if pid not in weak and pid not in medium and pid not in solved)
+    yield weak & medium & solved
+    yield (weak - medium) & solved
+    yield (medium - weak) & solved
+    yield (pid for pid in solved if pid in pool and pid not in weak and pid not in medium)
+
+
+def rank(
+    snap: CatalogSnapshot,
+    statuses: Dict[int, str],
+    weak_topics: List[str],
+    difficulty: Optional[str],
+    limit: int,
+) -> List[int]:
+    """Top `limit` problem ids, best first; ties go to the lower id."""
+    if difficulty:
+        pool = snap.by_difficulty.get(difficulty, set())
+        medium: Set[int] = set()
+    else:
+        pool = snap.ids
+        medium = snap.by_difficulty.get("Medium", set())
+
+    weak_names = {t.strip().lower() for t in weak_topics if t.strip()}
+    weak = set().union(*(snap.by_topic.get(t, ()) for t in weak_names)) & pool
+    solved = {pid for pid, s in statuses.items() if s == "solved"}
+
+    picked: List[int] = []
+    for tier in _tiers(snap, pool, weak, medium, solved):
+        if len(picked) >= limit:
+            break
+        picked.extend(heapq.nsmallest(limit - len(picked), tier))
+    return picked
+
+
+async def recommend(
+    db: aiosqlite.Connection,
+    user_id: int,
+    weak_topics: List[str],
+    difficulty: Optional[str],
+    limit: int,
+) -> List[Dict]:
+    snap = await get_snapshot(db)
+
+    cur = await db.execute("SELECT problem_id, status FROM user_problems WHERE user_id = ?;", (user_id,))
+    statuses = {pid: status for pid, status in await cur.fetchall()}
+
+    out = []
+    for pid in rank(snap, statuses, weak_topics, difficulty, max(0, limit)):
+        slug, title, diff, topics = snap.problems[pid]
+        out.append({
+            "slug": slug,
+            "title": title,
+            "difficulty": diff,
+            "topics": topics,
+            "status": statuses.get(pid, "not_started"),
+        })
+    return out
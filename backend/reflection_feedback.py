@@ -0,0 +1,322 @@
+# backend/reflection_feedback.py
+"""
+Background AI feedback for reflections.
+
+New reflections are saved with feedback_state = 'pending' and no feedback;
+nothing on the write path waits for the model. This module claims pending
+rows, groups each user's rows into one prompt (FEEDBACK_BATCH_SIZE
+reflections per Ollama call instead of one call each), and writes the
+answers back in one transaction per batch.
+
+Claims are leases: a claimed row is 'processing' with feedback_claimed_at
+set. If the process dies mid-batch the lease expires after
+FEEDBACK_LEASE_SECONDS and the rows are picked up again. A row that keeps
+failing is marked 'failed' after FEEDBACK_MAX_ATTEMPTS.
+
+    python -m backend.reflection_feedback            # drain the backlog once
+    python -m backend.reflection_feedback --loop     # keep polling
+
+Inside the app the same loop runs when FEEDBACK_WORKER_ENABLED=1.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+from backend import metrics
+from backend.database import reader, writer
+from backend.ollama_client import ollama_chat_json
+
+logger = logging.getLogger(__name__)
+
+FEEDBACK_BATCH_SIZE = int(os.getenv("FEEDBACK_BATCH_SIZE", "8"))
+# batches generating at once (Ollama's own OLLAMA_MAX_CONCURRENCY still applies)
+FEEDBACK_CONCURRENCY = int(os.getenv("FEEDBACK_CONCURRENCY", "2"))
+FEEDBACK_LEASE_SECONDS = int(os.getenv("FEEDBACK_LEASE_SECONDS", "600"))
+FEEDBACK_MAX_ATTEMPTS = int(os.getenv("FEEDBACK_MAX_ATTEMPTS", "3"))
+FEEDBACK_POLL_SECONDS = float(os.getenv("FEEDBACK_POLL_SECONDS", "30"))
+FEEDBACK_WORKER_ENABLED = os.getenv("FEEDBACK_WORKER_ENABLED", "0") == "1"
+# notes longer than this are cut in the prompt (the stored text is untouched)
+FEEDBACK_NOTES_CHARS = int(os.getenv("FEEDBACK_NOTES_CHARS", "2000"))
+
+SYSTEM_PROMPT = """You are a supportive coding interview mentor reviewing a student's study journal.
+For each reflection, give short, specific feedback (2-4 sentences): what they understood well,
+what is missing or shaky, and one concrete thing to practice next.
+
+Return ONLY valid JSON with this shape:
+{
+  "feedback": [
+    {"id": 123, "feedback": "..."}
+  ]
+}
+Include exactly one entry per reflection id you were given.
+"""
+
+
+def build_batch_prompt(rows: List[Dict]) -> str:
+    parts = []
+    for r in rows:
+        notes = r["notes"]
+        if len(notes) > FEEDBACK_NOTES_CHARS:
+            notes = notes[:FEEDBACK_NOTES_CHARS] + " …"
+        parts.append(
+            f"Reflection id: {r['id']}\n"
+            f"Problem: {r['title']} ({r['difficulty']})\n"
+            f"Notes:\n{notes}"
+        )
+    return "\n\n---\n\n".join(parts)
+
+
+def parse_feedback(obj: dict, ids: List[int]) -> Dict[int, str]:
+    """Maps reflection id -> feedback for the ids we asked about; ignores the rest."""
+    wanted = set(ids)
+    out: Dict[int, str] = {}
+    for item in obj.get("feedback", []) if isinstance(obj, dict) else []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            rid = int(item.get("id"))
+        except (TypeError, ValueError):
+            continue
+        text = str(item.get("feedback", "")).strip()
+        if rid in wanted and text:
+            out[rid] = text
+    return out
+
+
+# ---------- Claiming ----------
+async def claim_batches(max_batches: int, batch_size: int = FEEDBACK_BATCH_SIZE) -> List[List[Dict]]:
+    """
+    Expires stale leases, then claims up to max_batches batches of pending
+    reflections. Each batch belongs to a single user.
+    """
+    async with writer() as db:
+        await db.execute(
+            """
+            UPDATE reflections
+            SET feedback_state = 'pending', feedback_claimed_at = NULL
+            WHERE feedback_state = 'processing'
+              AND feedback_claimed_at < datetime('now', ?);
+            """,
+            (f"-{FEEDBACK_LEASE_SECONDS} seconds",),
+        )
+
+        cur = await db.execute(
+            """
+            SELECT r.id, r.user_id, r.notes, p.title, p.difficulty
+            FROM reflections r
+            JOIN problems p ON p.id = r.problem_id
+            WHERE r.feedback_state = 'pending'
+            ORDER BY r.user_id, r.id
+            LIMIT ?;
+            """,
+            (max_batches * batch_size,),
+        )
+        rows = [dict(r) for r in await cur.fetchall()]
+
+        batches: List[List[Dict]] = []
+        for r in rows:
+            if batches and batches[-1][0]["user_id"] == r["user_id"] and len(batches[-1]) < batch_size:
+                batches[-1].append(r)
+            else:
+                batches.append([r])
+
+        if rows:
+            await db.execute(
+                """
+                UPDATE reflections
+                SET feedback_state = 'processing',
+                    feedback_claimed_at = datetime('now'),
+                    feedback_attempts = feedback_attempts + 1
+                WHERE id IN (SELECT value FROM json_each(?));
+                """,
+                (json.dumps([r["id"] for r in rows]),),
+            )
+    return batches
+
+
+async def _release(ids: List[int]) -> int:
+    """
+    Gives up the lease on rows that got no feedback: back to pending, or
+    failed once they are out of attempts. Returns how many failed for good.
+    """
+    if not ids:
+        return 0
+    async with writer() as db:
+        await db.execute(
+            """
+            UPDATE reflections
+            SET feedback_state = CASE WHEN feedback_attempts >= ? THEN 'failed' ELSE 'pending' END,
+                feedback_claimed_at = NULL
+            WHERE id IN (SELECT value FROM json_each(?))
+              AND feedback_state = 'processing';
+            """,
+            (FEEDBACK_MAX_ATTEMPTS, json.dumps(ids)),
+        )
+        cur = await db.execute(
+            "SELECT COUNT(*) FROM reflections WHERE id IN (SELECT value FROM json_each(?)) AND feedback_state = 'failed';",
+            (json.dumps(ids),),
+        )
+        return (await cur.fetchone())[0]
+
+
+# ---------- Processing ----------
+async def process_batch(rows: List[Dict]) -> Dict[str, int]:
+    """One prompt for the whole batch, one transaction for the write-back."""
+    ids = [r["id"] for r in rows]
+    started = time.perf_counter()
+    metrics.feedback_batches.inc()
+    try:
+        obj = await ollama_chat_json(SYSTEM_PROMPT, build_batch_prompt(rows))
+        answers = parse_feedback(obj, ids)
+    except Exception:
+        # the rows go back to pending (or failed) below
+        logger.exception("Feedback batch of %d reflections failed", len(ids))
+        metrics.feedback_errors.labels("batch").inc()
+        answers = {}
+
+    if answers:
+        async with writer() as db:
+            await db.executemany(
+                """
+                UPDATE reflections
+                SET ai_feedback = ?, feedback_state = 'done', feedback_claimed_at = NULL
+                WHERE id = ? AND feedback_state = 'processing';
+                """,
+                [(text, rid) for rid, text in answers.items()],
+            )
+
+    missing = [rid for rid in ids if rid not in answers]
+    failed = await _release(missing)
+    metrics.feedback_batch_seconds.observe(time.perf_counter() - started)
+
+    counts = {"done": len(answers), "retry": len(missing) - failed, "failed": failed}
+    for outcome, n in counts.items():
+        metrics.feedback_reflections.labels(outcome).inc(n)
+    return counts
+
+
+async def run_once(
+    concurrency: int = FEEDBACK_CONCURRENCY, batch_size: int = FEEDBACK_BATCH_SIZE
+) -> Dict[str, float]:
+    """
+    Drains the pending backlog with up to `concurrency` batches in flight.
+    Returns counts plus throughput in reflections per minute.
+    """
+    started = time.perf_counter()
+    totals = {"batches": 0, "done": 0, "retry": 0, "failed": 0}
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(batch: List[Dict]) -> None:
+        async with sem:
+            counts = await process_batch(batch)
+        totals["batches"] += 1
+        for k, v in counts.items():
+            totals[k] += v
+
+    while True:
+        batches = await claim_batches(max(1, concurrency), batch_size)
+        if not batches:
+            break
+        done_before = totals["done"]
+        await asyncio.gather(*(run(b) for b in batches))
+        if totals["done"] == done_before:
+            # nothing came back this round (model down?); leave the rest for the
+            # next pass instead of burning their attempts now
+            break
+
+    elapsed = time.perf_counter() - started
+    totals["seconds"] = round(elapsed, 3)
+    totals["per_minute"] = round(totals["done"] * 60 / elapsed, 1) if elapsed > 0 else 0.0
+    return totals
+
+
+async def pending_count() -> Dict[str, int]:
+    async with reader() as db:
+        cur = await db.execute(
+            "SELECT feedback_state, COUNT(*) AS n FROM reflections GROUP BY feedback_state;"
+        )
+        return {r["feedback_state"]: r["n"] for r in await cur.fetchall()}
+
+
+# ---------- Background loop ----------
+class FeedbackWorker:
+    """Polls for pending reflections; notify() skips the wait after a new save."""
+
+    def __init__(self, poll_seconds: float = FEEDBACK_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.last_run: Dict[str, float] = {}
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def notify(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                result = await run_once()
+                if result["batches"]:
+                    self.last_run = result
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # DB busy, Ollama down, ...; leases make the next pass safe
+                logger.exception("Feedback pass failed; retrying in %ss", self.poll_seconds)
+                metrics.feedback_errors.labels("loop").inc()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def stats(self) -> Dict:
+        return {"running": int(self._task is not None), **self.last_run}
+
+
+feedback_worker = FeedbackWorker()
+
+
+async def _main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+
+    from backend.database import init_db, open_pool, close_pool
+    from backend.ollama_client import close_client
+
+    parser = argparse.ArgumentParser(description="Generate AI feedback for pending reflections.")
+    parser.add_argument("--loop", action="store_true", help="keep polling instead of exiting when drained")
+    parser.add_argument("--batch-size", type=int, default=FEEDBACK_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=FEEDBACK_CONCURRENCY)
+    args = parser.parse_args(argv)
+
+    await init_db()
+    await open_pool(readers=1)
+    try:
+        while True:
+            result = await run_once(args.concurrency, args.batch_size)
+            result["states"] = await pending_count()
+            print(json.dumps(result), flush=True)
+            if not args.loop:
+                break
+            await asyncio.sleep(FEEDBACK_POLL_SECONDS)
+    finally:
+        await close_client()
+        await close_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
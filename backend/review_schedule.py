@@ -0,0 +1,172 @@
+# backend/review_schedule.py
+"""
+Spaced-repetition review scheduling (SM-2).
+
+Each user_problems row carries its own schedule: ease, interval_days,
+repetitions and next_review_at. An explicit POST /review/{slug} grade
+advances it through crud.review_problem without touching the status.
+crud._write_statuses advances it on a status change (first solve, solved
+after attempting, falling back to attempted); re-sending an unchanged status
+leaves the schedule alone. The due queue is then a range scan on the partial index
+idx_user_problems_due (user_id, next_review_at, problem_id).
+
+    python -m backend.review_schedule [--only-missing] [--chunk-size 5000]
+
+recomputes interval_days / next_review_at for every row from its stored
+repetitions, ease and last_updated, one transaction per chunk. Run it with
+--only-missing once after upgrading to schedule existing history, or in full
+after changing the interval settings below.
+"""
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+REVIEW_MAX_INTERVAL_DAYS = int(os.getenv("REVIEW_MAX_INTERVAL_DAYS", "365"))
+REVIEW_RECOMPUTE_CHUNK = int(os.getenv("REVIEW_RECOMPUTE_CHUNK", "5000"))
+
+# grades a client can send, as SM-2 quality (0-5; below 3 is a lapse)
+GRADES = {"again": 1, "hard": 3, "good": 4, "easy": 5}
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class Schedule:
+    __slots__ = ("ease", "interval_days", "repetitions")
+
+    def __init__(self, ease: float = INITIAL_EASE, interval_days: int = 0, repetitions: int = 0):
+        self.ease = ease
+        self.interval_days = interval_days
+        self.repetitions = repetitions
+
+    def review(self, quality: int) -> "Schedule":
+        """The schedule after one review of the given SM-2 quality."""
+        if quality >= 3:
+            if self.repetitions == 0:
+                interval = 1
+            elif self.repetitions == 1:
+                interval = 6
+            else:
+                interval = round(self.interval_days * self.ease)
+            repetitions = self.repetitions + 1
+        else:
+            interval, repetitions = 1, 0
+        ease = max(MIN_EASE, self.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        return Schedule(round(ease, 4), min(max(1, interval), REVIEW_MAX_INTERVAL_DAYS), repetitions)
+
+
+def quality_for_status(old: Optional[str], new: str) -> Optional[int]:
+    """
+    Implied review quality of a status write without an explicit grade;
+    None when the status didn't change (a re-sync isn't a review).
+    """
+    if old == new:
+        return None
+    if new == "solved":
+        # solved outright vs. solved after struggling with it
+        return GRADES["good"] if old is None else GRADES["hard"]
+    return 2
+
+
+def interval_for(repetitions: int, ease: float) -> int:
+    """Interval SM-2 reaches after `repetitions` passing reviews at a fixed ease."""
+    interval = 1
+    for n in range(2, repetitions + 1):
+        interval = 6 if n == 2 else round(interval * ease)
+        if interval >= REVIEW_MAX_INTERVAL_DAYS:
+            return REVIEW_MAX_INTERVAL_DAYS
+    return interval
+
+
+def due_at(base: str, interval_days: int) -> str:
+    """`base` (a last_updated timestamp) plus the interval, in the same format."""
+    try:
+        start = datetime.strptime(base, TIMESTAMP_FORMAT)
+    except (TypeError, ValueError):
+        start = datetime.now()
+    return (start + timedelta(days=interval_days)).strftime(TIMESTAMP_FORMAT)
+
+
+def now() -> str:
+    # same clock as user_problems.last_updated (datetime('now','localtime'))
+    return datetime.now().strftime(TIMESTAMP_FORMAT)
+
+
+# ---------- Batch recompute ----------
+def _recompute_row(
+    status: str, ease: float, repetitions: int, next_review_at: Optional[str], last_updated: Optional[str]
+) -> Tuple[int, int, str]:
+    if next_review_at is None and status == "solved" and repetitions == 0:
+        # history from before scheduling: a solve counts as the first review
+        repetitions = 1
+    interval = interval_for(repetitions, ease) if status == "solved" else 1
+    return repetitions, interval, due_at(last_updated, interval)
+
+
+async def recompute(only_missing: bool = False, chunk_size: int = REVIEW_RECOMPUTE_CHUNK) -> Dict:
+    """
+    Walks user_problems in rowid order, one writer transaction per chunk, so
+    request writes interleave between chunks instead of waiting on one long
+    transaction.
+    """
+    from backend.database import writer
+
+    started = time.perf_counter()
+    stats = {"rows": 0, "chunks": 0}
+    after = 0
+    while True:
+        async with writer() as db:
+            cur = await db.execute(
+                f"""
+                SELECT rowid, status, ease, repetitions, next_review_at, last_updated
+                FROM user_problems
+                WHERE rowid > ? {"AND next_review_at IS NULL" if only_missing else ""}
+                ORDER BY rowid
+                LIMIT ?;
+                """,
+                (after, chunk_size),
+            )
+            rows = await cur.fetchall()
+            if not rows:
+                break
+            updates = []
+            for rowid, status, ease, repetitions, next_review_at, last_updated in rows:
+                reps, interval, due = _recompute_row(status, ease, repetitions, next_review_at, last_updated)
+                updates.append((reps, interval, due, rowid))
+            await db.executemany(
+                "UPDATE user_problems SET repetitions = ?, interval_days = ?, next_review_at = ? WHERE rowid = ?;",
+                updates,
+            )
+        after = rows[-1][0]
+        stats["rows"] += len(rows)
+        stats["chunks"] += 1
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+async def _main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+
+    from backend.database import init_db, open_pool, close_pool
+
+    parser = argparse.ArgumentParser(description="Recompute spaced-repetition schedules for all users.")
+    parser.add_argument("--only-missing", action="store_true", help="only rows that have never been scheduled")
+    parser.add_argument("--chunk-size", type=int, default=REVIEW_RECOMPUTE_CHUNK)
+    args = parser.parse_args(argv)
+
+    await init_db()
+    await open_pool(readers=1)
+    try:
+        stats = await recompute(only_missing=args.only_missing, chunk_size=max(1, args.chunk_size))
+    finally:
+        await close_pool()
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,77 @@
+# backend/routers/dashboard.py
+from datetime import date, timedelta
+from typing import Dict, List, Literal, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException
+import aiosqlite
+
+from backend.database import get_db
+from backend.deps import get_current_user
+from backend.schemas import ActivitySeries, TopicActivityOut
+from backend import activity_rollup, crud
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+Range = Literal["week", "month", "all"]
+# days of daily buckets per range; "all" uses monthly buckets
+_RANGE_DAYS = {"week": 7, "month": 30}
+
+
+def _since(period: str) -> Optional[str]:
+    if period == "all":
+        return None
+    return (date.today() - timedelta(days=_RANGE_DAYS[period] - 1)).isoformat()
+
+
+def _buckets(period: str, first: Optional[str]) -> List[str]:
+    """Every bucket the chart shows, so days/months without activity come back as zeros."""
+    today = date.today()
+    if period != "all":
+        return [(today - timedelta(days=n)).isoformat() for n in range(_RANGE_DAYS[period] - 1, -1, -1)]
+    if first is None:
+        return []
+    year, month = int(first[:4]), int(first[5:7])
+    out = []
+    while (year, month) <= (today.year, today.month):
+        out.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return out
+
+
+@router.get("/activity", response_model=ActivitySeries)
+async def activity(
+    range: Range = "week",
+    topic: Optional[str] = None,
+    user=Depends(get_current_user),
+    db: aiosqlite.Connection = Depends(get_db),
+):
+    """Problems solved / attempted per day (week, month) or per month (all), from the rollup."""
+    topic_id = activity_rollup.ALL_TOPICS
+    if topic:
+        topic_id = await crud.get_topic_id(db, topic)
+        if topic_id is None:
+            raise HTTPException(status_code=404, detail="Unknown topic")
+
+    rows = await crud.get_activity_series(db, user["id"], topic_id, _since(range), monthly=range == "all")
+    by_bucket: Dict[str, Tuple[int, int]] = {r["bucket"]: (r["solved"], r["attempted"]) for r in rows}
+    points = [
+        {"bucket": b, "solved": by_bucket.get(b, (0, 0))[0], "attempted": by_bucket.get(b, (0, 0))[1]}
+        for b in _buckets(range, rows[0]["bucket"] if rows else None)
+    ]
+    return {
+        "range": range,
+        "topic": topic.strip().lower() if topic else None,
+        "points": points,
+        "solved": sum(p["solved"] for p in points),
+        "attempted": sum(p["attempted"] for p in points),
+    }
+
+
+@router.get("/topics", response_model=TopicActivityOut)
+async def topics(
+    range: Range = "week",
+    user=Depends(get_current_user),
+    db: aiosqlite.Connection = Depends(get_db),
+):
+    """Per-topic solved / attempted totals over the range."""
+    return {"range": range, "items": await crud.get_topic_activity(db, user["id"], _since(range))}
@@ -0,0 +1,43 @@
+# backend/routers/data.py
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from backend.deps import ADMIN_EMAILS, get_current_user
+from backend import user_data
+
+router = APIRouter(tags=["data"])
+
+
+@router.get("/export")
+async def export_data(user=Depends(get_current_user)):
+    """The user's history, LeetCode link and reflections as streamed NDJSON."""
+    return StreamingResponse(
+        user_data.export_lines(user["id"]),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="learning-journal-export.ndjson"'},
+    )
+
+
+@router.post("/import")
+async def import_data(
+    request: Request,
+    chunk_size: int = Query(user_data.IMPORT_CHUNK_SIZE, ge=1, le=50_000),
+    restore_catalog: bool = Query(False),
+    user=Depends(get_current_user),
+):
+    """
+    Send an /export file as the raw request body (application/x-ndjson).
+    It is read as it arrives, never buffered whole. Problems the catalog
+    doesn't have are skipped unless an admin passes restore_catalog=true.
+    """
+    if restore_catalog and user["email"].lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="restore_catalog is admin only")
+    try:
+        return await user_data.import_user_data(
+            user["id"],
+            user_data.iter_ndjson(request.stream()),
+            chunk_size=chunk_size,
+            restore_catalog=restore_catalog,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
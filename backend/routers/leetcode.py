@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+import io
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 import aiosqlite
 
-from backend.database import get_db
-from backend.deps import get_current_user
-from backend.schemas import LeetCodeLinkIn, ManualSyncIn, RecommendRequest, RecommendResponse, ProblemOut
+from backend.database import get_db, writer
+from backend.deps import get_current_user, get_admin_user
+from backend.schemas import (
+    LeetCodeLinkIn, ManualSyncIn, RecommendRequest, RecommendResponse, ProblemOut,
+    ProblemPage, HistoryItemOut, HistoryPage, SimilarProblemOut, SimilarResponse,
+)
 from backend import crud
+from backend import catalog_import, pagination, recommender
 
 router = APIRouter(prefix="/leetcode", tags=["leetcode"])
 
@@ -12,33 +19,36 @@ router = APIRouter(prefix="/leetcode", tags=["leetcode"])
 async def link_leetcode(
     payload: LeetCodeLinkIn,
     user=Depends(get_current_user),
-    db: aiosqlite.Connection = Depends(get_db),
 ):
-    await crud.upsert_leetcode_link(db, user["id"], payload.username.strip())
+    async with writer() as db:
+        await crud.upsert_leetcode_link(db, user["id"], payload.username.strip())
     return {"ok": True, "username": payload.username.strip()}
 
 
 @router.post("/seed")
 async def seed_problem_catalog(
     user=Depends(get_current_user),
-    db: aiosqlite.Connection = Depends(get_db),
 ):
-    # Small starter set (expand anytime)
-    starter = [
-        ("two-sum", "Two Sum", "Easy", "arrays,hashmap"),
-        ("valid-parentheses", "Valid Parentheses", "Easy", "stack"),
-        ("merge-two-sorted-lists", "Merge Two Sorted Lists", "Easy", "linked_list"),
-        ("binary-tree-inorder-traversal", "Binary Tree Inorder Traversal", "Easy", "trees,dfs"),
-        ("number-of-islands", "Number of Islands", "Medium", "graphs,dfs,bfs"),
-        ("course-schedule", "Course Schedule", "Medium", "graphs,topological_sort"),
-        ("lowest-common-ancestor-of-a-binary-tree", "LCA of a Binary Tree", "Medium", "trees"),
-        ("longest-substring-without-repeating-characters", "Longest Substring Without Repeating Characters", "Medium", "sliding_window,hashmap"),
-    ]
+    # Small starter set bundled with the app (backend/data/problem_catalog.jsonl)
+    stats = await catalog_import.import_catalog_file(catalog_import.DEFAULT_CATALOG_PATH)
+    return {"ok": True, "seeded": stats["read"] - stats["invalid"]}
+
 
-    for slug, title, diff, topics in starter:
-        await crud.upsert_problem(db, slug, title, diff, topics)
+@router.post("/catalog/import")
+async def import_problem_catalog(
+    file: UploadFile = File(...),
+    chunk_size: int = catalog_import.DEFAULT_CHUNK_SIZE,
+    admin=Depends(get_admin_user),
+):
+    try:
+        fmt = catalog_import.format_for(file.filename or "")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return {"ok": True, "seeded": len(starter)}
+    # stream the spooled upload row by row instead of reading it into memory
+    fp = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    stats = await catalog_import.import_catalog(catalog_import.iter_catalog(fp, fmt), chunk_size=max(1, chunk_size))
+    return {"ok": True, **stats}
 
 
 @router.post("/sync_manual")
@@ -52,18 +62,19 @@ async def sync_manual(
     if not username:
         raise HTTPException(status_code=400, detail="Link LeetCode username first via /leetcode/link")
 
-    # Apply statuses
-    for slug in payload.solved_slugs:
-        pid = await crud.get_problem_id_by_slug(db, slug)
-        if pid is not None:
-            await crud.set_user_problem_status(db, user["id"], pid, "solved")
+    # Apply statuses in one transaction (attempted wins if a slug is in both lists)
+    statuses = {slug: "solved" for slug in payload.solved_slugs}
+    statuses.update({slug: "attempted" for slug in payload.attempted_slugs})
 
-    for slug in payload.attempted_slugs:
-        pid = await crud.get_problem_id_by_slug(db, slug)
-        if pid is not None:
-            await crud.set_user_problem_status(db, user["id"], pid, "attempted")
+    async with writer() as wdb:
+        unknown = await crud.set_user_problem_statuses(wdb, user["id"], statuses)
 
-    return {"ok": True, "solved": len(payload.solved_slugs), "attempted": len(payload.attempted_slugs)}
+    return {
+        "ok": True,
+        "solved": len(payload.solved_slugs),
+        "attempted": len(payload.attempted_slugs),
+        "unknown": unknown,
+    }
 
 
 @router.post("/recommend", response_model=RecommendResponse)
@@ -72,7 +83,7 @@ async def recommend(
     user=Depends(get_current_user),
     db: aiosqlite.Connection = Depends(get_db),
 ):
-    recs = await crud.recommend_problems(
+    recs = await recommender.recommend(
         db=db,
         user_id=user["id"],
         weak_topics=payload.weak_topics,
@@ -81,13 +92,129 @@ async def recommend(
     )
 
     def to_out(r):
-        topics = [t.strip() for t in (r["topics"] or "").split(",") if t.strip()]
         return ProblemOut(
             slug=r["slug"],
             title=r["title"],
             difficulty=r["difficulty"],
-            topics=topics,
+            topics=crud.topic_list(r["topics"]),
             status=r.get("status"),
         )
 
     return {"recommendations": [to_out(r) for r in recs]}
+
+
+Difficulty = Optional[Literal["Easy", "Medium", "Hard"]]
+Status = Optional[Literal["solved", "attempted", "not_started"]]
+
+
+@router.get("/problems", response_model=ProblemPage)
+async def list_problems(
+    cursor: Optional[str] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    difficulty: Difficulty = None,
+    status: Status = None,
+    topic: Optional[str] = None,
+    user=Depends(get_current_user),
+    db: aiosqlite.Connection = Depends(get_db),
+):
+    key = pagination.decode_cursor(cursor, (int,))
+    rows = await crud.list_problems_with_status(
+        db,
+        user["id"],
+        limit=limit + 1,
+        after_id=key[0] if key else None,
+        difficulty=difficulty,
+        status=status,
+        topic=topic,
+    )
+    result = pagination.page(rows, limit, lambda r: [r["id"]])
+    result["items"] = [
+        ProblemOut(
+            slug=r["slug"],
+            title=r["title"],
+            difficulty=r["difficulty"],
+            topics=crud.topic_list(r["topics"]),
+            status=r["status"],
+        )
+        for r in result["items"]
+    ]
+    return result
+
+
+@router.get("/history", response_model=HistoryPage)
+async def history(
+    cursor: Optional[str] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    difficulty: Difficulty = None,
+    status: Optional[Literal["solved", "attempted"]] = None,
+    topic: Optional[str] = None,
+    user=Depends(get_current_user),
+    db: aiosqlite.Connection = Depends(get_db),
+):
+    key = pagination.decode_cursor(cursor, (str, int))
+    rows = await crud.get_user_problem_history(
+        db,
+        user["id"],
+        limit=limit + 1,
+        before=tuple(key) if key else None,
+        difficulty=difficulty,
+        status=status,
+        topic=topic,
+    )
+    result = pagination.page(rows, limit, lambda r: [r["last_updated"], r["problem_id"]])
+    result["items"] = [
+        HistoryItemOut(
+            slug=r["slug"],
+            title=r["title"],
+            difficulty=r["difficulty"],
+            topics=crud.topic_list(r["topics"]),
+            status=r["status"],
+            last_updated=r["last_updated"],
+        )
+        for r in result["items"]
+    ]
+    return result
+
+
+@router.get("/similar", response_model=SimilarResponse)
+async def similar_problems(
+    slug: Optional[str] = None,
+    difficulty: Difficulty = None,
+    limit: int = Query(10, ge=1, le=50),
+    user=Depends(get_current_user),
+    db: aiosqlite.Connection = Depends(get_db),
+):
+    """
+    Unsolved problems most similar to `slug`, or without it to the user's
+    recent attempted problems, by embedding cosine similarity.
+    """
+    # numpy comes with it; imported here so workers that never serve this don't load it
+    from backend import similarity
+
+    seed_ids = None
+    if slug:
+        pid = await crud.get_problem_id_by_slug(db, slug)
+        if pid is None:
+            raise HTTPException(status_code=404, detail="Unknown problem")
+        seed_ids = [pid]
+
+    if not len(await similarity.get_index(db)):
+        raise HTTPException(status_code=503, detail="Similarity index is empty; run python -m backend.embeddings")
+
+    seeds, hits = await similarity.similar(db, user["id"], seed_ids=seed_ids, difficulty=difficulty, limit=limit)
+    problems = await crud.get_problems_by_ids(db, seeds + [h["problem_id"] for h in hits])
+
+    items = []
+    for h in hits:
+        p = problems.get(h["problem_id"])
+        if p is None:
+            continue  # deleted since the index was loaded
+        items.append(SimilarProblemOut(
+            slug=p["slug"],
+            title=p["title"],
+            difficulty=p["difficulty"],
+            topics=crud.topic_list(p["topics"]),
+            status=h["status"],
+            score=round(h["score"], 4),
+        ))
+    return {"seeds": [problems[pid]["slug"] for pid in seeds if pid in problems], "items": items}
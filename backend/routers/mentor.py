@@ -1,107 +1,138 @@
 # backend/routers/mentor.py
-from fastapi import APIRouter, Depends, HTTPException
-import aiosqlite
+import json
 
-from backend.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+
+from backend.database import reader
 from backend.deps import get_current_user
-from backend.schemas import MentorChatIn, MentorChatOut, MentorRecommendation
-from backend import crud
-from backend.ollama_client import ollama_chat_json
+from backend.schemas import MentorChatIn, MentorChatOut, MentorJobOut
+from backend import crud, recommender
+from backend.json_stream import ArrayItemStream
+from backend.llm_cache import mentor_cache
+from backend.mentor_context import get_context
+from backend.mentor_jobs import QueueFull, job_queue
+from backend.mentor_service import (
+    SYSTEM_PROMPT,
+    MentorError,
+    RecommendationCleaner,
+    build_response,
+    build_user_prompt,
+    cache_key,
+    mentor_reply,
+    persist_recommendations,
+)
+from backend.ollama_client import ollama_chat_stream, parse_json_content
 
 router = APIRouter(prefix="/mentor", tags=["mentor"])
 
 
 @router.post("/chat", response_model=MentorChatOut)
 async def mentor_chat(
+    payload: MentorChatIn,
+    response: Response,
+    user=Depends(get_current_user),
+):
+    try:
+        out, cached = await mentor_reply(user["id"], payload)
+    except MentorError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    response.headers["X-Cache"] = "hit" if cached else "miss"
+    return out
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/chat/stream")
+async def mentor_chat_stream(
     payload: MentorChatIn,
     user=Depends(get_current_user),
-    db: aiosqlite.Connection = Depends(get_db),
 ):
-    # 1) Pull the user's learning context from DB
-    history = await crud.get_user_problem_history(db, user["id"], limit=30)
-    stats = await crud.get_user_topic_stats(db, user["id"])
-
-    # Make a compact context string for the model
-    history_lines = []
-    for h in history:
-        topics = [t.strip() for t in (h.get("topics") or "").split(",") if t.strip()]
-        history_lines.append(f"- {h['slug']} ({h['difficulty']}) status={h['status']} topics={topics}")
-
-    system = (
-        "You are an AI LeetCode mentor. Be practical and concise. "
-        "Recommend problems based on the user's history and weaknesses. "
-        "Return ONLY JSON with keys: reply, recommendations, next_steps. "
-        "recommendations must be a list of {slug, title, difficulty, why}. "
-        "Use real LeetCode slugs (e.g., 'number-of-islands')."
+    """
+    Same as /mentor/chat, streamed as Server-Sent Events:
+    `token` for each model chunk, `recommendation` for each cleaned item as soon
+    as it is complete, then `done` with the full MentorChatOut (or `error`).
+    """
+    # read everything up front and hand the pooled reader back before
+    # streaming; a get_db dependency would stay checked out until the stream ends
+    async with reader() as db:
+        version = await crud.get_history_version(db, user["id"])
+        key = cache_key(payload, version)
+        cached = await mentor_cache.get(key, user["id"])
+        if cached is None:
+            context = await get_context(db, user["id"], version)
+            catalog = await recommender.get_snapshot(db)
+
+    if cached is not None:
+        async def replay():
+            for item in cached["recommendations"]:
+                yield _sse("recommendation", item)
+            yield _sse("done", cached)
+
+        return StreamingResponse(replay(), media_type="text/event-stream", headers={"X-Cache": "hit"})
+
+    user_prompt = build_user_prompt(payload, context)
+
+    async def events():
+        cleaner = RecommendationCleaner(payload, context.solved, catalog)
+        items = ArrayItemStream("recommendations")
+        chunks = []
+        try:
+            async for token in ollama_chat_stream(system=SYSTEM_PROMPT, user=user_prompt):
+                chunks.append(token)
+                yield _sse("token", {"text": token})
+                for r in items.feed(token):
+                    item = cleaner.add(r)
+                    if item and len(cleaner.cleaned) <= cleaner.limit:
+                        yield _sse("recommendation", item)
+            obj = parse_json_content("".join(chunks))
+        except Exception as e:
+            yield _sse("error", {"detail": f"Ollama error: {e}"})
+            return
+
+        # the final parse may contain items the incremental scan couldn't read
+        for r in obj.get("recommendations", []) or []:
+            item = cleaner.add(r)
+            if item and len(cleaner.cleaned) <= cleaner.limit:
+                yield _sse("recommendation", item)
+
+        await persist_recommendations(cleaner.new_problems)
+        out = build_response(obj, cleaner).model_dump()
+        await mentor_cache.put(key, user["id"], out)
+        yield _sse("done", out)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Cache": "miss"},
     )
 
-    user_prompt = f"""
-User message: {payload.message}
-Weak topics (self-reported): {payload.weak_topics}
-Target difficulty: {payload.target_difficulty}
-Return up to {payload.limit} recommendations.
-
-User topic stats:
-- solved counts by topic: {stats.get("solved", {})}
-- attempted counts by topic: {stats.get("attempted", {})}
-
-Recent history (most recent first):
-{chr(10).join(history_lines) if history_lines else "(no history yet)"}
-
-Rules:
-- Prefer problems that strengthen weak topics and core patterns.
-- Avoid recommending problems that appear as solved in history.
-- If no target difficulty is given, pick a good progression (mostly Medium, some Easy if fundamentals missing).
-- Output JSON only.
-
-Return JSON exactly like:
-{{
-  "reply": "...",
-  "recommendations": [
-    {{"slug":"...","title":"...","difficulty":"Easy|Medium|Hard","why":"..."}}
-  ],
-  "next_steps": ["...", "..."]
-}}
-"""
 
+@router.post("/jobs", response_model=MentorJobOut, status_code=202)
+async def submit_mentor_job(
+    payload: MentorChatIn,
+    user=Depends(get_current_user),
+):
     try:
-        obj = await ollama_chat_json(system=system, user=user_prompt)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Ollama error: {e}")
-
-    # 2) Normalize keys
-    reply = obj.get("reply", "")
-    recs = obj.get("recommendations", []) or []
-    steps = obj.get("next_steps") or obj.get("nextSteps") or []
-
-    # 3) Clean + store recommended problems into DB (so you can track them)
-    cleaned = []
-    seen = set()
-
-    # Build a set of solved slugs so we don't store/recommend duplicates
-    solved_slugs = {h["slug"] for h in history if h.get("status") == "solved"}
-
-    for r in recs:
-        slug = (r.get("slug") or "").strip()
-        title = (r.get("title") or "").strip()
-        difficulty = (r.get("difficulty") or "").strip()
-        why = (r.get("why") or "").strip()
-
-        if not slug or slug in seen or slug in solved_slugs:
-            continue
-        if difficulty not in {"Easy", "Medium", "Hard"}:
-            # Default if model outputs something weird
-            difficulty = payload.target_difficulty or "Medium"
-
-        seen.add(slug)
-        cleaned.append({"slug": slug, "title": title or slug, "difficulty": difficulty, "why": why or "Good next step."})
-
-        # Save into problems table so you can track it later
-        # topics unknown for AI-added problems -> store empty topics for now
-        await crud.upsert_problem(db, slug, title or slug, difficulty, topics_csv="")
-
-    return MentorChatOut(
-        reply=reply,
-        recommendations=[MentorRecommendation(**x) for x in cleaned[: payload.limit]],
-        next_steps=steps,
-    )
+        return await job_queue.submit(user["id"], payload)
+    except QueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Mentor is busy, try again later",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+@router.get("/jobs/{job_id}", response_model=MentorJobOut)
+async def get_mentor_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=30, description="long-poll up to this many seconds"),
+    user=Depends(get_current_user),
+):
+    job = await job_queue.get(job_id, user["id"], wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,86 @@
+# backend/routers/reflections.py
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+import aiosqlite
+
+from backend.database import get_db, writer
+from backend.deps import get_current_user
+from backend.schemas import ReflectionIn, ReflectionOut, ReflectionPage, ReflectionSearchPage
+from backend import crud, pagination
+from backend.reflection_feedback import feedback_worker
+
+router = APIRouter(prefix="/reflections", tags=["reflections"])
+
+
+@router.post("", response_model=ReflectionOut, status_code=201)
+async def create_reflection(payload: ReflectionIn, user=Depends(get_current_user)):
+    async with writer() as db:
+        problem_id = await crud.get_problem_id_by_slug(db, payload.slug.strip())
+        if problem_id is None:
+            raise HTTPException(status_code=404, detail="Unknown problem")
+        row = await crud.create_reflection(db, user["id"], problem_id, payload.notes)
+    # feedback is generated in the background; wake the worker if it's running
+    feedback_worker.notify()
+    return row
+
+
+@router.get("", response_model=ReflectionPage)
+async def list_reflections(
+    cursor: Optional[str] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    slug: Optional[str] = None,
+    user=Depends(get_current_user),
+    db: aiosqlite.Connection = Depends(get_db),
+):
+    key = pagination.decode_cursor(cursor, (int,))
+    problem_id = None
+    if slug:
+        problem_id = await crud.get_problem_id_by_slug(db, slug.strip())
+        if problem_id is None:
+            return {"items": [], "next_cursor": None}
+
+    rows = await crud.list_reflections(
+        db,
+        user["id"],
+        limit=limit + 1,
+        before_id=key[0] if key else None,
+        problem_id=problem_id,
+    )
+    return pagination.page(rows, limit, lambda r: [r["id"]])
+
+
+# declared before /{reflection_id} so "search" isn't parsed as an id
+@router.get("/search", response_model=ReflectionSearchPage)
+async def search_reflections(
+    q: str = Query(min_length=1, max_length=500),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=pagination.MAX_PAGE_SIZE),
+    user=Depends(get_current_user),
+    db: aiosqlite.Connection = Depends(get_db),
+):
+    match = crud.fts_query(q)
+    if match is None:
+        raise HTTPException(status_code=400, detail="Query has no searchable words")
+
+    key = pagination.decode_cursor(cursor, (float, int))
+    rows = await crud.search_reflections(
+        db,
+        user["id"],
+        match,
+        limit=limit + 1,
+        after=tuple(key) if key else None,
+    )
+    return pagination.page(rows, limit, lambda r: [r["rank"], r["id"]])
+
+
+@router.get("/{reflection_id}", response_model=ReflectionOut)
+async def get_reflection(
+    reflection_id: int,
+    user=Depends(get_current_user),
+    db: aiosqlite.Connection = Depends(get_db),
+):
+    row = await crud.get_reflection(db, user["id"], reflection_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Reflection not found")
+    return row
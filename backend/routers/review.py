@@ -0,0 +1,56 @@
+# backend/routers/review.py
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+import aiosqlite
+
+from backend.database import get_db, writer
+from backend.deps import get_current_user
+from backend.schemas import ReviewIn, ReviewItemOut, ReviewPage
+from backend import crud, pagination, review_schedule
+
+router = APIRouter(prefix="/review", tags=["review"])
+
+
+def _to_out(r: dict) -> ReviewItemOut:
+    return ReviewItemOut(
+        slug=r["slug"],
+        title=r["title"],
+        difficulty=r["difficulty"],
+        topics=crud.topic_list(r["topics"]),
+        status=r["status"],
+        next_review_at=r["next_review_at"],
+        interval_days=r["interval_days"],
+        repetitions=r["repetitions"],
+        ease=r["ease"],
+    )
+
+
+@router.get("/due", response_model=ReviewPage)
+async def due_reviews(
+    cursor: Optional[str] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    user=Depends(get_current_user),
+    db: aiosqlite.Connection = Depends(get_db),
+):
+    key = pagination.decode_cursor(cursor, (str, int))
+    now = review_schedule.now()
+    rows = await crud.list_due_reviews(
+        db, user["id"], due_before=now, limit=limit + 1, after=tuple(key) if key else None
+    )
+    result = pagination.page(rows, limit, lambda r: [r["next_review_at"], r["problem_id"]])
+    result["items"] = [_to_out(r) for r in result["items"]]
+    result["due"] = await crud.count_due_reviews(db, user["id"], now)
+    return result
+
+
+@router.post("/{slug}", response_model=ReviewItemOut)
+async def review(slug: str, payload: ReviewIn, user=Depends(get_current_user)):
+    async with writer() as db:
+        problem_id = await crud.get_problem_id_by_slug(db, slug.strip())
+        if problem_id is None:
+            raise HTTPException(status_code=404, detail="Unknown problem")
+        row = await crud.review_problem(db, user["id"], problem_id, review_schedule.GRADES[payload.grade])
+    if row is None:
+        raise HTTPException(status_code=404, detail="Problem is not in your history")
+    return _to_out(row)
@@ -1,22 +1,48 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-import aiosqlite
 
-from backend.database import get_db
+from backend.database import reader, writer
 from backend import crud
-from backend.schemas import UserCreate, UserLogin, Token, UserOut
-from backend.deps import hash_password, verify_password, create_access_token, get_current_user
+from backend.schemas import UserCreate, UserLogin, Token, UserOut, PasswordChange
+from backend.deps import (
+    hash_password,
+    verify_password,
+    verify_and_update_password,
+    create_access_token,
+    get_current_user,
+    invalidate_principal,
+)
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+
+async def _get_user(email: str):
+    # a short read: no pooled reader is held while a password is hashed
+    async with reader() as db:
+        return await crud.get_user_by_email(db, email)
+
+
+async def _authenticate(email: str, password: str):
+    user = await _get_user(email)
+    if not user:
+        return None
+    ok, new_hash = await verify_and_update_password(password, user["hashed_password"])
+    if not ok:
+        return None
+    if new_hash:
+        # hash parameters changed since this password was stored
+        async with writer() as wdb:
+            await crud.update_user_password(wdb, user["id"], new_hash)
+    return user
+
+
 @router.post("/token", response_model=Token)
 async def token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: aiosqlite.Connection = Depends(get_db),
 ):
     # Swagger sends "username" — we treat it as email
-    user = await crud.get_user_by_email(db, form_data.username)
-    if not user or not verify_password(form_data.password, user["hashed_password"]):
+    user = await _authenticate(form_data.username, form_data.password)
+    if not user:
         raise HTTPException(status_code=401, detail="Wrong email or password")
 
     token = create_access_token(str(user["id"]))
@@ -24,18 +50,20 @@ async def token(
 
 
 @router.post("/signup", response_model=UserOut)
-async def signup(payload: UserCreate, db: aiosqlite.Connection = Depends(get_db)):
+async def signup(payload: UserCreate):
+    hashed = await hash_password(payload.password)
     try:
-        user = await crud.create_user(db, payload.email, hash_password(payload.password))
+        async with writer() as db:
+            user = await crud.create_user(db, payload.email, hashed)
         return user
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/login", response_model=Token)
-async def login(payload: UserLogin, db: aiosqlite.Connection = Depends(get_db)):
-    user = await crud.get_user_by_email(db, payload.email)
-    if not user or not verify_password(payload.password, user["hashed_password"]):
+async def login(payload: UserLogin):
+    user = await _authenticate(payload.email, payload.password)
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Wrong email or password")
 
     token = create_access_token(str(user["id"]))
@@ -45,3 +73,27 @@ async def login(payload: UserLogin, db: aiosqlite.Connection = Depends(get_db)):
 @router.get("/me", response_model=UserOut)
 async def me(user=Depends(get_current_user)):
     return user
+
+
+@router.put("/me/password")
+async def change_password(
+    payload: PasswordChange,
+    user=Depends(get_current_user),
+):
+    current = await _get_user(user["email"])
+    if not current or not await verify_password(payload.current_password, current["hashed_password"]):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Wrong password")
+
+    hashed = await hash_password(payload.new_password)
+    async with writer() as wdb:
+        await crud.update_user_password(wdb, user["id"], hashed)
+    invalidate_principal(user["id"])
+    return {"ok": True}
+
+
+@router.delete("/me")
+async def delete_me(user=Depends(get_current_user)):
+    async with writer() as db:
+        await crud.delete_user(db, user["id"])
+    invalidate_principal(user["id"])
+    return {"ok": True}
@@ -28,6 +28,18 @@ class UserLogin(BaseModel):
         return v
 
 
+class PasswordChange(BaseModel):
+    current_password: str
+    new_password: str = Field(min_length=6, max_length=72)
+
+    @field_validator("new_password")
+    @classmethod
+    def bcrypt_limit(cls, v: str) -> str:
+        if len(v.encode("utf-8")) > 72:
+            raise ValueError("Password cannot be longer than 72 bytes.")
+        return v
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -56,6 +68,20 @@ class ProblemOut(BaseModel):
     status: Optional[Literal["solved", "attempted", "not_started"]] = None
 
 
+class ProblemPage(BaseModel):
+    items: List[ProblemOut]
+    next_cursor: Optional[str] = None
+
+
+class HistoryItemOut(ProblemOut):
+    last_updated: Optional[str] = None
+
+
+class HistoryPage(BaseModel):
+    items: List[HistoryItemOut]
+    next_cursor: Optional[str] = None
+
+
 class RecommendRequest(BaseModel):
     weak_topics: List[str] = []
     difficulty: Optional[Literal["Easy", "Medium", "Hard"]] = None
@@ -66,6 +92,97 @@ class RecommendResponse(BaseModel):
     recommendations: List[ProblemOut]
 
 
+class SimilarProblemOut(ProblemOut):
+    score: float
+
+
+class SimilarResponse(BaseModel):
+    # slugs the results were matched against
+    seeds: List[str]
+    items: List[SimilarProblemOut]
+
+
+# ---------- Review schedule ----------
+class ReviewIn(BaseModel):
+    grade: Literal["again", "hard", "good", "easy"]
+
+
+class ReviewItemOut(ProblemOut):
+    next_review_at: Optional[str] = None
+    interval_days: int
+    repetitions: int
+    ease: float
+
+
+class ReviewPage(BaseModel):
+    items: List[ReviewItemOut]
+    next_cursor: Optional[str] = None
+    # everything due right now, not just this page
+    due: int
+
+
+# ---------- Dashboard ----------
+class ActivityPoint(BaseModel):
+    bucket: str  # YYYY-MM-DD, or YYYY-MM for range=all
+    solved: int = 0
+    attempted: int = 0
+
+
+class ActivitySeries(BaseModel):
+    range: Literal["week", "month", "all"]
+    topic: Optional[str] = None
+    points: List[ActivityPoint]
+    solved: int
+    attempted: int
+
+
+class TopicActivity(BaseModel):
+    topic: str
+    solved: int
+    attempted: int
+
+
+class TopicActivityOut(BaseModel):
+    range: Literal["week", "month", "all"]
+    items: List[TopicActivity]
+
+
+# ---------- Reflections ----------
+class ReflectionIn(BaseModel):
+    slug: str = Field(min_length=1, max_length=200)
+    notes: str = Field(min_length=1, max_length=20000)
+
+
+class ReflectionOut(BaseModel):
+    id: int
+    slug: str
+    title: str
+    notes: str
+    ai_feedback: str = ""
+    feedback_state: Literal["pending", "processing", "done", "failed"] = "pending"
+    created_at: Optional[str] = None
+
+
+class ReflectionPage(BaseModel):
+    items: List[ReflectionOut]
+    next_cursor: Optional[str] = None
+
+
+class ReflectionHit(BaseModel):
+    id: int
+    slug: str
+    title: str
+    created_at: Optional[str] = None
+    notes_snippet: str
+    feedback_snippet: str = ""
+    rank: float
+
+
+class ReflectionSearchPage(BaseModel):
+    items: List[ReflectionHit]
+    next_cursor: Optional[str] = None
+
+
 # ---------- Mentor (OpenAI) ----------
 class MentorChatIn(BaseModel):
     message: str = Field(min_length=1, max_length=4000)
@@ -85,3 +202,10 @@ class MentorChatOut(BaseModel):
     reply: str
     recommendations: List[MentorRecommendation] = []
     next_steps: List[str] = []
+
+
+class MentorJobOut(BaseModel):
+    job_id: str
+    status: Literal["queued", "running", "done", "failed"]
+    result: Optional[MentorChatOut] = None
+    error: Optional[str] = None
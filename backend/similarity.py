@@ -0,0 +1,210 @@
+# backend/similarity.py
+"""
+"More problems like these" over the problem embedding matrix.
+
+The matrix file written by backend/embeddings.py is memory-mapped read-only
+(the OS shares its pages between workers), and a query is one batched
+matrix product: every catalog row against every seed problem at once, a
+row's score being its best cosine similarity to any seed. np.argpartition
+then picks the top candidates without sorting the whole catalog. Nothing
+here calls the model; problems that haven't been embedded yet just aren't
+candidates.
+"""
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import aiosqlite
+import numpy as np
+
+from backend import crud, embeddings, metrics
+
+# like the recommender snapshot: other workers only see local invalidations
+SIMILAR_INDEX_TTL_SECONDS = float(os.getenv("SIMILAR_INDEX_TTL", "300"))
+# recent "attempted" problems used as seeds when no slug is given
+SIMILAR_SEED_LIMIT = int(os.getenv("SIMILAR_SEED_LIMIT", "10"))
+
+
+class SimilarityIndex:
+    def __init__(self, generation: int, model: str):
+        self.generation = generation
+        self.model = model
+        self.loaded_at = time.monotonic()
+        self.dim = 0
+        # (rows, dim) float32 memmap; rows of deleted problems stay but are masked
+        self.matrix: Optional[np.ndarray] = None
+        # row -> problem id, -1 for unreferenced rows
+        self.problem_ids = np.empty(0, dtype=np.int64)
+        self.row_of: Dict[int, int] = {}
+        # additive score masks: 0 for candidates, -inf otherwise
+        self.valid = np.empty(0, dtype=np.float32)
+        self.by_difficulty: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    def is_fresh(self) -> bool:
+        return (
+            self.generation == _generation
+            and self.model == embeddings.active_model()
+            and time.monotonic() - self.loaded_at < SIMILAR_INDEX_TTL_SECONDS
+        )
+
+    def scores(self, seed_ids: List[int], difficulty: Optional[str] = None) -> Optional[np.ndarray]:
+        """
+        Best cosine similarity of every row to any seed; -inf for the seeds
+        themselves, unreferenced rows and other difficulties. None when no
+        seed has an embedding.
+        """
+        seed_rows = [self.row_of[pid] for pid in seed_ids if pid in self.row_of]
+        if not seed_rows:
+            return None
+        mask = self.by_difficulty.get(difficulty) if difficulty else self.valid
+        if mask is None:
+            return None
+
+        # (rows, dim) @ (dim, seeds) -> best seed per row
+        scores = (self.matrix @ self.matrix[seed_rows].T).max(axis=1)
+        scores += mask
+        scores[seed_rows] = -np.inf
+        return scores
+
+    def top_k(self, scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """(problem_id, score) for the k best finite scores, best first."""
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self.problem_ids[r]), float(scores[r])) for r in top]
+
+    def stats(self) -> Dict:
+        return {"model": self.model, "problems": len(self), "rows": len(self.problem_ids), "dim": self.dim}
+
+
+_index: Optional[SimilarityIndex] = None
+_generation = 0
+_load_lock = asyncio.Lock()
+
+
+def invalidate() -> None:
+    """Drop the loaded index; call after a reindex has committed."""
+    global _index, _generation
+    _generation += 1
+    _index = None
+
+
+async def _load_index(db: aiosqlite.Connection) -> SimilarityIndex:
+    model = embeddings.active_model()
+    index = SimilarityIndex(_generation, model)
+
+    cur = await db.execute("SELECT dim, rows FROM embedding_matrices WHERE model = ?;", (model,))
+    meta = await cur.fetchone()
+    path = embeddings.matrix_path(model)
+    if meta is None or meta[1] == 0 or not os.path.exists(path):
+        return index
+    dim, rows = meta
+    # a row the file doesn't hold yet can't be referenced; stay within it
+    rows = min(rows, os.path.getsize(path) // (dim * np.dtype(embeddings.DTYPE).itemsize))
+    if rows == 0:
+        return index
+
+    cur = await db.execute(
+        """
+        SELECT pe.row_index, pe.problem_id, p.difficulty
+        FROM problem_embeddings pe
+        JOIN problems p ON p.id = pe.problem_id
+        WHERE pe.model = ? AND pe.row_index < ?;
+        """,
+        (model, rows),
+    )
+    mapping = await cur.fetchall()
+
+    index.dim = dim
+    index.matrix = np.memmap(path, dtype=embeddings.DTYPE, mode="r", shape=(rows, dim))
+    index.problem_ids = np.full(rows, -1, dtype=np.int64)
+    index.valid = np.full(rows, -np.inf, dtype=np.float32)
+    for row, pid, difficulty in mapping:
+        index.problem_ids[row] = pid
+        index.row_of[pid] = row
+        index.valid[row] = 0.0
+        mask = index.by_difficulty.get(difficulty)
+        if mask is None:
+            mask = index.by_difficulty[difficulty] = np.full(rows, -np.inf, dtype=np.float32)
+        mask[row] = 0.0
+    return index
+
+
+async def get_index(db: aiosqlite.Connection) -> SimilarityIndex:
+    global _index
+    index = _index
+    if index is not None and index.is_fresh():
+        return index
+    async with _load_lock:
+        if _index is None or not _index.is_fresh():
+            _index = await _load_index(db)
+        return _index
+
+
+async def _seed_ids(db: aiosqlite.Connection, user_id: int) -> List[int]:
+    # recent struggles first; a user with none gets their recent solves instead
+    for status in ("attempted", "solved"):
+        cur = await db.execute(
+            """
+            SELECT problem_id FROM user_problems
+            WHERE user_id = ? AND status = ?
+            ORDER BY last_updated DESC
+            LIMIT ?;
+            """,
+            (user_id, status, SIMILAR_SEED_LIMIT),
+        )
+        ids = [r[0] for r in await cur.fetchall()]
+        if ids:
+            return ids
+    return []
+
+
+async def similar(
+    db: aiosqlite.Connection,
+    user_id: int,
+    seed_ids: Optional[List[int]] = None,
+    difficulty: Optional[str] = None,
+    limit: int = 10,
+) -> Tuple[List[int], List[Dict]]:
+    """
+    Unsolved problems closest to `seed_ids` (default: the user's recent
+    attempted problems). Returns (seed ids used, [{problem_id, score, status}]).
+
+    Solved problems are filtered from the top candidates rather than loaded
+    up front, so the cost doesn't grow with the user's history; the
+    candidate pool widens only if too many of them were solved.
+    """
+    index = await get_index(db)
+    if seed_ids is None:
+        seed_ids = await _seed_ids(db, user_id)
+    seed_ids = [pid for pid in seed_ids if pid in index.row_of]
+    if not seed_ids or limit <= 0:
+        return seed_ids, []
+
+    started = time.perf_counter()
+    scores = index.scores(seed_ids, difficulty)
+    if scores is None:
+        return seed_ids, []
+    k = limit * 2
+    while True:
+        candidates = index.top_k(scores, k)
+        statuses = await crud.get_user_statuses(db, user_id, [pid for pid, _ in candidates])
+        picked = [
+            {"problem_id": pid, "score": score, "status": statuses.get(pid, "not_started")}
+            for pid, score in candidates
+            if statuses.get(pid) != "solved"
+        ]
+        if len(picked) >= limit or len(candidates) < k:
+            metrics.similar_query_seconds.observe(time.perf_counter() - started)
+            return seed_ids, picked[:limit]
+        k *= 4
+
+
+def stats() -> Dict:
+    return _index.stats() if _index is not None else {"model": embeddings.active_model(), "problems": 0}
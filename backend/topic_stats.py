@@ -0,0 +1,95 @@
+# backend/topic_stats.py
+"""
+Maintenance for the materialized user_topic_stats table.
+
+    python -m backend.topic_stats verify [--user ID]
+    python -m backend.topic_stats rebuild [--user ID]
+
+verify recomputes the counts from user_problems and reports any drift
+(exit code 1 if there is some); rebuild replaces the stored counts.
+"""
+import asyncio
+import json
+import sys
+from typing import Dict, List, Optional
+
+import aiosqlite
+
+# counts derived from history; anything not solved counts as attempted
+_EXPECTED_SQL = """
+    SELECT up.user_id, pt.topic_id,
+           SUM(up.status = 'solved') AS solved,
+           SUM(up.status != 'solved') AS attempted
+    FROM user_problems up
+    JOIN problem_topics pt ON pt.problem_id = up.problem_id
+    WHERE (:user_id IS NULL OR up.user_id = :user_id)
+    GROUP BY up.user_id, pt.topic_id
+"""
+
+
+async def verify(db: aiosqlite.Connection, user_id: Optional[int] = None) -> List[Dict]:
+    """Rows where the stored counts differ from the recomputed ones."""
+    cur = await db.execute(
+        f"""
+        WITH expected AS ({_EXPECTED_SQL}),
+        actual AS (
+            SELECT user_id, topic_id, solved, attempted
+            FROM user_topic_stats
+            WHERE (:user_id IS NULL OR user_id = :user_id)
+              AND (solved != 0 OR attempted != 0)
+        )
+        SELECT e.user_id, e.topic_id,
+               e.solved AS expected_solved, e.attempted AS expected_attempted,
+               COALESCE(a.solved, 0) AS solved, COALESCE(a.attempted, 0) AS attempted
+        FROM expected e
+        LEFT JOIN actual a ON a.user_id = e.user_id AND a.topic_id = e.topic_id
+        WHERE a.solved IS NOT e.solved OR a.attempted IS NOT e.attempted
+        UNION ALL
+        SELECT a.user_id, a.topic_id, 0, 0, a.solved, a.attempted
+        FROM actual a
+        LEFT JOIN expected e ON e.user_id = a.user_id AND e.topic_id = a.topic_id
+        WHERE e.user_id IS NULL;
+        """,
+        {"user_id": user_id},
+    )
+    cols = [c[0] for c in cur.description]
+    return [dict(zip(cols, r)) for r in await cur.fetchall()]
+
+
+async def rebuild(db: aiosqlite.Connection, user_id: Optional[int] = None) -> int:
+    """Recomputes user_topic_stats (for one user or everyone); the caller commits."""
+    await db.execute(
+        "DELETE FROM user_topic_stats WHERE (:user_id IS NULL OR user_id = :user_id);",
+        {"user_id": user_id},
+    )
+    cur = await db.execute(
+        f"INSERT INTO user_topic_stats (user_id, topic_id, solved, attempted) {_EXPECTED_SQL};",
+        {"user_id": user_id},
+    )
+    return cur.rowcount
+
+
+async def _main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    from backend.database import DB_PATH, apply_pragmas
+
+    parser = argparse.ArgumentParser(description="Verify or rebuild user_topic_stats.")
+    parser.add_argument("command", choices=["verify", "rebuild"])
+    parser.add_argument("--user", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    async with aiosqlite.connect(DB_PATH) as db:
+        await apply_pragmas(db)
+        if args.command == "rebuild":
+            rows = await rebuild(db, args.user)
+            await db.commit()
+            print(json.dumps({"rebuilt_rows": rows}))
+            return 0
+        drift = await verify(db, args.user)
+        print(json.dumps({"drift": len(drift), "rows": drift[:50]}))
+        return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main()))
@@ -0,0 +1,254 @@
+# backend/user_data.py
+"""
+Export / import of one user's learning data as NDJSON.
+
+One JSON object per line, tagged by "type":
+
+    {"type": "header", "format": 1, "exported_at": "..."}
+    {"type": "leetcode_link", "username": "..."}
+    {"type": "problem", "slug": "...", "title": "...", "difficulty": "...",
+     "topics": [...], "status": "solved|attempted", "last_updated": "..."}
+    {"type": "reflection", "slug": "...", "notes": "...", "ai_feedback": "...", "created_at": "..."}
+
+Export pages through a cursor with fetchmany(), so memory stays flat however
+long the history is. Import parses the upload line by line and applies it in
+chunked transactions. Lines for problems the catalog doesn't have are
+counted as "unknown" and skipped; an admin can pass restore_catalog=True to
+insert them from the exported title/difficulty/topics instead (existing
+catalog rows are never overwritten).
+"""
+import json
+import os
+import re
+import time
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import aiosqlite
+
+from backend import crud, recommender
+from backend.catalog_import import normalize_row
+from backend.database import snapshot_reader, writer
+
+EXPORT_FORMAT = 1
+EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", "1000"))
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "2000"))
+# a single NDJSON line (one reflection) larger than this is rejected
+MAX_IMPORT_LINE_BYTES = 1024 * 1024
+
+STATUSES = {"solved", "attempted"}
+_TIMESTAMP = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$")
+
+
+def _line(obj: Dict) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+async def _batches(db: aiosqlite.Connection, sql: str, params: Tuple) -> AsyncIterator[List]:
+    cur = await db.execute(sql, params)
+    while True:
+        rows = await cur.fetchmany(EXPORT_FETCH_SIZE)
+        if not rows:
+            break
+        yield rows
+    await cur.close()
+
+
+# ---------- Export ----------
+async def export_lines(user_id: int) -> AsyncIterator[str]:
+    """NDJSON text, one fetch batch per chunk, from a single read snapshot."""
+    async with snapshot_reader() as db:
+        yield _line({
+            "type": "header",
+            "format": EXPORT_FORMAT,
+            "exported_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        })
+
+        username = await crud.get_leetcode_username(db, user_id)
+        if username:
+            yield _line({"type": "leetcode_link", "username": username})
+
+        async for rows in _batches(
+            db,
+            """
+            SELECT p.slug, p.title, p.difficulty, p.topics, up.status, up.last_updated
+            FROM user_problems up
+            JOIN problems p ON p.id = up.problem_id
+            WHERE up.user_id = ?
+            ORDER BY up.problem_id;
+            """,
+            (user_id,),
+        ):
+            yield "".join(
+                _line({
+                    "type": "problem",
+                    "slug": r["slug"],
+                    "title": r["title"],
+                    "difficulty": r["difficulty"],
+                    "topics": crud.topic_list(r["topics"]),
+                    "status": r["status"],
+                    "last_updated": r["last_updated"],
+                })
+                for r in rows
+            )
+
+        async for rows in _batches(
+            db,
+            """
+            SELECT p.slug, r.notes, r.ai_feedback, r.created_at
+            FROM reflections r
+            JOIN problems p ON p.id = r.problem_id
+            WHERE r.user_id = ?
+            ORDER BY r.id;
+            """,
+            (user_id,),
+        ):
+            yield "".join(
+                _line({
+                    "type": "reflection",
+                    "slug": r["slug"],
+                    "notes": r["notes"],
+                    "ai_feedback": r["ai_feedback"] or "",
+                    "created_at": r["created_at"],
+                })
+                for r in rows
+            )
+
+
+# ---------- Import ----------
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Optional[Dict]]:
+    """Splits a byte stream into parsed lines; yields None for lines that aren't JSON objects."""
+    buf = b""
+    async for chunk in chunks:
+        buf += chunk
+        if b"\n" not in buf:
+            if len(buf) > MAX_IMPORT_LINE_BYTES:
+                raise ValueError("Import line too long")
+            continue
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse(line)
+    if buf.strip():
+        yield _parse(buf)
+
+
+def _parse(line: bytes) -> Optional[Dict]:
+    try:
+        obj = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return obj if isinstance(obj, dict) else None
+
+
+def _timestamp(value) -> Optional[str]:
+    return value if isinstance(value, str) and _TIMESTAMP.match(value) else None
+
+
+class _Chunk:
+    def __init__(self):
+        self.catalog: Dict[str, Tuple[str, str, str, str]] = {}
+        # slug -> (status, last_updated); the last line for a slug wins
+        self.statuses: Dict[str, Tuple[str, Optional[str]]] = {}
+        self.reflections: List[Tuple[str, str, str, Optional[str]]] = []
+
+    def __len__(self) -> int:
+        return len(self.statuses) + len(self.reflections)
+
+    def add(self, obj: Dict) -> bool:
+        kind = obj.get("type")
+        slug = (obj.get("slug") or "").strip()
+        if kind == "problem":
+            status = obj.get("status")
+            if not slug or status not in STATUSES:
+                return False
+            row = normalize_row(obj)
+            if row is not None:
+                self.catalog[slug] = row
+            self.statuses[slug] = (status, _timestamp(obj.get("last_updated")))
+            return True
+        if kind == "reflection":
+            notes = obj.get("notes")
+            if not slug or not isinstance(notes, str) or not notes.strip():
+                return False
+            feedback = obj.get("ai_feedback") if isinstance(obj.get("ai_feedback"), str) else ""
+            self.reflections.append((slug, notes, feedback, _timestamp(obj.get("created_at"))))
+            return True
+        return False
+
+
+async def _apply_chunk(user_id: int, chunk: _Chunk, stats: Dict, restore_catalog: bool) -> None:
+    slugs = set(chunk.statuses) | {r[0] for r in chunk.reflections}
+    created = 0
+    async with writer() as db:
+        ids = await crud.get_problem_ids_by_slugs(db, slugs)
+
+        # problems this catalog doesn't have yet: only an admin restore adds them
+        missing = [chunk.catalog[s] for s in slugs if s not in ids and s in chunk.catalog]
+        if restore_catalog and missing:
+            created = await crud.insert_missing_problems(db, missing)
+            ids.update(await crud.get_problem_ids_by_slugs(db, [row[0] for row in missing]))
+            stats["problems_created"] += created
+
+        statuses = [(ids[s], status, ts) for s, (status, ts) in chunk.statuses.items() if s in ids]
+        await crud.restore_user_problem_statuses(db, user_id, statuses)
+        stats["problems"] += len(statuses)
+
+        reflections = [(ids[s], notes, fb, ts) for s, notes, fb, ts in chunk.reflections if s in ids]
+        stats["reflections"] += await crud.insert_reflections(db, user_id, reflections)
+
+        stats["unknown"] += len(chunk.statuses) - len(statuses) + len(chunk.reflections) - len(reflections)
+    if created:
+        recommender.invalidate()
+
+
+async def import_user_data(
+    user_id: int,
+    records: AsyncIterator[Optional[Dict]],
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    restore_catalog: bool = False,
+) -> Dict:
+    """
+    Applies parsed NDJSON records for `user_id`, one transaction per
+    `chunk_size` records. Chunks applied before an error stay applied;
+    re-importing the same file is safe. `restore_catalog` (admin only) also
+    inserts problems the catalog is missing.
+    """
+    started = time.perf_counter()
+    stats = {
+        "read": 0, "invalid": 0, "problems": 0, "problems_created": 0,
+        "reflections": 0, "unknown": 0, "leetcode_link": False,
+    }
+    chunk = _Chunk()
+    async for obj in records:
+        stats["read"] += 1
+        if obj is None:
+            stats["invalid"] += 1
+            continue
+        kind = obj.get("type")
+        if kind == "header":
+            if obj.get("format") != EXPORT_FORMAT:
+                raise ValueError(f"Unsupported export format: {obj.get('format')}")
+            continue
+        if kind == "leetcode_link":
+            username = (obj.get("username") or "").strip()
+            if not username or len(username) > 64:
+                stats["invalid"] += 1
+                continue
+            async with writer() as db:
+                await crud.upsert_leetcode_link(db, user_id, username)
+            stats["leetcode_link"] = True
+            continue
+        if not chunk.add(obj):
+            stats["invalid"] += 1
+            continue
+        if len(chunk) >= chunk_size:
+            await _apply_chunk(user_id, chunk, stats, restore_catalog)
+            chunk = _Chunk()
+    if len(chunk):
+        await _apply_chunk(user_id, chunk, stats, restore_catalog)
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_sec"] = round(stats["read"] / elapsed) if elapsed > 0 else 0
+    return stats
@@ -0,0 +1,101 @@
+# benchmarks/cold_start.py
+"""
+Cold-start cost of a worker: import time, schema check and time to first 200.
+
+Every trial runs in a fresh interpreter against a database that is already
+at the current schema (the autoscaling case):
+
+- import: `import backend.main`
+- init_db: on that database (a no-op when current), and once on an empty
+  database (every migration)
+- first 200: from spawning uvicorn until GET / answers, then the first and
+  a second POST /users/login (the first one also loads the deferred
+  password-hashing and JWT libraries)
+
+    python -m benchmarks.cold_start [--trials 10] [--port 8765]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.stats import percentiles
+
+EMAIL = "cold-start@example.com"
+PASSWORD = "cold-start-password"
+
+_IMPORT = "import time; t = time.perf_counter(); import backend.main; print(time.perf_counter() - t)"
+_INIT_DB = (
+    "import asyncio, time; from backend.database import init_db; "
+    "t = time.perf_counter(); asyncio.run(init_db()); print(time.perf_counter() - t)"
+)
+_SEED_USER = (
+    "import asyncio, sqlite3; from backend.database import DB_PATH, init_db; from backend.deps import get_pwd_context; "
+    "asyncio.run(init_db()); con = sqlite3.connect(DB_PATH); "
+    f"con.execute('INSERT INTO users (email, hashed_password) VALUES (?, ?)', ({EMAIL!r}, get_pwd_context().hash({PASSWORD!r}))); "
+    "con.commit()"
+)
+
+
+def _python(code: str, env: Dict) -> float:
+    out = subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True)
+    return float(out.stdout.strip().splitlines()[-1]) if out.stdout.strip() else 0.0
+
+
+def _first_200(env: Dict, port: int) -> Dict:
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+            while True:
+                if proc.poll() is not None:
+                    raise RuntimeError("uvicorn exited during startup")
+                try:
+                    if client.get("/").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.005)
+            result = {"first_200": time.perf_counter() - started}
+            for label in ("first_login", "second_login"):
+                t = time.perf_counter()
+                client.post("/users/login", json={"email": EMAIL, "password": PASSWORD}).raise_for_status()
+                result[label] = time.perf_counter() - t
+        return result
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="cold-start-bench-")
+    env = dict(os.environ, DB_PATH=os.path.join(workdir, "bench.db"), FEEDBACK_WORKER_ENABLED="0")
+    subprocess.run([sys.executable, "-c", _SEED_USER], env=env, check=True)
+
+    samples: Dict[str, List[float]] = {k: [] for k in ("import", "init_db_current", "init_db_empty")}
+    for trial in range(args.trials):
+        samples["import"].append(_python(_IMPORT, env))
+        samples["init_db_current"].append(_python(_INIT_DB, env))
+        empty = dict(env, DB_PATH=os.path.join(workdir, f"empty-{trial}.db"))
+        samples["init_db_empty"].append(_python(_INIT_DB, empty))
+        for label, value in _first_200(env, args.port).items():
+            samples.setdefault(label, []).append(value)
+
+    print(json.dumps({"trials": args.trials, **{k: percentiles(v) for k, v in samples.items()}}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# benchmarks/datagen.py
+"""
+Synthetic data for load tests.
+
+Fills users, leetcode_links, problems (+ topics) and user_problems at a
+given scale, then rebuilds the derived tables. It is deterministic for a
+given --seed.
+
+    DB_PATH=/tmp/bench.db python -m benchmarks.datagen --scale 100k
+
+Users are bench{i}@example.com with password "bench-password". Problems are
+bench-problem-{i}. The scale is the number of user_problems rows.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sqlite3
+import time
+from typing import Dict, Iterator, Tuple
+
+SCALES: Dict[str, Tuple[int, int, int]] = {
+    # name: (users, problems, problems per user)
+    "10k": (100, 3500, 100),
+    "100k": (1000, 3500, 100),
+    "1m": (2000, 3500, 500),
+}
+TOPICS = [
+    "arrays", "hashmap", "strings", "two_pointers", "sliding_window", "stack", "queue",
+    "linked_list", "trees", "bst", "heap", "graphs", "dfs", "bfs", "topological_sort",
+    "union_find", "trie", "backtracking", "dynamic_programming", "greedy", "binary_search",
+    "bit_manipulation", "math", "geometry", "intervals", "sorting", "recursion", "design",
+    "matrix", "prefix_sum", "monotonic_stack", "segment_tree", "shortest_path", "simulation",
+]
+DIFFICULTIES = ["Easy", "Medium", "Medium", "Hard"]
+PASSWORD = "bench-password"
+CHUNK = 10_000
+
+
+def _problems(rng: random.Random, n: int) -> Iterator[Tuple]:
+    from backend.crud import problem_content_hash
+
+    for i in range(1, n + 1):
+        slug = f"bench-problem-{i}"
+        title = f"Bench Problem {i}"
+        difficulty = rng.choice(DIFFICULTIES)
+        topics = ",".join(rng.sample(TOPICS, rng.randint(1, 3)))
+        yield slug, title, difficulty, topics, problem_content_hash(slug, title, difficulty, topics)
+
+
+def _chunks(rows, size: int = CHUNK):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate(db_path: str, users: int, problems: int, per_user: int, seed: int) -> Dict:
+    from backend.deps import get_pwd_context
+    from backend.crud import parse_topics
+
+    rng = random.Random(seed)
+    hashed = get_pwd_context().hash(PASSWORD)
+    started = time.perf_counter()
+
+    con = sqlite3.connect(db_path)
+    con.execute("PRAGMA journal_mode = WAL;")
+    con.execute("PRAGMA synchronous = OFF;")
+    con.execute("PRAGMA foreign_keys = ON;")
+
+    with con:
+        for batch in _chunks(_problems(rng, problems)):
+            con.executemany(
+                """
+                INSERT INTO problems (slug, title, difficulty, topics, content_hash) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(slug) DO NOTHING;
+                """,
+                batch,
+            )
+        con.executemany("INSERT OR IGNORE INTO topics (name) VALUES (?)", [(t,) for t in TOPICS])
+        rows = con.execute("SELECT id, topics FROM problems WHERE slug LIKE 'bench-problem-%'").fetchall()
+        con.executemany(
+            "INSERT OR IGNORE INTO problem_topics (problem_id, topic_id) SELECT ?, id FROM topics WHERE name = ?",
+            [(pid, t) for pid, csv in rows for t in parse_topics(csv)],
+        )
+    problem_ids = [pid for pid, _ in rows]
+
+    with con:
+        con.executemany(
+            "INSERT OR IGNORE INTO users (email, hashed_password) VALUES (?, ?)",
+            ((f"bench{i}@example.com", hashed) for i in range(users)),
+        )
+        user_ids = [r[0] for r in con.execute("SELECT id FROM users WHERE email LIKE 'bench%@example.com'")]
+        con.executemany(
+            "INSERT OR IGNORE INTO leetcode_links (user_id, username) VALUES (?, ?)",
+            ((uid, f"bench{uid}") for uid in user_ids),
+        )
+
+    def history():
+        for uid in user_ids:
+            for pid in rng.sample(problem_ids, min(per_user, len(problem_ids))):
+                status = "solved" if rng.random() < 0.7 else "attempted"
+                days_ago = rng.random() * 365
+                yield uid, pid, status, f"-{days_ago:.4f} days"
+
+    inserted = 0
+    for batch in _chunks(history()):
+        with con:
+            con.executemany(
+                """
+                INSERT OR IGNORE INTO user_problems (user_id, problem_id, status, last_updated)
+                VALUES (?, ?, ?, datetime('now', 'localtime', ?));
+                """,
+                batch,
+            )
+        inserted += len(batch)
+    con.close()
+
+    return {
+        "users": len(user_ids),
+        "problems": len(problem_ids),
+        "user_problems": inserted,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+async def _rebuild_derived() -> None:
+    import aiosqlite
+    from backend import activity_rollup, topic_stats
+    from backend.database import DB_PATH
+
+    async with aiosqlite.connect(DB_PATH) as db:
+        await topic_stats.rebuild(db)
+        await activity_rollup.rebuild(db)
+        await db.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic benchmark data.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="10k")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from backend.database import DB_PATH, init_db
+
+    asyncio.run(init_db())
+    users, problems, per_user = SCALES[args.scale]
+    stats = generate(DB_PATH, users, problems, per_user, args.seed)
+    asyncio.run(_rebuild_derived())
+    print(json.dumps(dict(stats, db=DB_PATH, scale=args.scale)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# benchmarks/export_import.py
+"""
+Memory/throughput benchmark for GET /export and POST /import.
+
+Builds one user with --rows user_problems rows (and as many problems), starts
+the app under uvicorn, streams /export to a file and posts that file back to
+/import as a second user. The server's RSS is sampled throughout (Linux
+/proc); flat memory means the export/import peaks stay near the idle
+baseline whatever --rows is.
+
+    python -m benchmarks.export_import --rows 1000000 [--port 8765] [--keep]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict
+
+import httpx
+
+EXPORT_EMAIL = "export@example.com"
+IMPORT_EMAIL = "import@example.com"
+PASSWORD = "bench-password"
+
+
+def build(db_path: str, rows: int) -> Dict:
+    """Schema via init_db, then bulk rows with set-based SQL."""
+    import sqlite3
+
+    os.environ["DB_PATH"] = db_path
+    from backend.database import init_db
+    from backend.deps import get_pwd_context
+
+    asyncio.run(init_db())
+    started = time.perf_counter()
+    hashed = get_pwd_context().hash(PASSWORD)
+
+    con = sqlite3.connect(db_path)
+    con.execute("PRAGMA synchronous = OFF;")
+    with con:
+        con.executemany(
+            "INSERT OR IGNORE INTO users (email, hashed_password) VALUES (?, ?)",
+            [(EXPORT_EMAIL, hashed), (IMPORT_EMAIL, hashed)],
+        )
+        uid = con.execute("SELECT id FROM users WHERE email = ?", (EXPORT_EMAIL,)).fetchone()[0]
+        con.execute(
+            """
+            WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < ?)
+            INSERT OR IGNORE INTO problems (slug, title, difficulty, topics)
+            SELECT 'export-problem-' || i, 'Export Problem ' || i,
+                   CASE i % 3 WHEN 0 THEN 'Easy' WHEN 1 THEN 'Medium' ELSE 'Hard' END, ''
+            FROM seq;
+            """,
+            (rows,),
+        )
+        con.execute(
+            """
+            INSERT OR IGNORE INTO user_problems (user_id, problem_id, status, last_updated)
+            SELECT ?, id, CASE WHEN id % 10 < 7 THEN 'solved' ELSE 'attempted' END,
+                   datetime('2025-01-01', '+' || (id % 500000) || ' minutes')
+            FROM problems WHERE slug LIKE 'export-problem-%';
+            """,
+            (uid,),
+        )
+        con.execute(
+            """
+            INSERT INTO reflections (user_id, problem_id, notes, feedback_state)
+            SELECT ?, id, 'Reflection on problem ' || id || ': two pointers, then a hashmap.', 'done'
+            FROM problems WHERE slug LIKE 'export-problem-%' AND id % 100 = 0;
+            """,
+            (uid,),
+        )
+    con.close()
+    return {"rows": rows, "build_seconds": round(time.perf_counter() - started, 2)}
+
+
+class RssSampler:
+    """
+    Polls a pid's memory; phase() starts a new peak. Tracks total RSS and
+    RssAnon (heap etc.) separately: SQLite's mmap of the database file shows
+    up in total RSS as page cache, not as memory the process allocated.
+    """
+
+    FIELDS = {"VmRSS": "rss", "RssAnon": "anon"}
+
+    def __init__(self, pid: int, interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peaks: Dict[str, Dict[str, float]] = {}
+        self._phase = "idle"
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def sample_mb(self) -> Dict[str, float]:
+        out = {}
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    key = self.FIELDS.get(line.split(":", 1)[0])
+                    if key:
+                        out[key] = int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        return out
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            peak = self.peaks.setdefault(self._phase, {})
+            for key, mb in self.sample_mb().items():
+                peak[key] = max(peak.get(key, 0.0), mb)
+            time.sleep(self.interval)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def phase(self, name: str) -> None:
+        self._phase = name
+
+    def stop(self) -> Dict[str, Dict[str, float]]:
+        self._stop.set()
+        self._thread.join()
+        return {phase: {k: round(v, 1) for k, v in peak.items()} for phase, peak in self.peaks.items()}
+
+
+def _login(client: httpx.Client, email: str) -> Dict:
+    r = client.post("/users/login", json={"email": email, "password": PASSWORD})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def _wait_ready(client: httpx.Client, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if client.get("/").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def run(args) -> Dict:
+    workdir = tempfile.mkdtemp(prefix="export-bench-")
+    db_path = os.path.join(workdir, "app.db")
+    export_path = os.path.join(workdir, "export.ndjson")
+    result = build(db_path, args.rows)
+
+    env = dict(os.environ, DB_PATH=db_path, METRICS_ENABLED="0")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(args.port), "--log-level", "warning"],
+        env=env,
+    )
+    sampler = RssSampler(server.pid)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{args.port}", timeout=None) as client:
+            _wait_ready(client)
+            sampler.start()
+            exporter, importer = _login(client, EXPORT_EMAIL), _login(client, IMPORT_EMAIL)
+            time.sleep(1)
+
+            sampler.phase("export")
+            started, size, lines = time.perf_counter(), 0, 0
+            with client.stream("GET", "/export", headers=exporter) as r, open(export_path, "wb") as out:
+                r.raise_for_status()
+                for chunk in r.iter_bytes():
+                    out.write(chunk)
+                    size += len(chunk)
+                    lines += chunk.count(b"\n")
+            export_seconds = time.perf_counter() - started
+
+            def body():
+                with open(export_path, "rb") as f:
+                    while chunk := f.read(64 * 1024):
+                        yield chunk
+
+            sampler.phase("import")
+            started = time.perf_counter()
+            r = client.post(
+                "/import",
+                headers={**importer, "Content-Type": "application/x-ndjson"},
+                content=body(),
+            )
+            r.raise_for_status()
+            import_seconds = time.perf_counter() - started
+            sampler.phase("after")
+            time.sleep(0.5)
+    finally:
+        peaks = sampler.stop()
+        server.terminate()
+        server.wait()
+
+    result.update({
+        "export": {
+            "lines": lines,
+            "mb": round(size / 1e6, 1),
+            "seconds": round(export_seconds, 2),
+            "lines_per_sec": round(lines / export_seconds),
+        },
+        "import": {**r.json(), "seconds": round(import_seconds, 2)},
+        "server_rss_peak_mb": peaks,
+    })
+    if not args.keep:
+        for name in os.listdir(workdir):
+            os.remove(os.path.join(workdir, name))
+        os.rmdir(workdir)
+    else:
+        result["workdir"] = workdir
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export/import memory benchmark.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--keep", action="store_true", help="keep the database and export file")
+    args = parser.parse_args()
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# benchmarks/fake_ollama.py
+"""
+Deterministic stand-in for the Ollama server.
+
+Implements POST /api/chat (streaming NDJSON and non-streaming) and
+POST /api/embed (feature-hashing vectors from backend.embeddings). The chat
+reply is a valid mentor JSON document picked from the prompt's hash, or a
+reflection feedback document when the prompt is a feedback batch. It is
+emitted in small "tokens" with a configurable first-token delay and
+per-token latency.
+
+    python -m benchmarks.fake_ollama [--port 11435] [--first-token-ms 200] [--token-ms 20]
+
+Then point the app at it: OLLAMA_BASE_URL=http://127.0.0.1:11435
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from backend.embeddings import hash_embed
+
+FIRST_TOKEN_MS = float(os.getenv("FAKE_OLLAMA_FIRST_TOKEN_MS", "200"))
+TOKEN_MS = float(os.getenv("FAKE_OLLAMA_TOKEN_MS", "20"))
+CHARS_PER_TOKEN = 4
+
+_PROBLEMS = [
+    ("number-of-islands", "Number of Islands", "Medium"),
+    ("course-schedule", "Course Schedule", "Medium"),
+    ("clone-graph", "Clone Graph", "Medium"),
+    ("two-sum", "Two Sum", "Easy"),
+    ("valid-parentheses", "Valid Parentheses", "Easy"),
+    ("merge-intervals", "Merge Intervals", "Medium"),
+    ("word-ladder", "Word Ladder", "Hard"),
+    ("trapping-rain-water", "Trapping Rain Water", "Hard"),
+]
+
+app = FastAPI(title="fake-ollama")
+
+
+_REFLECTION_ID = re.compile(r"^Reflection id: (\d+)$", re.MULTILINE)
+
+
+def _reply_for(messages) -> str:
+    prompt = "\n".join(m.get("content", "") for m in messages)
+    ids = _REFLECTION_ID.findall(prompt)
+    if ids:
+        return json.dumps({
+            "feedback": [
+                {"id": int(i), "feedback": "Clear reasoning. Revisit the edge cases and time complexity."}
+                for i in ids
+            ]
+        })
+    seed = int(hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8], 16)
+    picks = [_PROBLEMS[(seed + i) % len(_PROBLEMS)] for i in range(3)]
+    return json.dumps({
+        "reply": f"Focus on these next (#{seed % 1000}).",
+        "recommendations": [
+            {"slug": slug, "title": title, "difficulty": diff, "why": "Builds on your recent work."}
+            for slug, title, diff in picks
+        ],
+        "next_steps": ["Solve one problem per day", "Write a reflection after each"],
+    })
+
+
+def _tokens(text: str):
+    return [text[i : i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)]
+
+
+@app.post("/api/chat")
+async def chat(request: Request):
+    body = await request.json()
+    model = body.get("model", "fake")
+    content = _reply_for(body.get("messages", []))
+    tokens = _tokens(content)
+    prompt_tokens = sum(len(m.get("content", "")) for m in body.get("messages", [])) // CHARS_PER_TOKEN
+
+    if not body.get("stream", True):
+        await asyncio.sleep((FIRST_TOKEN_MS + TOKEN_MS * len(tokens)) / 1000)
+        return {
+            "model": model,
+            "message": {"role": "assistant", "content": content},
+            "done": True,
+            "prompt_eval_count": prompt_tokens,
+            "eval_count": len(tokens),
+        }
+
+    async def stream():
+        await asyncio.sleep(FIRST_TOKEN_MS / 1000)
+        for tok in tokens:
+            yield json.dumps({"model": model, "message": {"role": "assistant", "content": tok}, "done": False}) + "\n"
+            await asyncio.sleep(TOKEN_MS / 1000)
+        yield json.dumps({
+            "model": model,
+            "message": {"role": "assistant", "content": ""},
+            "done": True,
+            "prompt_eval_count": prompt_tokens,
+            "eval_count": len(tokens),
+        }) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.post("/api/embed")
+async def embed(request: Request):
+    body = await request.json()
+    texts = body.get("input", [])
+    if isinstance(texts, str):
+        texts = [texts]
+    return {
+        "model": body.get("model", "fake"),
+        "embeddings": hash_embed(texts).tolist(),
+        "prompt_eval_count": sum(len(t) for t in texts) // CHARS_PER_TOKEN,
+    }
+
+
+def main() -> None:
+    global FIRST_TOKEN_MS, TOKEN_MS
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake Ollama server for benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--first-token-ms", type=float, default=FIRST_TOKEN_MS)
+    parser.add_argument("--token-ms", type=float, default=TOKEN_MS)
+    args = parser.parse_args()
+
+    FIRST_TOKEN_MS, TOKEN_MS = args.first_token_ms, args.token_ms
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
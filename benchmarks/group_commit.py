@@ -0,0 +1,136 @@
+# benchmarks/group_commit.py
+"""
+Write throughput of the group-commit writer under concurrent tiny writes.
+
+Each of --concurrency tasks per process runs one manual-sync-sized write
+(crud.set_user_problem_status inside writer()) after another for
+--duration seconds. Every level runs twice: with --batch blocks allowed per
+transaction, and with 1 (a commit per block, the old behaviour). With
+--processes > 1 the processes share the database the way uvicorn workers do,
+so their writers also contend for SQLite's write lock (busy retries).
+
+    DB_SYNCHRONOUS=FULL python -m benchmarks.group_commit \\
+        [--concurrency 1,8,32,128] [--processes 1] [--duration 5]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.stats import percentiles
+
+USERS = 200
+PROBLEMS = 2_000
+
+
+def build(db_path: str) -> None:
+    import sqlite3
+
+    from backend.database import init_db
+
+    asyncio.run(init_db())
+    con = sqlite3.connect(db_path)
+    with con:
+        con.executemany(
+            "INSERT INTO problems (slug, title, difficulty, topics) VALUES (?, ?, 'Easy', '')",
+            [(f"bench-problem-{i}", f"Problem {i}") for i in range(1, PROBLEMS + 1)],
+        )
+        con.executemany(
+            "INSERT INTO users (email, hashed_password) VALUES (?, 'x')",
+            [(f"writer{i}@example.com",) for i in range(USERS)],
+        )
+    con.close()
+
+
+async def _drive(concurrency: int, batch: int, duration: float, seed: int) -> Dict:
+    from backend import crud
+    from backend.database import ConnectionPool
+
+    pool = ConnectionPool(readers=1, group_commit_max=batch)
+    await pool.open()
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    errors = 0
+    stop = time.perf_counter() + duration
+
+    async def worker() -> None:
+        nonlocal errors
+        while time.perf_counter() < stop:
+            uid, pid = rng.randint(1, USERS), rng.randint(1, PROBLEMS)
+            started = time.perf_counter()
+            try:
+                async with pool.writer() as db:
+                    await crud.set_user_problem_status(db, uid, pid, rng.choice(["solved", "attempted"]))
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        elapsed = time.perf_counter() - started
+        stats = pool.stats()
+        await pool.close()
+    return {"latencies": latencies, "errors": errors, "elapsed": elapsed, "pool": stats}
+
+
+def _process(args) -> Dict:
+    return asyncio.run(_drive(*args))
+
+
+def run_level(concurrency: int, batch: int, processes: int, duration: float) -> Dict:
+    jobs = [(concurrency, batch, duration, seed) for seed in range(processes)]
+    if processes == 1:
+        parts = [_process(jobs[0])]
+    else:
+        with multiprocessing.get_context("spawn").Pool(processes) as mp:
+            parts = mp.map(_process, jobs)
+
+    latencies = [x for p in parts for x in p["latencies"]]
+    elapsed = max(p["elapsed"] for p in parts)
+    batches = sum(p["pool"]["batches"] for p in parts)
+    return {
+        "writes_per_s": round(len(latencies) / elapsed, 1),
+        "commits_per_s": round(batches / elapsed, 1),
+        "avg_batch": round(sum(p["pool"]["writes"] for p in parts) / max(1, batches), 2),
+        "busy_retries": sum(p["pool"]["busy_retries"] for p in parts),
+        "errors": sum(p["errors"] for p in parts),
+        **percentiles(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", default="1,8,32,128")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--batch", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    # must be set before backend.database is imported (also by the spawned workers)
+    os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="group-commit-bench-"), "bench.db")
+    os.environ.setdefault("METRICS_ENABLED", "0")
+    build(os.environ["DB_PATH"])
+
+    from backend.database import DB_SYNCHRONOUS
+
+    result: Dict = {"synchronous": DB_SYNCHRONOUS, "processes": args.processes, "levels": []}
+    # grow the WAL and warm the page cache first, or the first run measured pays for it
+    run_level(1, 1, 1, args.duration)
+    for concurrency in (int(c) for c in args.concurrency.split(",")):
+        level = {"concurrency": concurrency}
+        for label, batch in (("group_commit", args.batch), ("commit_per_write", 1)):
+            level[label] = run_level(concurrency, batch, args.processes, args.duration)
+        result["levels"].append(level)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# benchmarks/loadgen.py
+"""
+Closed-loop load driver.
+
+For each endpoint and concurrency level, N workers call the endpoint back to
+back for --duration seconds. Output is one JSON document with throughput
+and p50/p95/p99 latency per (endpoint, concurrency).
+
+    python -m benchmarks.loadgen --base-url http://127.0.0.1:8000 \
+        --endpoints login,recommend,sync_manual,mentor --concurrency 1,8,32 \
+        --duration 10 --out results.json
+
+Expects data from benchmarks.datagen (bench users and bench-problem slugs).
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from typing import Callable, Dict, List
+
+import httpx
+
+from benchmarks.datagen import PASSWORD, TOPICS
+from benchmarks.stats import percentiles
+
+ENDPOINTS = ["login", "recommend", "sync_manual", "mentor"]
+
+
+class Scenario:
+    def __init__(self, client: httpx.AsyncClient, users: int, problems: int, seed: int):
+        self.client = client
+        self.users = users
+        self.problems = problems
+        self.rng = random.Random(seed)
+        self.tokens: List[str] = []
+        self._counter = itertools.count()
+
+    async def login_all(self) -> None:
+        for i in range(self.users):
+            r = await self.client.post("/users/login", json={"email": f"bench{i}@example.com", "password": PASSWORD})
+            r.raise_for_status()
+            self.tokens.append(r.json()["access_token"])
+
+    def _auth(self) -> Dict:
+        return {"Authorization": f"Bearer {self.rng.choice(self.tokens)}"}
+
+    def _slugs(self, n: int) -> List[str]:
+        return [f"bench-problem-{self.rng.randint(1, self.problems)}" for _ in range(n)]
+
+    async def login(self) -> httpx.Response:
+        i = self.rng.randrange(self.users)
+        return await self.client.post("/users/login", json={"email": f"bench{i}@example.com", "password": PASSWORD})
+
+    async def recommend(self) -> httpx.Response:
+        body = {"weak_topics": self.rng.sample(TOPICS, 2), "limit": 10}
+        return await self.client.post("/leetcode/recommend", json=body, headers=self._auth())
+
+    async def sync_manual(self) -> httpx.Response:
+        body = {"solved_slugs": self._slugs(50), "attempted_slugs": self._slugs(10)}
+        return await self.client.post("/leetcode/sync_manual", json=body, headers=self._auth())
+
+    async def mentor(self) -> httpx.Response:
+        # unique messages so the response cache doesn't hide generation cost
+        body = {"message": f"What should I practice next? #{next(self._counter)}", "limit": 3}
+        return await self.client.post("/mentor/chat", json=body, headers=self._auth())
+
+
+async def _drive(call: Callable, concurrency: int, duration: float) -> Dict:
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                r = await call()
+                ok = r.status_code < 400
+                key = str(r.status_code)
+            except httpx.HTTPError as e:
+                ok, key = False, type(e).__name__
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors[key] = errors.get(key, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return dict(
+        requests=len(latencies) + sum(errors.values()),
+        ok=len(latencies),
+        errors=errors,
+        seconds=round(elapsed, 3),
+        throughput_rps=round(len(latencies) / elapsed, 2),
+        **percentiles(latencies),
+    )
+
+
+async def run(args) -> Dict:
+    limits = httpx.Limits(max_connections=max(args.concurrency) + 8)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        scenario = Scenario(client, args.users, args.problems, args.seed)
+        await scenario.login_all()
+
+        results = []
+        for endpoint in args.endpoints:
+            for concurrency in args.concurrency:
+                res = await _drive(getattr(scenario, endpoint), concurrency, args.duration)
+                results.append(dict(endpoint=endpoint, concurrency=concurrency, **res))
+
+    config = {k: v for k, v in vars(args).items() if k != "out"}
+    return {"config": config, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the Learning Journal API.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--endpoints", type=lambda s: s.split(","), default=ENDPOINTS)
+    parser.add_argument("--concurrency", type=lambda s: [int(x) for x in s.split(",")], default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--users", type=int, default=50, help="bench users to log in as")
+    parser.add_argument("--problems", type=int, default=3500, help="bench-problem slugs to draw from")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default="", help="write JSON here as well as stdout")
+    args = parser.parse_args()
+
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.out:
+        with open(args.out, "w") as fp:
+            fp.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
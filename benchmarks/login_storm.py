@@ -0,0 +1,116 @@
+# benchmarks/login_storm.py
+"""
+Event-loop latency during a login storm.
+
+Runs the app in-process against a throwaway database, fires N concurrent
+/users/login calls and samples event-loop lag with a 5 ms ticker. It does this
+twice: once through the real endpoint (hashing on the thread pool) and once
+verifying inline on the loop, which is how login used to work.
+
+    python -m benchmarks.login_storm [--logins 200] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.stats import percentiles
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic sleep wakes up (= time the loop was blocked)."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def __enter__(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+
+async def _storm(client, n: int, concurrency: int, creds: Dict) -> Dict:
+    sem = asyncio.Semaphore(concurrency)
+    statuses: Dict[int, int] = {}
+
+    async def one():
+        async with sem:
+            r = await client.post("/users/login", json=creds)
+            statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+    started = time.perf_counter()
+    with LoopLagMonitor() as lag:
+        await asyncio.gather(*(one() for _ in range(n)))
+    elapsed = time.perf_counter() - started
+    return {"logins": n, "seconds": round(elapsed, 3), "per_sec": round(n / elapsed, 1),
+            "statuses": statuses, "loop_lag": percentiles(lag.samples)}
+
+
+async def _inline(n: int, concurrency: int, password: str, hashed: str) -> Dict:
+    from backend.deps import get_pwd_context
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            await asyncio.sleep(0)
+            get_pwd_context().verify(password, hashed)  # blocks the loop, like the old handlers
+
+    started = time.perf_counter()
+    with LoopLagMonitor() as lag:
+        await asyncio.gather(*(one() for _ in range(n)))
+    elapsed = time.perf_counter() - started
+    return {"logins": n, "seconds": round(elapsed, 3), "per_sec": round(n / elapsed, 1),
+            "loop_lag": percentiles(lag.samples)}
+
+
+async def run(logins: int, concurrency: int) -> Dict:
+    import httpx
+    from backend.main import app
+
+    creds = {"email": "storm@example.com", "password": "storm-password"}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.post("/users/signup", json=creds)
+
+            with LoopLagMonitor() as idle:
+                await asyncio.sleep(0.5)
+
+            offloaded = await _storm(client, logins, concurrency, creds)
+
+        from backend import crud
+        from backend.database import reader
+        async with reader() as db:
+            hashed = (await crud.get_user_by_email(db, creds["email"]))["hashed_password"]
+        inline = await _inline(logins, concurrency, creds["password"], hashed)
+
+    return {"idle": {"loop_lag": percentiles(idle.samples)}, "offloaded": offloaded, "inline": inline}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    # must be set before backend.database is imported
+    os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(), "bench.db"))
+    print(json.dumps(asyncio.run(run(args.logins, args.concurrency)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
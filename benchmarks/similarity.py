@@ -0,0 +1,124 @@
+# benchmarks/similarity.py
+"""
+Similar-problem query latency and incremental reindex cost.
+
+Builds a synthetic catalog of --problems rows in a throwaway database,
+embeds it with the hashing backend (no model needed), then:
+
+- times a no-op reindex and a reindex after --changed titles were edited
+  (only those should be re-embedded)
+- times similarity.similar() for a user with 20 attempted and --solved solved
+  problems, with and without a difficulty filter
+
+    python -m benchmarks.similarity [--problems 10000] [--dim 768] [--queries 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Dict
+
+from benchmarks.stats import percentiles
+
+_TOPICS = [
+    "Array", "Hash Table", "Two Pointers", "Sliding Window", "Binary Search", "Stack", "Heap",
+    "Graph", "BFS", "DFS", "Union Find", "Trie", "Dynamic Programming", "Greedy", "Backtracking",
+    "Bit Manipulation", "Math", "String", "Tree", "Linked List", "Intervals", "Topological Sort",
+]
+_WORDS = [
+    "sum", "path", "island", "window", "subarray", "matrix", "string", "tree", "graph", "interval",
+    "merge", "kth", "largest", "minimum", "maximum", "valid", "palindrome", "schedule", "course",
+    "word", "ladder", "coin", "change", "house", "robber", "jump", "game", "median", "stream",
+]
+
+
+def build(db_path: str, problems: int, solved: int) -> int:
+    import sqlite3
+
+    from backend.database import init_db
+
+    asyncio.run(init_db())
+    rng = random.Random(7)
+    rows = []
+    for i in range(1, problems + 1):
+        title = " ".join(rng.sample(_WORDS, 3)).title() + f" {i}"
+        topics = ",".join(rng.sample(_TOPICS, rng.randint(1, 3)))
+        rows.append((f"bench-problem-{i}", title, rng.choice(["Easy", "Medium", "Hard"]), topics))
+
+    con = sqlite3.connect(db_path)
+    with con:
+        con.executemany("INSERT INTO problems (slug, title, difficulty, topics) VALUES (?, ?, ?, ?)", rows)
+        uid = con.execute(
+            "INSERT INTO users (email, hashed_password) VALUES ('similar@example.com', 'x')"
+        ).lastrowid
+        ids = [r[0] for r in con.execute("SELECT id FROM problems ORDER BY id")]
+        picked = rng.sample(ids, min(len(ids), solved + 20))
+        con.executemany(
+            "INSERT INTO user_problems (user_id, problem_id, status) VALUES (?, ?, ?)",
+            [(uid, pid, "attempted" if n < 20 else "solved") for n, pid in enumerate(picked)],
+        )
+    con.close()
+    return uid
+
+
+async def run(args) -> Dict:
+    from backend import embeddings, similarity
+    from backend.database import open_pool, close_pool, reader, writer
+
+    result: Dict = {"problems": args.problems, "dim": args.dim}
+    await open_pool(readers=2)
+    try:
+        embedder = embeddings.Embedder("hash")
+        result["full_reindex"] = await embeddings.reindex(embedder)
+        result["noop_reindex"] = await embeddings.reindex(embedder)
+
+        async with writer() as db:
+            await db.execute(
+                "UPDATE problems SET title = title || ' II' WHERE id IN (SELECT id FROM problems ORDER BY random() LIMIT ?)",
+                (args.changed,),
+            )
+        result["changed_reindex"] = await embeddings.reindex(embedder)
+
+        async with reader() as db:
+            started = time.perf_counter()
+            index = await similarity.get_index(db)
+            result["index_load_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            result["matrix_mb"] = round(index.matrix.nbytes / 1e6, 1)
+
+            for label, difficulty in (("all", None), ("medium", "Medium")):
+                samples = []
+                for _ in range(args.queries):
+                    started = time.perf_counter()
+                    seeds, hits = await similarity.similar(db, args.user_id, difficulty=difficulty, limit=10)
+                    samples.append(time.perf_counter() - started)
+                result[f"query_{label}"] = {"seeds": len(seeds), "results": len(hits), **percentiles(samples)}
+    finally:
+        await close_pool()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--problems", type=int, default=10_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--solved", type=int, default=2_000)
+    parser.add_argument("--changed", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    # must be set before backend.database / backend.embeddings are imported
+    workdir = tempfile.mkdtemp(prefix="similar-bench-")
+    os.environ["DB_PATH"] = os.path.join(workdir, "bench.db")
+    os.environ["EMBED_HASH_DIM"] = str(args.dim)
+    os.environ["EMBED_BACKEND"] = "hash"
+    os.environ.setdefault("METRICS_ENABLED", "0")
+
+    args.user_id = build(os.environ["DB_PATH"], args.problems, args.solved)
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# tests/conftest.py
+import os
+from contextlib import asynccontextmanager
+
+import pytest
+
+os.environ.setdefault("METRICS_ENABLED", "0")
+os.environ.setdefault("FEEDBACK_WORKER_ENABLED", "0")
+
+from backend import database  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """A throwaway database file for the test."""
+    path = str(tmp_path / "test.db")
+    monkeypatch.setattr(database, "DB_PATH", path)
+    return path
+
+
+@pytest.fixture
+def app_db(db_path):
+    """`async with app_db(): ...` runs the block on a migrated database with the pool open."""
+
+    @asynccontextmanager
+    async def open_db():
+        await database.init_db()
+        await database.open_pool(readers=1)
+        try:
+            yield
+        finally:
+            await database.close_pool()
+
+    return open_db
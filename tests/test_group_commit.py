@@ -0,0 +1,109 @@
+# tests/test_group_commit.py
+import asyncio
+import sqlite3
+
+import pytest
+
+from backend.database import ConnectionPool
+
+
+class Boom(Exception):
+    pass
+
+
+def _make_table(db_path: str) -> None:
+    con = sqlite3.connect(db_path)
+    con.execute("CREATE TABLE t (v INTEGER PRIMARY KEY);")
+    con.commit()
+    con.close()
+
+
+def _values(db_path: str) -> list:
+    con = sqlite3.connect(db_path)
+    try:
+        return [r[0] for r in con.execute("SELECT v FROM t ORDER BY v;")]
+    finally:
+        con.close()
+
+
+async def _run_blocks(pool: ConnectionPool, failing: set, count: int) -> list:
+    async def block(n: int) -> int:
+        async with pool.writer() as db:
+            await db.execute("INSERT INTO t (v) VALUES (?);", (n,))
+            if n in failing:
+                raise Boom(n)
+        return n
+
+    # all blocks are queued before the writer task gets to run any of them
+    return await asyncio.gather(*(block(n) for n in range(count)), return_exceptions=True)
+
+
+@pytest.mark.parametrize("failing", [{3}, {0}, {0, 4, 7}])
+def test_failing_block_rolls_back_only_itself(db_path, failing):
+    _make_table(db_path)
+
+    async def scenario():
+        pool = ConnectionPool(readers=1, group_commit_max=64)
+        await pool.open()
+        try:
+            return await _run_blocks(pool, failing, 8), pool.stats()
+        finally:
+            await pool.close()
+
+    results, stats = asyncio.run(scenario())
+    for n, result in enumerate(results):
+        if n in failing:
+            assert isinstance(result, Boom)
+        else:
+            assert result == n
+    assert _values(db_path) == [n for n in range(8) if n not in failing]
+    # one transaction for the whole burst, whichever blocks failed
+    assert stats["batches"] == 1
+    assert stats["writes"] == 8 - len(failing)
+    assert stats["rolled_back"] == len(failing)
+
+
+def test_batch_size_one_commits_per_block(db_path):
+    _make_table(db_path)
+
+    async def scenario():
+        pool = ConnectionPool(readers=1, group_commit_max=1)
+        await pool.open()
+        try:
+            await _run_blocks(pool, set(), 5)
+            return pool.stats()
+        finally:
+            await pool.close()
+
+    stats = asyncio.run(scenario())
+    assert _values(db_path) == list(range(5))
+    assert stats["batches"] == stats["writes"] == 5
+
+
+def test_commit_inside_a_block_fails_the_batch(db_path):
+    _make_table(db_path)
+
+    async def scenario():
+        pool = ConnectionPool(readers=1)
+        await pool.open()
+
+        async def good(n: int) -> None:
+            async with pool.writer() as db:
+                await db.execute("INSERT INTO t (v) VALUES (?);", (n,))
+
+        async def rogue() -> None:
+            async with pool.writer() as db:
+                await db.execute("INSERT INTO t (v) VALUES (100);")
+                await db.commit()
+
+        try:
+            results = await asyncio.gather(good(1), rogue(), good(2), return_exceptions=True)
+            # the writer keeps serving later blocks
+            await good(3)
+            return results
+        finally:
+            await pool.close()
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, sqlite3.OperationalError) for r in results[:2])
+    assert 3 in _values(db_path)
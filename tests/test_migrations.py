@@ -0,0 +1,154 @@
+# tests/test_migrations.py
+import asyncio
+import sqlite3
+
+import aiosqlite
+import pytest
+
+from backend import database
+
+# the shape of a database from before versioned migrations: no history
+# version, no SM-2 or feedback columns, topics only as CSV, no rollups or FTS
+_UNVERSIONED_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT UNIQUE NOT NULL,
+    hashed_password TEXT NOT NULL,
+    created_at TEXT DEFAULT (datetime('now'))
+);
+CREATE TABLE problems (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    slug TEXT UNIQUE NOT NULL,
+    title TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    topics TEXT DEFAULT '',
+    created_at TEXT DEFAULT (datetime('now'))
+);
+CREATE TABLE user_problems (
+    user_id INTEGER NOT NULL,
+    problem_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    last_updated TEXT DEFAULT (datetime('now')),
+    PRIMARY KEY(user_id, problem_id)
+);
+CREATE TABLE reflections (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    problem_id INTEGER NOT NULL,
+    notes TEXT NOT NULL,
+    ai_feedback TEXT DEFAULT '',
+    created_at TEXT DEFAULT (datetime('now'))
+);
+INSERT INTO users (email, hashed_password) VALUES ('a@example.com', 'x');
+INSERT INTO problems (slug, title, difficulty, topics) VALUES
+    ('two-sum', 'Two Sum', 'Easy', 'arrays,hashmap'),
+    ('number-of-islands', 'Number of Islands', 'Medium', 'graphs');
+INSERT INTO user_problems (user_id, problem_id, status, last_updated) VALUES
+    (1, 1, 'solved', '2025-01-02 10:00:00'),
+    (1, 2, 'attempted', '2025-01-03 10:00:00');
+INSERT INTO reflections (user_id, problem_id, notes, ai_feedback) VALUES
+    (1, 1, 'hashmap of complements', 'nice'),
+    (1, 2, 'flood fill with bfs', '');
+"""
+
+
+def _version(db_path: str) -> int:
+    con = sqlite3.connect(db_path)
+    try:
+        return con.execute("PRAGMA user_version;").fetchone()[0]
+    finally:
+        con.close()
+
+
+async def _migrate(db_path: str) -> int:
+    async with aiosqlite.connect(db_path) as db:
+        return await database.migrate(db)
+
+
+def test_empty_database_gets_every_migration(db_path):
+    assert asyncio.run(_migrate(db_path)) == database.SCHEMA_VERSION
+    assert _version(db_path) == database.SCHEMA_VERSION
+    # current: nothing to do
+    assert asyncio.run(_migrate(db_path)) == 0
+
+
+def test_unversioned_database_is_adopted(db_path):
+    con = sqlite3.connect(db_path)
+    con.executescript(_UNVERSIONED_SCHEMA)
+    con.close()
+
+    asyncio.run(database.init_db())
+    assert _version(db_path) == database.SCHEMA_VERSION
+
+    con = sqlite3.connect(db_path)
+    try:
+        assert con.execute("SELECT history_version FROM users;").fetchone() == (0,)
+        assert con.execute(
+            "SELECT COUNT(*) FROM problem_topics pt JOIN topics t ON t.id = pt.topic_id;"
+        ).fetchone() == (3,)
+        assert dict(con.execute(
+            "SELECT t.name, s.solved || '/' || s.attempted FROM user_topic_stats s JOIN topics t ON t.id = s.topic_id;"
+        ).fetchall()) == {"arrays": "1/0", "hashmap": "1/0", "graphs": "0/1"}
+        # topic 0 = all problems, on each row's own day
+        assert con.execute(
+            "SELECT day, solved, attempted FROM daily_topic_activity WHERE topic_id = 0 ORDER BY day;"
+        ).fetchall() == [("2025-01-02", 1, 0), ("2025-01-03", 0, 1)]
+        # reflections that already had feedback aren't queued for it again
+        assert con.execute("SELECT feedback_state FROM reflections ORDER BY id;").fetchall() == [
+            ("done",),
+            ("pending",),
+        ]
+        assert con.execute(
+            "SELECT rowid FROM reflections_fts WHERE reflections_fts MATCH 'bfs';"
+        ).fetchall() == [(2,)]
+        assert con.execute(
+            "SELECT repetitions, next_review_at FROM user_problems WHERE problem_id = 1;"
+        ).fetchone() == (0, None)
+    finally:
+        con.close()
+
+
+def test_versioned_database_runs_only_later_migrations(db_path, monkeypatch):
+    ran = []
+    first, *rest = database._MIGRATIONS
+
+    async def setup():
+        async with aiosqlite.connect(db_path) as db:
+            await db.execute("BEGIN;")
+            await first(db)
+            await db.execute("PRAGMA user_version = 1;")
+            await db.commit()
+
+    asyncio.run(setup())
+
+    def tracked(migration):
+        async def run(db):
+            ran.append(migration.__name__)
+            await migration(db)
+
+        return run
+
+    monkeypatch.setattr(database, "_MIGRATIONS", [first, *(tracked(m) for m in rest)])
+    assert asyncio.run(_migrate(db_path)) == len(rest)
+    assert ran == [m.__name__ for m in rest]
+    assert _version(db_path) == database.SCHEMA_VERSION
+
+
+def test_failed_migration_leaves_the_database_as_it_was(db_path, monkeypatch):
+    asyncio.run(_migrate(db_path))
+
+    async def broken(db):
+        await db.execute("CREATE TABLE half_done (id INTEGER);")
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(database, "_MIGRATIONS", [*database._MIGRATIONS, broken])
+    monkeypatch.setattr(database, "SCHEMA_VERSION", len(database._MIGRATIONS))
+    with pytest.raises(RuntimeError):
+        asyncio.run(_migrate(db_path))
+
+    assert _version(db_path) == len(database._MIGRATIONS) - 1
+    con = sqlite3.connect(db_path)
+    try:
+        assert con.execute("SELECT name FROM sqlite_master WHERE name = 'half_done';").fetchone() is None
+    finally:
+        con.close()
@@ -0,0 +1,53 @@
+# tests/test_reflection_search.py
+import asyncio
+
+import pytest
+
+from backend import crud
+from backend.database import reader, writer
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("two pointers", '"two" "pointers"'),
+        ("dp*", '"dp"*'),
+        ('"unbalanced quote', '"unbalanced" "quote"'),
+        ("a OR b NOT c", '"a" "OR" "b" "NOT" "c"'),
+        ("notes:hash NEAR(x y)", '"notes" "hash" "NEAR" "x" "y"'),
+        ("-(^col)", '"col"'),
+        ("café naïve", '"café" "naïve"'),
+        ("", None),
+        ("*** ()", None),
+        (None, None),
+    ],
+)
+def test_fts_query_quotes_every_word(text, expected):
+    assert crud.fts_query(text) == expected
+
+
+def test_operator_input_is_searched_literally(app_db):
+    async def scenario():
+        async with app_db():
+            async with writer() as db:
+                user = await crud.create_user(db, "a@example.com", "x")
+                row = ("two-sum", "Two Sum", "Easy", "arrays")
+                await crud.upsert_problems(db, [(*row, crud.problem_content_hash(*row))])
+                problem_id = await crud.get_problem_id_by_slug(db, "two-sum")
+                await crud.create_reflection(db, user["id"], problem_id, "use a hashmap OR two pointers")
+                await crud.create_reflection(db, user["id"], problem_id, "sorting then binary search")
+
+            results = {}
+            async with reader() as db:
+                for q in ("hash*", "OR", 'pointers" OR "sorting', "hashmap)(", "binary -search"):
+                    rows = await crud.search_reflections(db, user["id"], crud.fts_query(q))
+                    results[q] = len(rows)
+            return results
+
+    assert asyncio.run(scenario()) == {
+        "hash*": 1,
+        "OR": 1,
+        'pointers" OR "sorting': 0,
+        "hashmap)(": 1,
+        "binary -search": 1,
+    }
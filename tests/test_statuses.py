@@ -0,0 +1,149 @@
+# tests/test_statuses.py
+import asyncio
+import sqlite3
+
+from backend import crud, review_schedule
+from backend.database import writer
+
+PROBLEMS = [
+    ("two-sum", "Two Sum", "Easy", "arrays,hashmap"),
+    ("number-of-islands", "Number of Islands", "Medium", "graphs"),
+]
+
+
+async def _seed() -> tuple:
+    async with writer() as db:
+        user = await crud.create_user(db, "a@example.com", "x")
+        await crud.upsert_problems(db, [(*p, crud.problem_content_hash(*p)) for p in PROBLEMS])
+        ids = await crud.get_problem_ids_by_slugs(db, [p[0] for p in PROBLEMS])
+    return user["id"], ids["two-sum"], ids["number-of-islands"]
+
+
+async def _set(user_id: int, problem_id: int, status: str) -> None:
+    async with writer() as db:
+        await crud.set_user_problem_status(db, user_id, problem_id, status)
+
+
+def _state(db_path: str, user_id: int, problem_id: int) -> dict:
+    con = sqlite3.connect(db_path)
+    con.row_factory = sqlite3.Row
+    try:
+        row = con.execute(
+            "SELECT status, ease, interval_days, repetitions, next_review_at FROM user_problems"
+            " WHERE user_id = ? AND problem_id = ?;",
+            (user_id, problem_id),
+        ).fetchone()
+        topic_stats = {
+            r["name"]: (r["solved"], r["attempted"])
+            for r in con.execute(
+                "SELECT t.name, s.solved, s.attempted FROM user_topic_stats s"
+                " JOIN topics t ON t.id = s.topic_id WHERE s.user_id = ?;",
+                (user_id,),
+            )
+        }
+        activity = {
+            r["topic_id"]: (r["solved"], r["attempted"])
+            for r in con.execute(
+                "SELECT topic_id, SUM(solved) AS solved, SUM(attempted) AS attempted"
+                " FROM daily_topic_activity WHERE user_id = ? GROUP BY topic_id;",
+                (user_id,),
+            )
+        }
+        version = con.execute("SELECT history_version FROM users WHERE id = ?;", (user_id,)).fetchone()[0]
+    finally:
+        con.close()
+    return {"row": dict(row) if row else None, "topics": topic_stats, "activity": activity, "version": version}
+
+
+def test_first_solve_schedules_and_counts(app_db, db_path):
+    async def scenario():
+        async with app_db():
+            user_id, two_sum, _ = await _seed()
+            await _set(user_id, two_sum, "solved")
+            return _state(db_path, user_id, two_sum)
+
+    state = asyncio.run(scenario())
+    assert state["row"]["status"] == "solved"
+    assert (state["row"]["repetitions"], state["row"]["interval_days"]) == (1, 1)
+    assert state["row"]["next_review_at"] is not None
+    assert state["topics"] == {"arrays": (1, 0), "hashmap": (1, 0)}
+    # topic 0 is the all-problems row
+    assert state["activity"][0] == (1, 0)
+    assert state["version"] == 1
+
+
+def test_unchanged_status_keeps_schedule_and_rollups(app_db, db_path):
+    async def scenario():
+        async with app_db():
+            user_id, two_sum, _ = await _seed()
+            await _set(user_id, two_sum, "solved")
+            before = _state(db_path, user_id, two_sum)
+            await _set(user_id, two_sum, "solved")
+            return before, _state(db_path, user_id, two_sum)
+
+    before, after = asyncio.run(scenario())
+    for key in ("ease", "interval_days", "repetitions", "next_review_at"):
+        assert after["row"][key] == before["row"][key]
+    assert after["topics"] == before["topics"]
+    assert after["activity"] == before["activity"]
+
+
+def test_falling_back_to_attempted_moves_counts(app_db, db_path):
+    async def scenario():
+        async with app_db():
+            user_id, two_sum, _ = await _seed()
+            await _set(user_id, two_sum, "solved")
+            await _set(user_id, two_sum, "attempted")
+            return _state(db_path, user_id, two_sum)
+
+    state = asyncio.run(scenario())
+    assert state["row"]["status"] == "attempted"
+    assert state["row"]["repetitions"] == 0
+    assert state["topics"] == {"arrays": (0, 1), "hashmap": (0, 1)}
+    # the rollup records events, so both the solve and the lapse stay counted
+    assert state["activity"][0] == (1, 1)
+
+
+def test_review_grade_changes_only_the_schedule(app_db, db_path):
+    async def scenario():
+        async with app_db():
+            user_id, two_sum, _ = await _seed()
+            await _set(user_id, two_sum, "solved")
+            before = _state(db_path, user_id, two_sum)
+            async with writer() as db:
+                row = await crud.review_problem(db, user_id, two_sum, review_schedule.GRADES["again"])
+            return before, row, _state(db_path, user_id, two_sum)
+
+    before, row, after = asyncio.run(scenario())
+    assert row["status"] == "solved"
+    assert after["row"]["status"] == "solved"
+    assert (after["row"]["repetitions"], after["row"]["interval_days"]) == (0, 1)
+    assert after["row"]["ease"] < before["row"]["ease"]
+    assert after["topics"] == before["topics"]
+    assert after["activity"] == before["activity"]
+    assert after["version"] == before["version"]
+
+
+def test_passing_reviews_grow_the_interval(app_db, db_path):
+    async def scenario():
+        async with app_db():
+            user_id, two_sum, _ = await _seed()
+            await _set(user_id, two_sum, "solved")
+            intervals = []
+            for _ in range(3):
+                async with writer() as db:
+                    row = await crud.review_problem(db, user_id, two_sum, review_schedule.GRADES["good"])
+                intervals.append((row["repetitions"], row["interval_days"]))
+            return intervals
+
+    assert asyncio.run(scenario()) == [(2, 6), (3, 15), (4, 38)]
+
+
+def test_review_outside_history_is_none(app_db):
+    async def scenario():
+        async with app_db():
+            user_id, _, islands = await _seed()
+            async with writer() as db:
+                return await crud.review_problem(db, user_id, islands, review_schedule.GRADES["good"])
+
+    assert asyncio.run(scenario()) is None